@@ -10,7 +10,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('core/services.json', 'core')],  # Catálogo de servicios
     hiddenimports=[
         'PyQt6.QtCore',
         'PyQt6.QtGui',
@@ -0,0 +1,58 @@
+"""
+Verifica el presupuesto de tiempo hasta el primer frame
+
+Lanza main.py con --exit-after-startup varias veces y compara la mediana
+de time_to_first_paint_ms con el presupuesto. Termina con código 1 si se
+excede, para poder usarlo como chequeo de regresión en el build.
+
+Uso:
+    python benchmarks/startup_budget.py [--budget-ms 1500] [--runs 5]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(timeout: float) -> float:
+    """Tiempo hasta el primer frame de un arranque en frío, en ms"""
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "--exit-after-startup"],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=ROOT
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("time_to_first_paint_ms="):
+            return float(line.split("=", 1)[1])
+    raise RuntimeError(result.stderr.strip() or "main.py no informó el tiempo de arranque")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    
+    samples = [measure_once(args.timeout) for _ in range(args.runs)]
+    median = statistics.median(samples)
+    
+    print("runs:   " + ", ".join(f"{ms:.0f}" for ms in samples) + " ms")
+    print(f"median: {median:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    
+    if median > args.budget_ms:
+        print("FAIL: time to first paint exceeds budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Micro-benchmark del tema: creación de tarjetas y cambios de estado
+
+Compara el estilo anterior (hoja de estilo por widget y unpolish/polish en
+cada cambio de estado) con el tema a nivel de aplicación y propiedades
+dinámicas.
+
+Uso:
+    python benchmarks/theme_benchmark.py [--cards 200] [--changes 2000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QComboBox
+
+from core.ai_services import AIService, ServiceDefinition, ServiceStatus
+from ui.service_card import ServiceCard
+from ui.styles import DARK_THEME, apply_theme
+
+
+# Hoja de estilo que antes se aplicaba a cada LanguageSelector
+LEGACY_COMBO_STYLE = """
+    QComboBox {
+        background-color: #16213e;
+        color: #eaeaea;
+        border: 1px solid #0f3460;
+        border-radius: 4px;
+        padding: 5px 10px;
+        font-size: 12px;
+    }
+    QComboBox:hover {
+        border-color: #00d4ff;
+    }
+"""
+
+STATUSES = [ServiceStatus.ENABLED, ServiceStatus.DISABLED, ServiceStatus.NOT_INSTALLED]
+
+
+def _service(i: int) -> AIService:
+    return AIService(ServiceDefinition(
+        id=f"svc{i}", name=f"Service {i}", description="Benchmark service",
+        registry_rules=(), appx_rules=(), feature_rule=None
+    ))
+
+
+def _legacy_set_status(label: QLabel, status: ServiceStatus):
+    """Cambio de estado anterior: objectName + unpolish/polish siempre"""
+    label.setObjectName({
+        ServiceStatus.ENABLED: "statusEnabled",
+        ServiceStatus.DISABLED: "statusDisabled",
+        ServiceStatus.NOT_INSTALLED: "statusNotInstalled",
+    }[status])
+    label.style().unpolish(label)
+    label.style().polish(label)
+
+
+def bench_legacy(app: QApplication, cards: int, changes: int):
+    app.setStyleSheet("")
+    root = QWidget()
+    root.setStyleSheet(DARK_THEME)
+    layout = QVBoxLayout(root)
+    
+    start = time.perf_counter()
+    labels = []
+    for i in range(cards):
+        card = ServiceCard(_service(i))
+        combo = QComboBox()
+        combo.setStyleSheet(LEGACY_COMBO_STYLE)
+        layout.addWidget(card)
+        layout.addWidget(combo)
+        labels.append(card.status_label)
+    root.show()
+    app.processEvents()
+    create = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for n in range(changes):
+        _legacy_set_status(labels[n % cards], STATUSES[n % len(STATUSES)])
+    app.processEvents()
+    change = time.perf_counter() - start
+    
+    root.close()
+    return create, change
+
+
+def bench_themed(app: QApplication, cards: int, changes: int):
+    apply_theme(app)
+    root = QWidget()
+    layout = QVBoxLayout(root)
+    
+    start = time.perf_counter()
+    service_cards = []
+    for i in range(cards):
+        card = ServiceCard(_service(i))
+        combo = QComboBox()
+        combo.setObjectName("languageSelector")
+        layout.addWidget(card)
+        layout.addWidget(combo)
+        service_cards.append(card)
+    root.show()
+    app.processEvents()
+    create = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for n in range(changes):
+        service_cards[n % cards].update_status(STATUSES[n % len(STATUSES)])
+    app.processEvents()
+    change = time.perf_counter() - start
+    
+    root.close()
+    return create, change
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=2000)
+    args = parser.parse_args()
+    
+    app = QApplication(sys.argv)
+    results = {
+        "legacy": bench_legacy(app, args.cards, args.changes),
+        "themed": bench_themed(app, args.cards, args.changes),
+    }
+    
+    print(f"{'':8} {'create (ms/card)':>18} {'status (µs/change)':>20}")
+    for name, (create, change) in results.items():
+        print(f"{name:8} {create / args.cards * 1000:18.3f} {change / args.changes * 1e6:20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Punto de entrada de `python -m core`
+"""
+
+import sys
+
+from .cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Agente de cumplimiento de políticas
+Mantiene los servicios AI en el estado deseado mientras corre: las
+actualizaciones de Windows que reactivan un servicio se corrigen sin que
+nadie abra la interfaz
+"""
+
+import os
+import sys
+import time
+import heapq
+import threading
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from .ai_services import AIService, ServiceStatus
+from .detector import AIServiceDetector
+from .manager import AIServiceManager
+
+
+# Tipos de chequeo: el registro es barato; Appx/Features lanzan PowerShell
+REGISTRY_CHECK = "registry"
+PROBE_CHECK = "probe"
+
+
+@dataclass
+class DriftEvent:
+    """Una corrección realizada por el agente"""
+    timestamp: str
+    service_id: str
+    kind: str
+    observed: str
+    desired: str
+    success: bool
+    message: str
+
+
+@dataclass(order=True)
+class _Check:
+    due: float
+    seq: int
+    service: AIService = field(compare=False)
+    kind: str = field(compare=False)
+    base_interval: float = field(compare=False)
+    interval: float = field(compare=False)
+    failures: int = field(default=0, compare=False)
+
+
+class EnforcementAgent:
+    """Re-verifica periódicamente cada servicio y corrige la deriva
+    
+    Cada servicio tiene un chequeo de registro (intervalo corto) y, si tiene
+    paquetes Appx o una Windows Feature, un probe costoso (intervalo largo).
+    La deriva que ve el chequeo de registro se corrige re-escribiendo sólo
+    esos valores; la del probe, con disable/enable_service completo.
+    Los intervalos se adaptan:
+    
+    - tras corregir una deriva el intervalo se acorta (a la mitad, hasta
+      `min_interval`), porque la causa suele volver a aplicarse pronto;
+    - si la corrección falla, se espera cada vez más (backoff exponencial)
+      para no insistir contra un error permanente;
+    - mientras no hay deriva, el intervalo crece gradualmente hasta
+      `max_factor` veces el intervalo base.
+    
+    Con un RegistryWatcher (ver `watch()`), un cambio en las claves de un
+    servicio adelanta su chequeo de registro, así el intervalo sólo es una
+    red de seguridad.
+    
+    `clock` y `wait` se pueden reemplazar para pruebas con reloj falso; la
+    memoria usada no crece con el tiempo (sólo contadores y un historial
+    acotado de correcciones).
+    """
+    
+    def __init__(self, targets: Dict[str, ServiceStatus],
+                 detector: Optional[AIServiceDetector] = None,
+                 manager: Optional[AIServiceManager] = None,
+                 registry_interval: float = 60.0,
+                 probe_interval: Optional[float] = 3600.0,
+                 min_interval: float = 10.0,
+                 max_factor: float = 8.0,
+                 relax_factor: float = 1.5,
+                 history_size: int = 100,
+                 clock: Callable[[], float] = time.monotonic,
+                 logger=None):
+        self.detector = detector or AIServiceDetector()
+        self.manager = manager or AIServiceManager(registry=self.detector.registry)
+        self.targets = dict(targets)
+        self.min_interval = min_interval
+        self.max_factor = max_factor
+        self.relax_factor = relax_factor
+        self.clock = clock
+        self._logger = logger
+        
+        self.history: Deque[DriftEvent] = deque(maxlen=history_size)
+        self.stats = {
+            "registry_checks": 0,
+            "probe_checks": 0,
+            "drift": 0,
+            "enforced": 0,
+            "failures": 0,
+            "change_events": 0,
+        }
+        
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._queue: List[_Check] = []
+        self._watcher = None
+        
+        now = self.clock()
+        for service in self.detector.services:
+            if service.id not in self.targets:
+                continue
+            if service.registry_rules:
+                self._schedule(service, REGISTRY_CHECK, registry_interval, now)
+            if probe_interval and (service.appx_rules or service.feature_rule):
+                self._schedule(service, PROBE_CHECK, probe_interval, now)
+    
+    @property
+    def logger(self):
+        if self._logger is None:
+            from .logger import activity_logger
+            self._logger = activity_logger
+        return self._logger
+    
+    def _schedule(self, service: AIService, kind: str, interval: float, now: float):
+        heapq.heappush(
+            self._queue,
+            _Check(now, next(self._seq), service, kind, interval, interval)
+        )
+    
+    def next_due(self) -> Optional[float]:
+        """Instante (según `clock`) del próximo chequeo"""
+        return self._queue[0].due if self._queue else None
+    
+    def intervals(self) -> Dict[str, float]:
+        """Intervalo actual de cada chequeo: {"service_id/kind": segundos}"""
+        return {f"{c.service.id}/{c.kind}": c.interval for c in self._queue}
+    
+    def tick(self) -> Optional[float]:
+        """Ejecuta los chequeos vencidos
+        
+        Retorna los segundos hasta el próximo chequeo (None si no hay).
+        """
+        now = self.clock()
+        while not self._stop.is_set():
+            with self._lock:
+                if not self._queue or self._queue[0].due > now:
+                    break
+                check = heapq.heappop(self._queue)
+            self._run_check(check)
+            with self._lock:
+                check.due = self.clock() + check.interval
+                check.seq = next(self._seq)
+                heapq.heappush(self._queue, check)
+        
+        with self._lock:
+            if not self._queue:
+                return None
+            return max(0.0, self._queue[0].due - self.clock())
+    
+    def notify_changed(self, service_ids):
+        """Adelanta el chequeo de registro de servicios cuyas claves cambiaron
+        
+        Se puede llamar desde cualquier hilo (p. ej. el de RegistryWatcher).
+        """
+        now = self.clock()
+        with self._lock:
+            self.stats["change_events"] += 1
+            for check in self._queue:
+                if check.kind == REGISTRY_CHECK and check.service.id in service_ids:
+                    check.due = now
+            heapq.heapify(self._queue)
+        self._wake.set()
+    
+    def watch(self, debounce: float = 1.0):
+        """Consume los eventos de un RegistryWatcher sobre el registro del detector"""
+        from .registry_watch import RegistryWatcher
+        self._watcher = RegistryWatcher(
+            [service for service in self.detector.services if service.id in self.targets],
+            self.detector.registry, self.notify_changed, debounce=debounce
+        )
+        self._watcher.start()
+        return self._watcher
+    
+    def _observe(self, check: _Check) -> ServiceStatus:
+        service = check.service
+        if check.kind == REGISTRY_CHECK:
+            self.stats["registry_checks"] += 1
+            return self.detector.registry_status(service)
+        
+        self.stats["probe_checks"] += 1
+        return self.detector.probe_status(service)
+    
+    def _run_check(self, check: _Check):
+        service = check.service
+        desired = self.targets[service.id]
+        observed = self._observe(check)
+        
+        # Sin instalar o indeterminado no es deriva: no hay nada que corregir
+        if observed in (desired, ServiceStatus.NOT_INSTALLED, ServiceStatus.UNKNOWN):
+            check.failures = 0
+            check.interval = min(check.interval * self.relax_factor,
+                                 check.base_interval * self.max_factor)
+            return
+        
+        self.stats["drift"] += 1
+        if check.kind == REGISTRY_CHECK:
+            # La deriva está en el registro: no hace falta lanzar PowerShell
+            success, message = self.manager.apply_registry_rules(
+                service, disable=desired == ServiceStatus.DISABLED
+            )
+        elif desired == ServiceStatus.DISABLED:
+            success, message = self.manager.disable_service(service)
+        else:
+            success, message = self.manager.enable_service(service)
+        
+        if success:
+            self.stats["enforced"] += 1
+            check.failures = 0
+            check.interval = max(self.min_interval, check.interval / 2)
+        else:
+            self.stats["failures"] += 1
+            check.failures += 1
+            check.interval = min(check.base_interval * (2 ** check.failures),
+                                 check.base_interval * self.max_factor)
+        
+        self.history.append(DriftEvent(
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            service_id=service.id,
+            kind=check.kind,
+            observed=observed.value,
+            desired=desired.value,
+            success=success,
+            message=message
+        ))
+        self.logger.log_enforce(service.id, service.name, observed.value,
+                                desired.value, success, message)
+    
+    def run(self, idle_priority: bool = True,
+            wait: Optional[Callable[[float], bool]] = None):
+        """Bucle principal hasta que se llame a stop()
+        
+        `wait(segundos)` debe retornar True para terminar (segundos es None si
+        no hay chequeos programados); por defecto espera hasta el próximo
+        chequeo, un aviso de notify_changed() o stop().
+        """
+        if idle_priority:
+            lower_priority()
+        wait = wait or self._wait
+        try:
+            while not self._stop.is_set():
+                delay = self.tick()
+                if wait(delay):
+                    break
+        finally:
+            if self._watcher is not None:
+                self._watcher.stop()
+                self._watcher = None
+    
+    def _wait(self, delay: Optional[float]) -> bool:
+        """Espera hasta el próximo chequeo o un aviso de cambio; True = parar"""
+        self._wake.wait(delay)
+        self._wake.clear()
+        return self._stop.is_set()
+    
+    def stop(self):
+        """Detiene run() tras el chequeo en curso"""
+        self._stop.set()
+        self._wake.set()
+
+
+def lower_priority():
+    """Baja la prioridad del proceso (y de los PowerShell que lance) a idle"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            IDLE_PRIORITY_CLASS = 0x00000040
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), IDLE_PRIORITY_CLASS)
+        else:
+            os.nice(19)
+    except Exception:
+        pass
@@ -1,14 +1,26 @@
 """
 Definición de servicios AI de Windows 11 y métodos para detectar/modificar
+El catálogo en sí está en services.json (ver catalog.py)
 """
 
+import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List, Dict, Any
-import subprocess
-import json
-import winreg
-import os
+from typing import Optional, List, Tuple
+
+
+# Identificadores de hive: cadenas internadas, independientes de winreg. Cada
+# backend de registro las traduce (WinRegistry a winreg.HKEY_*)
+HKLM = sys.intern("HKLM")
+HKCU = sys.intern("HKCU")
+HIVES = (HKLM, HKCU)
+
+
+def intern_hive(name: str) -> str:
+    """Identificador compartido de un hive; ValueError si no es HKLM/HKCU"""
+    if name not in HIVES:
+        raise ValueError(f"Hive desconocido: {name!r}")
+    return HIVES[HIVES.index(name)]
 
 
 class ServiceStatus(Enum):
@@ -18,232 +30,146 @@ class ServiceStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
-class AIService:
-    """Representa un servicio AI de Windows"""
+class _Rule:
+    """Base de las reglas: inmutables, con __slots__ y comparables por valor"""
+    __slots__ = ()
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+    
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __eq__(self, other):
+        return type(other) is type(self) and other._fields() == self._fields()
+    
+    def __hash__(self):
+        return hash(self._fields())
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class RegistryRule(_Rule):
+    """Valor DWORD de registro que activa o desactiva un servicio"""
+    __slots__ = ("hive", "path", "key", "disable_value", "enable_value")
+    
+    def __init__(self, hive: str, path: str, key: str, disable_value: int, enable_value: int):
+        init = object.__setattr__
+        init(self, "hive", intern_hive(hive))
+        init(self, "path", sys.intern(path))
+        init(self, "key", sys.intern(key))
+        init(self, "disable_value", disable_value)
+        init(self, "enable_value", enable_value)
+
+
+class AppxRule(_Rule):
+    """Paquete Appx que forma parte de un servicio"""
+    __slots__ = ("package",)
+    
+    def __init__(self, package: str):
+        object.__setattr__(self, "package", package)
+
+
+class FeatureRule(_Rule):
+    """Windows Optional Feature de un servicio"""
+    __slots__ = ("name",)
+    
+    def __init__(self, name: str):
+        object.__setattr__(self, "name", name)
+
+
+@dataclass(frozen=True, eq=False)
+class ServiceDefinition:
+    """Definición inmutable de un servicio, compilada desde el catálogo
+    
+    Se compara por identidad: cada definición existe una sola vez por catálogo.
+    """
+    __slots__ = ("id", "name", "description", "registry_rules", "appx_rules", "feature_rule")
+    
     id: str
     name: str
     description: str
-    status: ServiceStatus = ServiceStatus.UNKNOWN
-    
-    # Registry paths para detectar/modificar
-    registry_paths: List[Dict[str, Any]] = None
-    
-    # Appx package names
-    appx_packages: List[str] = None
-    
-    # Windows Feature name
-    windows_feature: Optional[str] = None
-
-
-# Definición de servicios AI conocidos
-AI_SERVICES = [
-    AIService(
-        id="copilot",
-        name="Microsoft Copilot",
-        description="Asistente AI integrado en Windows 11 con acceso a Bing Chat",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\WindowsCopilot",
-                "key": "TurnOffWindowsCopilot",
-                "disable_value": 1,
-                "enable_value": 0,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\Advanced",
-                "key": "ShowCopilotButton",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ],
-        appx_packages=[
-            "Microsoft.Copilot",
-            "Microsoft.Windows.Ai.Copilot.Provider"
-        ]
-    ),
-    AIService(
-        id="recall",
-        name="Windows Recall",
-        description="Captura snapshots de pantalla para búsqueda AI (Copilot+ PCs)",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\WindowsAI",
-                "key": "AllowRecallEnablement",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\WindowsAI",
-                "key": "DisableAIDataAnalysis",
-                "disable_value": 1,
-                "enable_value": 0,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            }
-        ],
-        windows_feature="Recall"
-    ),
-    AIService(
-        id="ai_explorer",
-        name="AI Explorer",
-        description="Funciones de exploración AI en Windows",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\WindowsAI",
-                "key": "DisableAIDataAnalysis",
-                "disable_value": 1,
-                "enable_value": 0,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            }
-        ],
-        appx_packages=[
-            "MicrosoftWindows.Client.AIX"
-        ]
-    ),
-    AIService(
-        id="bing_search",
-        name="Bing Search en Start Menu",
-        description="Integración de búsqueda web Bing en el menú inicio",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\Explorer",
-                "key": "DisableSearchBoxSuggestions",
-                "disable_value": 1,
-                "enable_value": 0,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\Search",
-                "key": "BingSearchEnabled",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ]
-    ),
-    AIService(
-        id="web_search",
-        name="Web Search en Taskbar",
-        description="Sugerencias web y AI en la búsqueda de la barra de tareas",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\Search",
-                "key": "CortanaConsent",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ]
-    ),
-    AIService(
-        id="windows_widgets",
-        name="Windows Widgets (AI News)",
-        description="Widgets con noticias personalizadas por AI en el escritorio",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Dsh",
-                "key": "AllowNewsAndInterests",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\Advanced",
-                "key": "TaskbarDa",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ],
-        appx_packages=[
-            "MicrosoftWindows.Client.WebExperience"
-        ]
-    ),
-    AIService(
-        id="cortana",
-        name="Cortana (Legacy)",
-        description="Asistente de voz Cortana (versión legacy)",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Windows\Windows Search",
-                "key": "AllowCortana",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\Search",
-                "key": "CortanaEnabled",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ],
-        appx_packages=[
-            "Microsoft.549981C3F5F10"
-        ]
-    ),
-    AIService(
-        id="edge_copilot",
-        name="Edge Copilot Sidebar",
-        description="Panel lateral de Copilot en Microsoft Edge",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Edge",
-                "key": "HubsSidebarEnabled",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            },
-            {
-                "path": r"SOFTWARE\Policies\Microsoft\Edge",
-                "key": "CopilotCDPPageContext",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_LOCAL_MACHINE
-            }
-        ]
-    ),
-    AIService(
-        id="ai_voice_typing",
-        name="AI Voice Typing",
-        description="Dictado por voz con transcripción AI mejorada",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Microsoft\Speech_OneCore\Preferences",
-                "key": "VoiceActivationEnableAboveLockscreen",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            },
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\CPSS\Store\VoiceActivation",
-                "key": "Value",
-                "disable_value": 0,
-                "enable_value": 1,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ]
-    ),
-    AIService(
-        id="suggested_actions",
-        name="Suggested Actions",
-        description="Acciones sugeridas por AI al copiar texto/fechas",
-        registry_paths=[
-            {
-                "path": r"SOFTWARE\Microsoft\Windows\CurrentVersion\SmartActionPlatform\SmartClipboard",
-                "key": "Disabled",
-                "disable_value": 1,
-                "enable_value": 0,
-                "hive": winreg.HKEY_CURRENT_USER
-            }
-        ]
-    )
-]
+    registry_rules: Tuple[RegistryRule, ...]
+    appx_rules: Tuple[AppxRule, ...]
+    feature_rule: Optional[FeatureRule]
+
+
+class AIService:
+    """Un servicio AI de Windows: definición del catálogo más su estado
+    
+    La definición es inmutable y compartida. Los servicios de un detector
+    están ligados a su SnapshotRef: `status` se lee de la instantánea
+    publicada y sólo cambia cuando el detector publica una nueva. Un
+    AIService suelto (sin `snapshots`) guarda su propio estado.
+    """
+    __slots__ = ("definition", "_status", "_snapshots")
+    
+    def __init__(self, definition: ServiceDefinition,
+                 status: ServiceStatus = ServiceStatus.UNKNOWN, snapshots=None):
+        self.definition = definition
+        self._status = status
+        self._snapshots = snapshots
+    
+    @property
+    def status(self) -> ServiceStatus:
+        if self._snapshots is not None:
+            return self._snapshots.current.status(self.definition.id)
+        return self._status
+    
+    @status.setter
+    def status(self, status: ServiceStatus):
+        if self._snapshots is not None:
+            raise AttributeError("El estado de un servicio del detector se publica con detector.publish()")
+        self._status = status
+    
+    @property
+    def id(self) -> str:
+        return self.definition.id
+    
+    @property
+    def name(self) -> str:
+        return self.definition.name
+    
+    @property
+    def description(self) -> str:
+        return self.definition.description
+    
+    @property
+    def registry_rules(self) -> Tuple[RegistryRule, ...]:
+        return self.definition.registry_rules
+    
+    @property
+    def appx_rules(self) -> Tuple[AppxRule, ...]:
+        return self.definition.appx_rules
+    
+    @property
+    def feature_rule(self) -> Optional[FeatureRule]:
+        return self.definition.feature_rule
+    
+    def __repr__(self):
+        return f"AIService(id={self.id!r}, status={self.status})"
 
 
 def get_all_services() -> List[AIService]:
-    """Retorna lista de todos los servicios AI definidos"""
-    return AI_SERVICES.copy()
+    """Retorna los servicios del catálogo, con un estado nuevo por llamada"""
+    from .catalog import default_catalog
+    return default_catalog().new_services()
+
+
+def get_service_artifacts(service: AIService) -> frozenset:
+    """Artefactos del sistema que modifica una acción sobre el servicio
+    
+    Dos acciones cuyos artefactos se solapan deben ejecutarse en orden.
+    Las Windows Features comparten una misma clave porque DISM no admite
+    operaciones concurrentes.
+    """
+    artifacts = {("service", service.id)}
+    for rule in service.registry_rules:
+        artifacts.add(("registry", rule.hive, rule.path.lower(), rule.key.lower()))
+    for rule in service.appx_rules:
+        artifacts.add(("appx", rule.package.lower()))
+    if service.feature_rule:
+        artifacts.add(("feature",))
+    return frozenset(artifacts)
@@ -0,0 +1,173 @@
+"""
+Perfiles compilados (bundles)
+Un perfil se compila de antemano en una lista congelada de operaciones: las
+escrituras de registro ya agrupadas por clave y ordenadas, y los pasos de
+Appx/Features. Aplicarlo no detecta nada; sólo escribe, así un paso de
+imagen de sistema tarda lo que tardan las escrituras.
+
+El bundle lleva el digest del catálogo con el que se compiló: si el
+catálogo cambió, se rechaza en lugar de aplicar operaciones viejas.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .ai_services import ServiceStatus, intern_hive
+from .catalog import Catalog, default_catalog
+from .profiles import resolve_profile, action_for, unknown_profile_message
+
+
+BUNDLE_FORMAT = 1
+
+
+class BundleError(ValueError):
+    """El bundle no se puede compilar o cargar"""
+
+
+class StaleBundleError(BundleError):
+    """El bundle se compiló contra otro catálogo"""
+
+
+@dataclass(frozen=True)
+class KeyWrite:
+    """Valores a escribir en una misma clave (se abre una sola vez)"""
+    __slots__ = ("hive", "path", "values", "owners")
+    
+    hive: str
+    path: str
+    values: Tuple[Tuple[str, int], ...]   # (nombre, valor)
+    owners: Tuple[Tuple[str, ...], ...]   # servicios de cada valor, en el mismo orden
+
+
+@dataclass(frozen=True)
+class ServiceOp:
+    """Paso que no es de registro: quitar un paquete Appx o cambiar una feature"""
+    __slots__ = ("service_id", "kind", "target", "action")
+    
+    service_id: str
+    kind: str      # "appx" o "feature"
+    target: str    # paquete o nombre de la feature
+    action: str    # "disable" o "enable"
+
+
+@dataclass(frozen=True)
+class ProfileBundle:
+    """Operaciones precompiladas de un perfil"""
+    __slots__ = ("profile", "catalog_digest", "actions", "writes", "ops")
+    
+    profile: str
+    catalog_digest: str
+    actions: Tuple[Tuple[str, str], ...]   # (service_id, "disable" | "enable"), orden del catálogo
+    writes: Tuple[KeyWrite, ...]
+    ops: Tuple[ServiceOp, ...]
+    
+    def check(self, catalog: Optional[Catalog] = None):
+        """Lanza StaleBundleError si `catalog` no es el de la compilación"""
+        catalog = catalog or default_catalog()
+        if catalog.digest != self.catalog_digest:
+            raise StaleBundleError(
+                f"El bundle '{self.profile}' se compiló con otro catálogo; vuelva a compilarlo"
+            )
+    
+    def to_dict(self) -> dict:
+        return {
+            "format": BUNDLE_FORMAT,
+            "profile": self.profile,
+            "catalog_digest": self.catalog_digest,
+            "actions": [list(action) for action in self.actions],
+            "writes": [
+                {"hive": write.hive, "path": write.path,
+                 "values": [list(value) for value in write.values],
+                 "owners": [list(owners) for owners in write.owners]}
+                for write in self.writes
+            ],
+            "ops": [
+                {"service_id": op.service_id, "kind": op.kind,
+                 "target": op.target, "action": op.action}
+                for op in self.ops
+            ],
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, source: str = "<bundle>") -> "ProfileBundle":
+        if not isinstance(data, dict) or data.get("format") != BUNDLE_FORMAT:
+            raise BundleError(f"{source}: formato de bundle no soportado")
+        try:
+            return cls(
+                profile=data["profile"],
+                catalog_digest=data["catalog_digest"],
+                actions=tuple((service_id, action) for service_id, action in data["actions"]),
+                writes=tuple(
+                    KeyWrite(intern_hive(write["hive"]), write["path"],
+                             tuple((name, value) for name, value in write["values"]),
+                             tuple(tuple(owners) for owners in write["owners"]))
+                    for write in data["writes"]
+                ),
+                ops=tuple(
+                    ServiceOp(op["service_id"], op["kind"], op["target"], op["action"])
+                    for op in data["ops"]
+                ),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise BundleError(f"{source}: bundle inválido: {e}")
+    
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, path: str) -> "ProfileBundle":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise BundleError(f"{path}: JSON inválido: {e}")
+        return cls.from_dict(data, path)
+
+
+def compile_bundle(profile: str, catalog: Optional[Catalog] = None) -> ProfileBundle:
+    """Compila un perfil del catálogo contra ese mismo catálogo
+    
+    Lanza BundleError si el perfil no existe o si dos servicios piden
+    valores distintos para el mismo valor de registro.
+    """
+    catalog = catalog or default_catalog()
+    if profile not in catalog.profiles:
+        raise BundleError(unknown_profile_message(profile, catalog))
+    targets = resolve_profile(profile, list(catalog), catalog)
+    
+    actions: List[Tuple[str, str]] = []
+    # {(hive, path en minúsculas): (path, {nombre: [valor, [servicios]]})}
+    keys: Dict[Tuple[str, str], Tuple[str, Dict[str, list]]] = {}
+    ops: List[ServiceOp] = []
+    for definition in catalog:
+        action = action_for(targets.get(definition.id, ServiceStatus.UNKNOWN))
+        if action is None:
+            continue
+        actions.append((definition.id, action))
+        
+        for rule in definition.registry_rules:
+            value = rule.disable_value if action == "disable" else rule.enable_value
+            _, values = keys.setdefault((rule.hive, rule.path.lower()), (rule.path, {}))
+            entry = values.setdefault(rule.key, [value, []])
+            if entry[0] != value:
+                raise BundleError(
+                    f"{profile}: {rule.hive}\\{rule.path}\\{rule.key} recibe {entry[0]} y {value}"
+                )
+            entry[1].append(definition.id)
+        
+        # Como disable_service/enable_service: los paquetes sólo se quitan
+        if action == "disable":
+            ops.extend(ServiceOp(definition.id, "appx", rule.package, action)
+                       for rule in definition.appx_rules)
+        if definition.feature_rule:
+            ops.append(ServiceOp(definition.id, "feature", definition.feature_rule.name, action))
+    
+    writes = tuple(
+        KeyWrite(hive, path,
+                 tuple((name, entry[0]) for name, entry in values.items()),
+                 tuple(tuple(entry[1]) for entry in values.values()))
+        for (hive, _), (path, values) in sorted(keys.items())
+    )
+    return ProfileBundle(profile, catalog.digest, tuple(actions), writes, tuple(ops))
@@ -0,0 +1,312 @@
+"""
+Catálogo de servicios AI
+Las definiciones se leen de un archivo JSON declarativo (services.json), se
+validan contra el esquema y se compilan una sola vez en definiciones
+inmutables con índices por id, por clave de registro (hive, path) y por
+paquete Appx. El estado detectado vive aparte, en cada AIService. Los
+perfiles (estado deseado por servicio) se declaran en el mismo archivo.
+
+Formato:
+    {
+      "version": 1,
+      "services": [
+        {
+          "id": "copilot",                      # único, [a-z0-9_]
+          "name": "...", "description": "...",
+          "registry_paths": [                   # opcional
+            {"hive": "HKLM" | "HKCU", "path": "...", "key": "...",
+             "disable_value": 1, "enable_value": 0}
+          ],
+          "appx_packages": ["..."],             # opcional
+          "windows_feature": "..."              # opcional
+        }
+      ],
+      "profiles": {                             # opcional
+        "disable-all-ai": {"*": "disabled", "ai_voice_typing": "enabled"}
+      }                                         # "*": servicios no nombrados
+    }
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .ai_services import (
+    AIService, ServiceDefinition, ServiceStatus, RegistryRule, AppxRule, FeatureRule, HIVES
+)
+
+
+CATALOG_VERSION = 1
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "services.json")
+# Catálogos adicionales (extensiones), separados por os.pathsep
+CATALOG_ENV = "WIN_AI_TOOLS_CATALOG"
+
+_ID_PATTERN = re.compile(r"^[a-z0-9_]+$")
+_PROFILE_PATTERN = re.compile(r"^[a-z0-9-]+$")
+# Estados que un perfil puede imponer
+_PROFILE_STATES = (ServiceStatus.DISABLED.value, ServiceStatus.ENABLED.value)
+
+# Esquema: {campo: (tipos admitidos, obligatorio)}
+_SERVICE_SCHEMA = {
+    "id": (str, True),
+    "name": (str, True),
+    "description": (str, True),
+    "registry_paths": (list, False),
+    "appx_packages": (list, False),
+    "windows_feature": ((str, type(None)), False),
+}
+_RULE_SCHEMA = {
+    "hive": (str, True),
+    "path": (str, True),
+    "key": (str, True),
+    "disable_value": (int, True),
+    "enable_value": (int, True),
+}
+
+
+class CatalogError(ValueError):
+    """El catálogo no cumple el esquema; el mensaje indica archivo y campo"""
+
+
+class Catalog:
+    """Conjunto inmutable de definiciones con índices precalculados
+    
+    `profiles` es {nombre: {service_id o "*": ServiceStatus}}.
+    """
+    
+    def __init__(self, definitions: Iterable[ServiceDefinition],
+                 profiles: Optional[Mapping[str, Mapping[str, ServiceStatus]]] = None):
+        self.services: Tuple[ServiceDefinition, ...] = tuple(definitions)
+        self.profiles: Mapping[str, Mapping[str, ServiceStatus]] = MappingProxyType({
+            name: MappingProxyType(dict(targets)) for name, targets in (profiles or {}).items()
+        })
+        
+        by_id: Dict[str, ServiceDefinition] = {}
+        by_key: Dict[Tuple[str, str], List[ServiceDefinition]] = {}
+        by_package: Dict[str, List[ServiceDefinition]] = {}
+        for definition in self.services:
+            by_id[definition.id] = definition
+            for rule in definition.registry_rules:
+                owners = by_key.setdefault((rule.hive, rule.path.lower()), [])
+                if not owners or owners[-1] is not definition:
+                    owners.append(definition)
+            for rule in definition.appx_rules:
+                by_package.setdefault(rule.package.lower(), []).append(definition)
+        
+        self.by_id: Mapping[str, ServiceDefinition] = MappingProxyType(by_id)
+        self.by_registry_key: Mapping[Tuple[str, str], Tuple[ServiceDefinition, ...]] = \
+            MappingProxyType({key: tuple(owners) for key, owners in by_key.items()})
+        self.by_package: Mapping[str, Tuple[ServiceDefinition, ...]] = \
+            MappingProxyType({package: tuple(owners) for package, owners in by_package.items()})
+        self._positions = {definition.id: index for index, definition in enumerate(self.services)}
+        self._digest: Optional[str] = None
+    
+    @property
+    def digest(self) -> str:
+        """SHA-256 de lo que el catálogo escribe (ids y reglas, no textos)
+        
+        Cambia cuando cambia alguna operación; sirve para rechazar bundles
+        compilados contra otro catálogo.
+        """
+        if self._digest is None:
+            canonical = [
+                [definition.id,
+                 [[rule.hive, rule.path, rule.key, rule.disable_value, rule.enable_value]
+                  for rule in definition.registry_rules],
+                 [rule.package for rule in definition.appx_rules],
+                 definition.feature_rule.name if definition.feature_rule else None]
+                for definition in self.services
+            ]
+            encoded = json.dumps(canonical, separators=(",", ":")).encode("utf-8")
+            self._digest = hashlib.sha256(encoded).hexdigest()
+        return self._digest
+    
+    def __len__(self) -> int:
+        return len(self.services)
+    
+    def __iter__(self) -> Iterator[ServiceDefinition]:
+        return iter(self.services)
+    
+    def __contains__(self, service_id: str) -> bool:
+        return service_id in self.by_id
+    
+    def get(self, service_id: str) -> Optional[ServiceDefinition]:
+        return self.by_id.get(service_id)
+    
+    def position(self, service_id: str) -> int:
+        """Posición del servicio en el orden del catálogo (KeyError si no existe)"""
+        return self._positions[service_id]
+    
+    def services_for_key(self, hive, path: str) -> Tuple[ServiceDefinition, ...]:
+        """Servicios con reglas en una clave del registro"""
+        return self.by_registry_key.get((hive, path.lower()), ())
+    
+    def services_for_package(self, package: str) -> Tuple[ServiceDefinition, ...]:
+        """Servicios que incluyen un paquete Appx"""
+        return self.by_package.get(package.lower(), ())
+    
+    def new_services(self, snapshots=None) -> List[AIService]:
+        """Un AIService por definición, en orden del catálogo
+        
+        Con `snapshots` (SnapshotRef) el estado se lee de la instantánea
+        publicada; sin él, cada AIService guarda el suyo.
+        """
+        return [AIService(definition, snapshots=snapshots) for definition in self.services]
+
+
+def _check_fields(data: Any, schema: Dict[str, tuple], where: str):
+    if not isinstance(data, dict):
+        raise CatalogError(f"{where}: se esperaba un objeto")
+    unknown = set(data) - set(schema)
+    if unknown:
+        raise CatalogError(f"{where}: campos desconocidos: {', '.join(sorted(unknown))}")
+    for name, (types, required) in schema.items():
+        if name not in data:
+            if required:
+                raise CatalogError(f"{where}: falta el campo '{name}'")
+            continue
+        value = data[name]
+        # bool es subclase de int, pero true/false no es un valor DWORD válido
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise CatalogError(f"{where}.{name}: tipo inválido ({type(value).__name__})")
+
+
+def _compile_rule(data: Any, where: str) -> RegistryRule:
+    _check_fields(data, _RULE_SCHEMA, where)
+    if data["hive"] not in HIVES:
+        raise CatalogError(f"{where}.hive: debe ser {' o '.join(HIVES)}")
+    if not data["path"] or not data["key"]:
+        raise CatalogError(f"{where}: path y key no pueden estar vacíos")
+    return RegistryRule(**data)
+
+
+def _compile_service(data: Any, where: str) -> ServiceDefinition:
+    _check_fields(data, _SERVICE_SCHEMA, where)
+    if not _ID_PATTERN.match(data["id"]):
+        raise CatalogError(f"{where}.id: '{data['id']}' no cumple [a-z0-9_]+")
+    
+    packages = data.get("appx_packages", [])
+    for index, package in enumerate(packages):
+        if not isinstance(package, str) or not package:
+            raise CatalogError(f"{where}.appx_packages[{index}]: se esperaba un nombre de paquete")
+    
+    feature = data.get("windows_feature")
+    return ServiceDefinition(
+        id=data["id"],
+        name=data["name"],
+        description=data["description"],
+        registry_rules=tuple(
+            _compile_rule(rule, f"{where}.registry_paths[{index}]")
+            for index, rule in enumerate(data.get("registry_paths", []))
+        ),
+        appx_rules=tuple(AppxRule(package) for package in packages),
+        feature_rule=FeatureRule(feature) if feature else None,
+    )
+
+
+def parse_catalog(data: Any, source: str = "<catálogo>") -> List[ServiceDefinition]:
+    """Valida un catálogo ya decodificado y compila sus definiciones
+    
+    Lanza CatalogError en el primer problema encontrado.
+    """
+    if not isinstance(data, dict):
+        raise CatalogError(f"{source}: se esperaba un objeto")
+    if data.get("version") != CATALOG_VERSION:
+        raise CatalogError(f"{source}: versión no soportada: {data.get('version')!r}")
+    services = data.get("services")
+    if not isinstance(services, list):
+        raise CatalogError(f"{source}: 'services' debe ser una lista")
+    
+    definitions = []
+    seen = set()
+    for index, service in enumerate(services):
+        definition = _compile_service(service, f"{source}: services[{index}]")
+        if definition.id in seen:
+            raise CatalogError(f"{source}: services[{index}].id: '{definition.id}' duplicado")
+        seen.add(definition.id)
+        definitions.append(definition)
+    return definitions
+
+
+def parse_profiles(data: Any, source: str = "<catálogo>") -> Dict[str, Dict[str, ServiceStatus]]:
+    """Valida y compila la sección "profiles" de un catálogo ya decodificado
+    
+    Sólo revisa la forma; que los servicios nombrados existan se comprueba
+    al cargar, con todos los archivos. Lanza CatalogError.
+    """
+    profiles = data.get("profiles", {}) if isinstance(data, dict) else {}
+    if not isinstance(profiles, dict):
+        raise CatalogError(f"{source}: 'profiles' debe ser un objeto")
+    compiled = {}
+    for name, targets in profiles.items():
+        where = f"{source}: profiles.{name}"
+        if not _PROFILE_PATTERN.match(name):
+            raise CatalogError(f"{where}: el nombre no cumple [a-z0-9-]+")
+        if not isinstance(targets, dict) or not targets:
+            raise CatalogError(f"{where}: se esperaba un objeto no vacío")
+        for service_id, state in targets.items():
+            if state not in _PROFILE_STATES:
+                raise CatalogError(
+                    f"{where}.{service_id}: debe ser {' o '.join(_PROFILE_STATES)}"
+                )
+        compiled[name] = {service_id: ServiceStatus(state) for service_id, state in targets.items()}
+    return compiled
+
+
+def load_catalog(*paths: str) -> Catalog:
+    """Carga y compila uno o más archivos de catálogo
+    
+    Los servicios y perfiles de archivos posteriores se agregan al final;
+    un id o un perfil repetido entre archivos es un error, igual que un
+    perfil que nombra un servicio que ningún archivo define.
+    """
+    definitions = []
+    seen = {}
+    profiles: Dict[str, Dict[str, ServiceStatus]] = {}
+    profile_sources: Dict[str, str] = {}
+    for path in paths or (CATALOG_FILE,):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise CatalogError(f"{path}: JSON inválido: {e}")
+        for definition in parse_catalog(data, path):
+            if definition.id in seen:
+                raise CatalogError(f"{path}: '{definition.id}' ya está definido en {seen[definition.id]}")
+            seen[definition.id] = path
+            definitions.append(definition)
+        for name, targets in parse_profiles(data, path).items():
+            if name in profiles:
+                raise CatalogError(f"{path}: el perfil '{name}' ya está definido en {profile_sources[name]}")
+            profile_sources[name] = path
+            profiles[name] = targets
+    
+    for name, targets in profiles.items():
+        for service_id in targets:
+            if service_id != "*" and service_id not in seen:
+                raise CatalogError(
+                    f"{profile_sources[name]}: profiles.{name}: servicio desconocido '{service_id}'"
+                )
+    return Catalog(definitions, profiles)
+
+
+_default_catalog: Optional[Catalog] = None
+_default_lock = threading.Lock()
+
+
+def default_catalog() -> Catalog:
+    """Catálogo incluido más las extensiones de WIN_AI_TOOLS_CATALOG
+    
+    Se compila en el primer uso y se comparte: es inmutable.
+    """
+    global _default_catalog
+    if _default_catalog is None:
+        with _default_lock:
+            if _default_catalog is None:
+                extra = [path for path in os.environ.get(CATALOG_ENV, "").split(os.pathsep) if path]
+                _default_catalog = load_catalog(CATALOG_FILE, *extra)
+    return _default_catalog
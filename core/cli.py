@@ -0,0 +1,525 @@
+"""
+Interfaz de línea de comandos sin interfaz gráfica
+Uso: python -m core <comando> [opciones]
+
+Sólo importa `core`: nunca PyQt6. detector/manager (y con ellos winreg) se
+importan dentro de cada comando, así `--help` y `log query` arrancan rápido
+y funcionan fuera de Windows.
+
+Códigos de salida:
+    0  OK (en `plan`: el sistema ya cumple el estado deseado)
+    1  una o más acciones fallaron
+    2  uso incorrecto (argumentos, servicio o perfil desconocido)
+    3  `plan`: hay cambios pendientes
+       (`agent` termina con 1 si alguna corrección falló)
+    4  no hay backups para restaurar
+    5  plataforma no soportada (winreg no disponible)
+    6  `--server`: no hay un servidor corriendo (ver `python -m core serve`)
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CHANGES_PENDING = 3
+EXIT_NOT_FOUND = 4
+EXIT_UNSUPPORTED = 5
+EXIT_NO_SERVER = 6
+
+
+class UsageError(Exception):
+    """Argumentos válidos para argparse pero inválidos para el comando"""
+
+
+class NoServerError(Exception):
+    """`--server` sin un servidor escuchando en la dirección"""
+
+
+class RemoteFailure(Exception):
+    """El servidor respondió con un error que no es de uso"""
+
+
+def _remote(args, method: str, **params):
+    """Ejecuta `method` en el servidor local indicado por --server"""
+    from .server import connect, default_address, RpcError, INVALID_PARAMS
+    client = connect(args.server or None)
+    if client is None:
+        raise NoServerError(f"No hay un servidor en {args.server or default_address()}")
+    try:
+        with client:
+            return client.call(method, **params)
+    except RpcError as e:
+        if e.code == INVALID_PARAMS:
+            raise UsageError(e.message)
+        raise RemoteFailure(e.message)
+
+
+def _detector(service_ids: Optional[List[str]] = None, offline: Optional[List[str]] = None):
+    """Detector limitado opcionalmente a algunos servicios
+    
+    Con `offline` lee exportaciones .reg en lugar del registro del sistema.
+    """
+    from .detector import AIServiceDetector
+    registry = None
+    if offline:
+        from .registry import OfflineRegistry
+        try:
+            registry = OfflineRegistry(*offline)
+        except OSError as e:
+            raise UsageError(f"No se pudo leer {e.filename}: {e.strerror}")
+    # Los probes de PowerShell consultarían este sistema, no el exportado
+    detector = AIServiceDetector(registry=registry, probes=not offline)
+    if service_ids:
+        known = {service.id for service in detector.services}
+        unknown = [service_id for service_id in service_ids if service_id not in known]
+        if unknown:
+            raise UsageError(f"Servicios desconocidos: {', '.join(unknown)}")
+        detector.services = [s for s in detector.services if s.id in service_ids]
+    return detector
+
+
+def _split_ids(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def _service_json(service, snapshot) -> dict:
+    """Fila de detect: estado y evidencia según la instantánea publicada"""
+    observation = snapshot.get(service.id)
+    return {
+        "id": service.id,
+        "name": service.name,
+        "status": snapshot.status(service.id).value,
+        "source": observation.source if observation else "none",
+        "evidence": observation.evidence if observation else "",
+        "version": snapshot.version,
+    }
+
+
+def _targets(args, services):
+    """Estado deseado según --profile o --services/--enable"""
+    from .profiles import targets_for, profile_names, unknown_profile_message
+    if args.profile and args.profile not in profile_names():
+        raise UsageError(unknown_profile_message(args.profile))
+    return targets_for(services, args.profile, args.enable)
+
+
+def _plan(args):
+    """(detector, plan, captura) para los comandos plan y apply
+    
+    El estado se deriva de una sola captura agrupada del sistema, que
+    apply reutiliza para el backup previo.
+    """
+    from .profiles import build_plan
+    detector = _detector(_split_ids(args.services), getattr(args, "offline", None))
+    state = detector.capture_state()
+    services = detector.detect_from_state(state)
+    return detector, build_plan(services, _targets(args, services)), state
+
+
+def _target_params(args) -> dict:
+    """Parámetros de plan/apply para el servidor"""
+    return {"profile": args.profile, "service_ids": _split_ids(args.services) or None,
+            "enable": args.enable}
+
+
+def cmd_detect(args) -> int:
+    if args.server is not None:
+        rows = _remote(args, "detect", service_ids=_split_ids(args.services) or None)
+    else:
+        detector = _detector(_split_ids(args.services), args.offline)
+        services = detector.detect_all()
+        snapshot = detector.snapshot
+        rows = [_service_json(service, snapshot) for service in services]
+    
+    if args.json:
+        _print_json(rows)
+    else:
+        for row in rows:
+            print(f"{row['id']:<20} {row['status']:<14} {row['name']}")
+    return EXIT_OK
+
+
+def cmd_plan(args) -> int:
+    if args.server is not None:
+        plan = _remote(args, "plan", **_target_params(args))
+    else:
+        plan = [
+            {"id": step.service.id, "action": step.action,
+             "current": step.current.value, "desired": step.desired.value}
+            for step in _plan(args)[1]
+        ]
+    
+    if args.json:
+        _print_json(plan)
+    elif not plan:
+        print("Sin cambios: el sistema ya cumple el estado deseado")
+    else:
+        for step in plan:
+            print(f"{step['action']:<8} {step['id']:<20} ({step['current']} -> {step['desired']})")
+    return EXIT_CHANGES_PENDING if plan else EXIT_OK
+
+
+def cmd_apply(args) -> int:
+    if args.bundle:
+        if args.server is not None:
+            raise UsageError("--bundle se ejecuta en este proceso: no admite --server")
+        results = _apply_bundle(args)
+        if results is None:
+            return EXIT_FAILED
+    elif args.server is not None:
+        results = _remote(args, "apply", backup=not args.no_backup,
+                          **_target_params(args))["results"]
+    else:
+        results = _apply_local(args)
+        if results is None:
+            return EXIT_FAILED
+    
+    if args.json:
+        _print_json(results)
+    elif not results:
+        print("Sin cambios: el sistema ya cumple el estado deseado")
+    else:
+        for result in results:
+            print(f"{'OK' if result['success'] else 'ERROR':<6} {result['action']:<8} "
+                  f"{result['id']:<20} {result['message']}")
+    
+    return EXIT_OK if all(result["success"] for result in results) else EXIT_FAILED
+
+
+def _apply_local(args) -> Optional[List[dict]]:
+    """Aplica el plan en este proceso; None si falló el backup previo"""
+    from .manager import AIServiceManager
+    from .logger import activity_logger
+    
+    detector, plan, state = _plan(args)
+    results = []
+    
+    if plan:
+        manager = AIServiceManager()
+        if not args.no_backup:
+            success, result = manager.create_backup(detector.services, state=state)
+            activity_logger.log_backup(success, result)
+            if not success:
+                print(f"No se pudo crear el backup previo: {result}", file=sys.stderr)
+                return None
+        
+        for step in plan:
+            if step.action == "disable":
+                success, message = manager.disable_service(step.service)
+                activity_logger.log_disable(step.service.id, step.service.name, success, message)
+            else:
+                success, message = manager.enable_service(step.service)
+                activity_logger.log_enable(step.service.id, step.service.name, success, message)
+            results.append({"id": step.service.id, "action": step.action,
+                            "success": success, "message": message})
+    return results
+
+
+def _load_bundle(name: str):
+    """Bundle desde un archivo compilado o, si no es un archivo, compilando el perfil"""
+    from .bundles import BundleError, ProfileBundle, compile_bundle
+    try:
+        bundle = ProfileBundle.load(name) if os.path.isfile(name) else compile_bundle(name)
+        bundle.check()
+    except OSError as e:
+        raise UsageError(f"No se pudo leer {name}: {e.strerror}")
+    except BundleError as e:
+        raise UsageError(str(e))
+    return bundle
+
+
+def _apply_bundle(args) -> Optional[List[dict]]:
+    """Ejecuta un perfil compilado sin detectar; None si falló el backup previo"""
+    from .catalog import default_catalog
+    from .manager import AIServiceManager
+    from .logger import activity_logger
+    
+    bundle = _load_bundle(args.bundle)
+    catalog = default_catalog()
+    manager = AIServiceManager()
+    if not args.no_backup:
+        success, result = manager.create_backup(catalog.new_services())
+        activity_logger.log_backup(success, result)
+        if not success:
+            print(f"No se pudo crear el backup previo: {result}", file=sys.stderr)
+            return None
+    
+    results = []
+    for service_id, action, success, message in manager.apply_bundle(bundle, catalog):
+        name = catalog.get(service_id).name
+        if action == "disable":
+            activity_logger.log_disable(service_id, name, success, message)
+        else:
+            activity_logger.log_enable(service_id, name, success, message)
+        results.append({"id": service_id, "action": action,
+                        "success": success, "message": message})
+    return results
+
+
+def cmd_bundle(args) -> int:
+    from .bundles import BundleError, compile_bundle
+    try:
+        bundle = compile_bundle(args.profile)
+    except BundleError as e:
+        raise UsageError(str(e))
+    
+    if args.output:
+        bundle.save(args.output)
+        print(f"{args.output}: {len(bundle.actions)} servicios, {len(bundle.writes)} claves, "
+              f"{len(bundle.ops)} pasos Appx/Features")
+    else:
+        _print_json(bundle.to_dict())
+    return EXIT_OK
+
+
+def cmd_backup(args) -> int:
+    from .manager import AIServiceManager
+    from .logger import activity_logger
+    
+    detector = _detector()
+    success, result = AIServiceManager().create_backup(detector.services)
+    activity_logger.log_backup(success, result)
+    
+    if args.json:
+        _print_json({"success": success, "path" if success else "error": result})
+    else:
+        print(result, file=sys.stdout if success else sys.stderr)
+    return EXIT_OK if success else EXIT_FAILED
+
+
+def cmd_restore(args) -> int:
+    from .manager import AIServiceManager
+    from .logger import activity_logger
+    
+    manager = AIServiceManager()
+    path = args.path
+    if not path:
+        backups = manager.get_backups()
+        if not backups:
+            print("No hay backups disponibles", file=sys.stderr)
+            return EXIT_NOT_FOUND
+        path = backups[0]["path"]
+    
+    changed = set()
+    success, message = manager.restore_backup(path, changed_services=changed)
+    activity_logger.log_restore(success, message)
+    
+    if args.json:
+        _print_json({"success": success, "path": path, "message": message,
+                     "changed_services": sorted(changed)})
+    else:
+        print(message, file=sys.stdout if success else sys.stderr)
+    return EXIT_OK if success else EXIT_FAILED
+
+
+def cmd_log_query(args) -> int:
+    filters = dict(start=args.start, end=args.end, service_id=args.service,
+                   action=args.action, level=args.level, text=args.text, limit=args.limit)
+    if args.server is not None:
+        entries = _remote(args, "log.query", **filters)["entries"]
+    else:
+        from .logger import activity_logger
+        entries = [entry.to_dict() for entry in activity_logger.query(**filters).entries]
+    
+    if args.json:
+        _print_json(entries)
+    else:
+        for entry in entries:
+            print(f"{entry['timestamp']}  {entry['level']:<8} {entry['action']:<9} "
+                  f"{entry['service_id']:<18} {entry['message']}")
+    return EXIT_OK
+
+
+def cmd_serve(args) -> int:
+    from .server import ServiceServer
+    
+    server = ServiceServer(args.address, cache_ttl=args.cache_ttl)
+    try:
+        server.start(watch=not args.no_watch)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_FAILED
+    print(f"Servidor escuchando en {server.address} (Ctrl+C para salir)", file=sys.stderr)
+    try:
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return EXIT_OK
+
+
+def cmd_agent(args) -> int:
+    from .agent import EnforcementAgent
+    
+    detector = _detector(_split_ids(args.services))
+    agent = EnforcementAgent(
+        _targets(args, detector.services),
+        detector=detector,
+        registry_interval=args.registry_interval,
+        probe_interval=None if args.no_probes else args.probe_interval
+    )
+    if not args.no_watch:
+        agent.watch()
+    print(f"Agente activo: {len(agent.intervals())} chequeos (Ctrl+C para salir)", file=sys.stderr)
+    try:
+        agent.run(idle_priority=not args.normal_priority)
+    except KeyboardInterrupt:
+        agent.stop()
+    
+    if args.json:
+        _print_json(agent.stats)
+    else:
+        print(" ".join(f"{name}={value}" for name, value in agent.stats.items()))
+    return EXIT_OK if agent.stats["failures"] == 0 else EXIT_FAILED
+
+
+def _positive_int(value: str) -> int:
+    """Tipo de argparse para enteros mayores que cero"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"se esperaba un entero: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que cero: {number}")
+    return number
+
+
+def _add_offline_option(command):
+    command.add_argument("--offline", action="append", metavar="ARCHIVO.reg",
+                         help="leer el registro de una exportación .reg (repetible); "
+                              "funciona fuera de Windows")
+
+
+def _add_server_option(command):
+    command.add_argument("--server", nargs="?", const="", metavar="DIRECCIÓN",
+                         help="usar el servidor local (python -m core serve) en lugar de "
+                              "detectar en este proceso")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Gestiona servicios AI de Windows sin interfaz gráfica"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    detect = commands.add_parser("detect", help="detecta el estado de los servicios")
+    detect.add_argument("--services", help="ids separados por coma (por defecto: todos)")
+    detect.add_argument("--json", action="store_true", help="salida JSON")
+    _add_offline_option(detect)
+    _add_server_option(detect)
+    detect.set_defaults(func=cmd_detect)
+    
+    for name, func, help_text in (
+        ("plan", cmd_plan, "muestra los cambios necesarios sin aplicarlos"),
+        ("apply", cmd_apply, "aplica los cambios necesarios"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        target = command.add_mutually_exclusive_group(required=True)
+        target.add_argument("--services", help="ids separados por coma")
+        target.add_argument("--profile", help="perfil predefinido (p. ej. disable-all-ai)")
+        command.add_argument("--enable", action="store_true",
+                             help="con --services: habilitar en lugar de deshabilitar")
+        command.add_argument("--json", action="store_true", help="salida JSON")
+        if name == "apply":
+            target.add_argument("--bundle", metavar="ARCHIVO|PERFIL",
+                                help="aplica un perfil compilado (python -m core bundle) "
+                                     "sin detectar el estado actual")
+            command.add_argument("--no-backup", action="store_true",
+                                 help="no crear un backup antes de aplicar")
+        else:
+            _add_offline_option(command)
+        _add_server_option(command)
+        command.set_defaults(func=func)
+    
+    bundle = commands.add_parser("bundle", help="compila un perfil en un bundle de operaciones")
+    bundle.add_argument("profile", help="perfil predefinido (p. ej. disable-all-ai)")
+    bundle.add_argument("-o", "--output", metavar="ARCHIVO",
+                        help="archivo de salida (por defecto: JSON por la salida estándar)")
+    bundle.set_defaults(func=cmd_bundle)
+    
+    agent = commands.add_parser("agent", help="mantiene el estado deseado mientras corre")
+    target = agent.add_mutually_exclusive_group(required=True)
+    target.add_argument("--services", help="ids separados por coma")
+    target.add_argument("--profile", help="perfil predefinido (p. ej. disable-all-ai)")
+    agent.add_argument("--enable", action="store_true",
+                       help="con --services: mantener habilitados en lugar de deshabilitados")
+    agent.add_argument("--registry-interval", type=float, default=60.0,
+                       help="segundos entre chequeos de registro (por defecto 60)")
+    agent.add_argument("--probe-interval", type=float, default=3600.0,
+                       help="segundos entre probes de Appx/Features (por defecto 3600)")
+    agent.add_argument("--no-probes", action="store_true", help="sólo chequeos de registro")
+    agent.add_argument("--no-watch", action="store_true",
+                       help="no vigilar cambios del registro; sólo chequeos periódicos")
+    agent.add_argument("--normal-priority", action="store_true",
+                       help="no bajar la prioridad del proceso a idle")
+    agent.add_argument("--json", action="store_true", help="estadísticas finales en JSON")
+    agent.set_defaults(func=cmd_agent)
+    
+    backup = commands.add_parser("backup", help="crea un backup de la configuración actual")
+    backup.add_argument("--json", action="store_true", help="salida JSON")
+    backup.set_defaults(func=cmd_backup)
+    
+    restore = commands.add_parser("restore", help="restaura un backup (por defecto el más reciente)")
+    restore.add_argument("path", nargs="?", help="archivo de backup")
+    restore.add_argument("--json", action="store_true", help="salida JSON")
+    restore.set_defaults(func=cmd_restore)
+    
+    log = commands.add_parser("log", help="consulta el registro de actividades")
+    log_commands = log.add_subparsers(dest="log_command", required=True)
+    query = log_commands.add_parser("query", help="lista entradas, más recientes primero")
+    query.add_argument("--start", help="fecha/hora inicial (YYYY-MM-DD[ HH:MM:SS])")
+    query.add_argument("--end", help="fecha/hora final")
+    query.add_argument("--service", help="id de servicio")
+    query.add_argument("--action", help="acción (DETECTION, DISABLE, ENABLE, BACKUP, RESTORE)")
+    query.add_argument("--level", help="nivel (info, success, warning, error)")
+    query.add_argument("--text", help="texto a buscar en el mensaje")
+    query.add_argument("--limit", type=_positive_int, default=50)
+    query.add_argument("--json", action="store_true", help="salida JSON")
+    _add_server_option(query)
+    query.set_defaults(func=cmd_log_query)
+    
+    serve = commands.add_parser("serve", help="servidor local JSON-RPC con un detector compartido")
+    serve.add_argument("--address", help="named pipe o socket (por defecto: el del usuario)")
+    serve.add_argument("--cache-ttl", type=float, default=30.0,
+                       help="segundos que vale un estado detectado (por defecto 30)")
+    serve.add_argument("--no-watch", action="store_true",
+                       help="no invalidar la caché al cambiar el registro")
+    serve.set_defaults(func=cmd_serve)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except UsageError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+    except NoServerError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_NO_SERVER
+    except RemoteFailure as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_FAILED
+    except ImportError as e:
+        if getattr(e, "name", None) == "winreg":
+            print("Este comando requiere Windows (winreg no disponible)", file=sys.stderr)
+            return EXIT_UNSUPPORTED
+        raise
+    finally:
+        # Vaciar la cola del logger si algún comando lo usó
+        if "core.logger" in sys.modules:
+            sys.modules["core.logger"].activity_logger.close()
@@ -3,130 +3,230 @@ Detector de servicios AI
 Verifica el estado actual de cada servicio en el sistema
 """
 
-import winreg
-import subprocess
-from typing import List, Optional
-from .ai_services import AIService, ServiceStatus, get_all_services
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Iterable, Iterator, Callable, Dict, Any, Tuple, FrozenSet
+from .ai_services import AIService, ServiceStatus
+from .catalog import Catalog, default_catalog
+from .registry import RegistryBackend, WinRegistry
+from .snapshot import DetectionSnapshot, Observation, SnapshotRef
+from .system_state import SystemState, capture_state, read_appx_inventory, read_feature_states
+
+
+class _AppxInventory:
+    """Inventario Appx de una pasada: se consulta una vez, la primera vez
+    que un servicio lo necesita, aunque lo pidan varios hilos a la vez"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._read = False
+        self._packages: Optional[FrozenSet[str]] = None
+    
+    def __call__(self) -> Optional[FrozenSet[str]]:
+        with self._lock:
+            if not self._read:
+                self._packages = read_appx_inventory()
+                self._read = True
+            return self._packages
 
 
 class AIServiceDetector:
     """Detecta y verifica el estado de servicios AI en Windows"""
     
-    def __init__(self):
-        self.services = get_all_services()
+    def __init__(self, max_workers: int = 4, registry: Optional[RegistryBackend] = None,
+                 catalog: Optional[Catalog] = None, probes: bool = True):
+        self.catalog = catalog or default_catalog()
+        # Estado detectado: instantáneas inmutables publicadas por reemplazo
+        self.snapshots = SnapshotRef()
+        self.services = self.catalog.new_services(self.snapshots)
+        self._by_id = {service.id: service for service in self.services}
+        self.registry = registry or WinRegistry()
+        self.max_workers = max_workers
+        # Sin probes sólo se consulta el registro (p. ej. con un backend offline)
+        self.probes = probes
+        # Métricas de la última pasada completa de detección
+        self.last_pass_stats: Dict[str, Any] = {}
     
-    def detect_all(self) -> List[AIService]:
-        """Detecta el estado de todos los servicios AI"""
-        for service in self.services:
-            service.status = self._detect_service_status(service)
+    def detect_all(self, on_result: Optional[Callable[[AIService, int, int], None]] = None,
+                   service_ids: Optional[Iterable[str]] = None) -> List[AIService]:
+        """Detecta el estado de todos los servicios AI
+        
+        `on_result(service, done, total)` se llama cada vez que se conoce el
+        estado de un servicio. Con `service_ids` sólo se re-detectan esos
+        servicios. Retorna los servicios en el orden del catálogo.
+        """
+        targets = self._select(service_ids)
+        total = len(targets)
+        for done, service in enumerate(self.detect_iter(service_ids), start=1):
+            if on_result:
+                on_result(service, done, total)
         return self.services
     
+    def _select(self, service_ids: Optional[Iterable[str]]) -> List[AIService]:
+        if service_ids is None:
+            return self.services
+        wanted = set(service_ids)
+        return [service for service in self.services if service.id in wanted]
+    
+    def detect_iter(self, service_ids: Optional[Iterable[str]] = None) -> Iterator[AIService]:
+        """Detecta servicios en paralelo y los entrega a medida que terminan
+        
+        Un probe lento (PowerShell) no retrasa a los servicios que sólo
+        dependen del registro. El inventario Appx se consulta a lo sumo una
+        vez por pasada. Cada resultado se publica como una nueva instantánea
+        antes de entregar el servicio.
+        """
+        targets = self._select(service_ids)
+        start = time.perf_counter()
+        first_result = None
+        pass_id = self.snapshots.new_pass()
+        appx_inventory = _AppxInventory()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._observe, service, pass_id, appx_inventory): service
+                for service in targets
+            }
+            for future in as_completed(futures):
+                service = futures[future]
+                self.snapshots.publish({service.id: future.result()})
+                if first_result is None:
+                    first_result = time.perf_counter() - start
+                yield service
+        
+        if service_ids is None:
+            self.last_pass_stats = {
+                "services": len(targets),
+                "first_result_ms": (first_result or 0.0) * 1000,
+                "total_ms": (time.perf_counter() - start) * 1000,
+            }
+    
     def _detect_service_status(self, service: AIService) -> ServiceStatus:
         """Detecta el estado de un servicio específico"""
-        # Verificar registry paths
-        if service.registry_paths:
-            registry_status = self._check_registry_status(service)
-            if registry_status != ServiceStatus.UNKNOWN:
-                return registry_status
+        return self._detect_with_evidence(service)[0]
+    
+    def _detect_with_evidence(self, service: AIService,
+                              appx_inventory=None) -> Tuple[ServiceStatus, str, str]:
+        """(estado, fuente, evidencia) del primer chequeo concluyente"""
+        # Verificar reglas de registro
+        if service.registry_rules:
+            status, evidence = self._registry_evidence(service)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "registry", evidence
+        
+        if not self.probes:
+            return ServiceStatus.UNKNOWN, "none", "probes desactivados"
+        
+        status, source, evidence = self._probe_evidence(service, appx_inventory)
+        if status != ServiceStatus.UNKNOWN:
+            return status, source, evidence
+        return ServiceStatus.UNKNOWN, "none", "ningún chequeo concluyente"
+    
+    def _probe_evidence(self, service: AIService,
+                        appx_inventory=None) -> Tuple[ServiceStatus, str, str]:
+        """Chequeos con PowerShell, en el orden de la detección: Appx y luego Feature
         
+        `appx_inventory()` da el inventario compartido de una pasada; sin él
+        se consulta sólo para este servicio.
+        """
         # Verificar Appx packages
-        if service.appx_packages:
-            appx_status = self._check_appx_status(service)
-            if appx_status != ServiceStatus.UNKNOWN:
-                return appx_status
+        if service.appx_rules:
+            status, evidence = self._appx_evidence(service, appx_inventory)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "appx", evidence
         
         # Verificar Windows Feature
-        if service.windows_feature:
-            feature_status = self._check_windows_feature(service)
-            if feature_status != ServiceStatus.UNKNOWN:
-                return feature_status
+        if service.feature_rule:
+            status, evidence = self._feature_evidence(service)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "feature", evidence
         
-        return ServiceStatus.UNKNOWN
+        return ServiceStatus.UNKNOWN, "none", ""
+    
+    def registry_status(self, service: AIService) -> ServiceStatus:
+        """Estado según sólo el registro (barato: no lanza PowerShell)"""
+        return self._check_registry_status(service)
+    
+    def probe_status(self, service: AIService) -> ServiceStatus:
+        """Estado según sólo los paquetes Appx y la Windows Feature"""
+        return self._probe_evidence(service)[0]
     
     def _check_registry_status(self, service: AIService) -> ServiceStatus:
         """Verifica el estado basado en llaves de registro"""
-        for reg_info in service.registry_paths:
-            try:
-                key = winreg.OpenKey(
-                    reg_info["hive"],
-                    reg_info["path"],
-                    0,
-                    winreg.KEY_READ
-                )
-                value, _ = winreg.QueryValueEx(key, reg_info["key"])
-                winreg.CloseKey(key)
-                
-                if value == reg_info["disable_value"]:
-                    return ServiceStatus.DISABLED
-                elif value == reg_info["enable_value"]:
-                    return ServiceStatus.ENABLED
-                    
-            except FileNotFoundError:
-                # Key no existe, servicio probablemente habilitado por defecto
-                continue
-            except PermissionError:
-                continue
-            except Exception:
-                continue
-        
-        # Si no encontramos keys deshabilitantes, asumimos habilitado
-        return ServiceStatus.ENABLED
+        return self._registry_evidence(service)[0]
+    
+    def _registry_evidence(self, service: AIService) -> Tuple[ServiceStatus, str]:
+        state = capture_state(self.registry, [service], probes=False)
+        return state.registry_evidence(service)
     
     def _check_appx_status(self, service: AIService) -> ServiceStatus:
         """Verifica si paquetes Appx están instalados"""
-        try:
-            result = subprocess.run(
-                ["powershell", "-Command", "Get-AppxPackage | Select-Object Name | ConvertTo-Json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                return ServiceStatus.UNKNOWN
-            
-            output = result.stdout.strip()
-            if not output:
-                return ServiceStatus.UNKNOWN
-            
-            # Buscar paquetes
-            for package_name in service.appx_packages:
-                if package_name.lower() in output.lower():
-                    return ServiceStatus.ENABLED
-            
-            return ServiceStatus.NOT_INSTALLED
-            
-        except Exception:
-            return ServiceStatus.UNKNOWN
+        return self._appx_evidence(service)[0]
+    
+    def _appx_evidence(self, service: AIService, appx_inventory=None) -> Tuple[ServiceStatus, str]:
+        packages = appx_inventory() if appx_inventory else read_appx_inventory()
+        return SystemState(appx_packages=packages).appx_evidence(service)
     
     def _check_windows_feature(self, service: AIService) -> ServiceStatus:
         """Verifica si una Windows Feature está habilitada"""
+        return self._feature_evidence(service)[0]
+    
+    def _feature_evidence(self, service: AIService) -> Tuple[ServiceStatus, str]:
+        states = read_feature_states([service.feature_rule.name])
+        return SystemState(features=states).feature_evidence(service)
+    
+    def _observe(self, service: AIService, pass_id: int, appx_inventory=None) -> Observation:
         try:
-            result = subprocess.run(
-                ["powershell", "-Command", 
-                 f"Get-WindowsOptionalFeature -Online -FeatureName '{service.windows_feature}' | Select-Object State | ConvertTo-Json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0 or "not found" in result.stderr.lower():
-                return ServiceStatus.NOT_INSTALLED
-            
-            if "Enabled" in result.stdout:
-                return ServiceStatus.ENABLED
-            elif "Disabled" in result.stdout:
-                return ServiceStatus.DISABLED
-            
-            return ServiceStatus.UNKNOWN
-            
-        except Exception:
-            return ServiceStatus.UNKNOWN
+            status, source, evidence = self._detect_with_evidence(service, appx_inventory)
+        except Exception as e:
+            status, source, evidence = ServiceStatus.UNKNOWN, "none", str(e)
+        return Observation(status, source, evidence, pass_id, time.time())
+    
+    def capture_state(self, service_ids: Optional[Iterable[str]] = None,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      cancelled: Optional[Callable[[], bool]] = None) -> Optional[SystemState]:
+        """Captura en una pasada agrupada todo lo que consultan los servicios
+        
+        La misma captura sirve para detect_from_state() y para el backup,
+        sin volver a leer el sistema.
+        """
+        return capture_state(self.registry, self._select(service_ids), self.probes,
+                             progress, cancelled)
+    
+    def detect_from_state(self, state: SystemState,
+                          service_ids: Optional[Iterable[str]] = None) -> List[AIService]:
+        """Publica el estado de los servicios derivado de una captura"""
+        targets = self._select(service_ids)
+        pass_id = self.snapshots.new_pass()
+        self.snapshots.publish({
+            service.id: Observation(*state.evaluate(service, self.probes), pass_id, state.captured_at)
+            for service in targets
+        })
+        return targets
+    
+    def get_service(self, service_id: str) -> Optional[AIService]:
+        """Servicio por id (None si no está en el catálogo)"""
+        return self._by_id.get(service_id)
+    
+    @property
+    def snapshot(self) -> DetectionSnapshot:
+        """Instantánea publicada más reciente (lectura sin lock)"""
+        return self.snapshots.current
+    
+    def publish(self, statuses: Dict[str, ServiceStatus], source: str = "external",
+                evidence: str = "") -> DetectionSnapshot:
+        """Publica estados obtenidos fuera de este detector (p. ej. del servidor)"""
+        pass_id = self.snapshots.new_pass()
+        now = time.time()
+        return self.snapshots.publish({
+            service_id: Observation(status, source, evidence, pass_id, now)
+            for service_id, status in statuses.items()
+        })
     
     def refresh_service(self, service_id: str) -> Optional[AIService]:
         """Actualiza el estado de un servicio específico"""
-        for service in self.services:
-            if service.id == service_id:
-                service.status = self._detect_service_status(service)
-                return service
-        return None
+        service = self._by_id.get(service_id)
+        if service is not None:
+            observation = self._observe(service, self.snapshots.new_pass())
+            self.snapshots.publish({service_id: observation})
+        return service
@@ -26,10 +26,14 @@ TRANSLATIONS = {
         "detecting_services": "Detecting AI services...",
         "services_found": "Found {count} AI services • {enabled} active",
         "disabling": "Disabling {name}...",
+        "action_pending": "⏳ Queued",
+        "action_running": "⚙ Working...",
         "enabling": "Enabling {name}...",
         "success": "✓ {message}",
         "error": "✗ Error: {message}",
         "disabled_count": "✓ Disabled {success}/{total} services",
+        "creating_backup": "Creating backup...",
+        "restoring_backup": "Restoring backup...",
         
         # Buttons
         "refresh": "🔄 Refresh",
@@ -38,6 +42,7 @@ TRANSLATIONS = {
         "disable_all": "🚫 Disable All",
         "enable": "Enable",
         "disable": "Disable",
+        "cancel": "Cancel",
         
         # Headers
         "detected_services": "🛡️ Detected AI Services",
@@ -68,6 +73,16 @@ TRANSLATIONS = {
         
         # Log
         "no_activity": "No activity recorded",
+        "log_query_error": "Could not read the log: {error}",
+        "follow_log": "Follow new entries live",
+        "search_placeholder": "Search…",
+        "filter_all_levels": "All levels",
+        "filter_all_actions": "All actions",
+        "filter_all_services": "All services",
+        "range_all": "All time",
+        "range_today": "Today",
+        "range_week": "Last 7 days",
+        "range_month": "Last 30 days",
         
         # Permissions
         "permissions_required": "Permissions Required",
@@ -87,10 +102,14 @@ TRANSLATIONS = {
         "detecting_services": "KI-Dienste werden erkannt...",
         "services_found": "{count} KI-Dienste gefunden • {enabled} aktiv",
         "disabling": "{name} wird deaktiviert...",
+        "action_pending": "⏳ In Warteschlange",
+        "action_running": "⚙ In Arbeit...",
         "enabling": "{name} wird aktiviert...",
         "success": "✓ {message}",
         "error": "✗ Fehler: {message}",
         "disabled_count": "✓ {success}/{total} Dienste deaktiviert",
+        "creating_backup": "Backup wird erstellt...",
+        "restoring_backup": "Backup wird wiederhergestellt...",
         
         # Buttons
         "refresh": "🔄 Aktualisieren",
@@ -99,6 +118,7 @@ TRANSLATIONS = {
         "disable_all": "🚫 Alle deaktivieren",
         "enable": "Aktivieren",
         "disable": "Deaktivieren",
+        "cancel": "Abbrechen",
         
         # Headers
         "detected_services": "🛡️ Erkannte KI-Dienste",
@@ -129,6 +149,16 @@ TRANSLATIONS = {
         
         # Log
         "no_activity": "Keine Aktivität aufgezeichnet",
+        "log_query_error": "Protokoll konnte nicht gelesen werden: {error}",
+        "follow_log": "Neue Einträge live verfolgen",
+        "search_placeholder": "Suchen…",
+        "filter_all_levels": "Alle Stufen",
+        "filter_all_actions": "Alle Aktionen",
+        "filter_all_services": "Alle Dienste",
+        "range_all": "Gesamter Zeitraum",
+        "range_today": "Heute",
+        "range_week": "Letzte 7 Tage",
+        "range_month": "Letzte 30 Tage",
         
         # Permissions
         "permissions_required": "Berechtigungen erforderlich",
@@ -148,10 +178,14 @@ TRANSLATIONS = {
         "detecting_services": "Detectando servicios AI...",
         "services_found": "Encontrados {count} servicios AI • {enabled} activos",
         "disabling": "Deshabilitando {name}...",
+        "action_pending": "⏳ En cola",
+        "action_running": "⚙ Procesando...",
         "enabling": "Habilitando {name}...",
         "success": "✓ {message}",
         "error": "✗ Error: {message}",
         "disabled_count": "✓ Deshabilitados {success}/{total} servicios",
+        "creating_backup": "Creando backup...",
+        "restoring_backup": "Restaurando backup...",
         
         # Buttons
         "refresh": "🔄 Actualizar",
@@ -160,6 +194,7 @@ TRANSLATIONS = {
         "disable_all": "🚫 Deshabilitar Todo",
         "enable": "Habilitar",
         "disable": "Deshabilitar",
+        "cancel": "Cancelar",
         
         # Headers
         "detected_services": "🛡️ Servicios AI Detectados",
@@ -190,6 +225,16 @@ TRANSLATIONS = {
         
         # Log
         "no_activity": "Sin actividad registrada",
+        "log_query_error": "No se pudo leer el registro: {error}",
+        "follow_log": "Seguir nuevas entradas en vivo",
+        "search_placeholder": "Buscar…",
+        "filter_all_levels": "Todos los niveles",
+        "filter_all_actions": "Todas las acciones",
+        "filter_all_services": "Todos los servicios",
+        "range_all": "Todo el historial",
+        "range_today": "Hoy",
+        "range_week": "Últimos 7 días",
+        "range_month": "Últimos 30 días",
         
         # Permissions
         "permissions_required": "Permisos Requeridos",
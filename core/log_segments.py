@@ -0,0 +1,421 @@
+"""
+Segmentos de log: rotación por tamaño y antigüedad, compresión y lectura
+en streaming de segmentos activos y archivados
+"""
+
+import os
+import re
+import gzip
+import json
+import shutil
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Dict, Iterator, Optional, Tuple
+
+
+# activity_YYYYMMDD.jsonl           segmento activo del día
+# activity_YYYYMMDD_NNN.jsonl.gz    segmento cerrado y comprimido
+# activity_YYYYMMDD.json            formato anterior (un documento por día)
+SEGMENT_PATTERN = re.compile(r"^activity_(\d{8})(?:_(\d{3}))?\.(jsonl|json)(\.gz)?$")
+
+
+@dataclass
+class Segment:
+    """Archivo de log identificado por fecha y número de secuencia"""
+    name: str
+    path: str
+    date: str             # YYYYMMDD
+    seq: Optional[int]    # None para el segmento activo o el formato anterior
+    compressed: bool
+    legacy: bool
+    
+    @property
+    def is_active(self) -> bool:
+        return self.seq is None and not self.compressed and not self.legacy
+    
+    def sort_key(self) -> Tuple[str, int, int]:
+        # Dentro de un día: formato anterior, luego cerrados por secuencia,
+        # y al final el activo
+        if self.legacy:
+            order = -1
+        elif self.seq is None:
+            order = 1_000_000
+        else:
+            order = self.seq
+        return (self.date, order, 0)
+
+
+def parse_segment(log_dir: str, name: str) -> Optional[Segment]:
+    """Interpreta el nombre de un archivo de log; None si no es un segmento"""
+    match = SEGMENT_PATTERN.match(name)
+    if not match:
+        return None
+    day, seq, ext, gz = match.groups()
+    return Segment(
+        name=name,
+        path=os.path.join(log_dir, name),
+        date=day,
+        seq=int(seq) if seq else None,
+        compressed=bool(gz),
+        legacy=ext == "json"
+    )
+
+
+def list_segments(log_dir: str) -> List[Segment]:
+    """Segmentos del directorio en orden cronológico"""
+    try:
+        names = os.listdir(log_dir)
+    except OSError:
+        return []
+    segments = [s for s in (parse_segment(log_dir, n) for n in names) if s]
+    return sorted(segments, key=Segment.sort_key)
+
+
+def _open_binary(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_records(path: str, offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """Itera los registros de un segmento desde `offset` (bytes sin comprimir)
+    
+    Retorna pares (registro, offset tras la línea). Lee línea a línea, también
+    en segmentos comprimidos, así que nunca descomprime el archivo completo en
+    memoria. Una última línea sin salto de línea (escritura en curso) se omite.
+    """
+    if path.endswith(".json"):
+        # Formato anterior: un único documento JSON
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return
+        size = os.path.getsize(path)
+        for record in data.get("entries", []):
+            yield record, size
+        return
+    
+    with _open_binary(path) as f:
+        if offset:
+            f.seek(offset)
+        position = offset
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            position += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), position
+            except ValueError:
+                # Línea truncada (p. ej. cierre abrupto), se ignora
+                continue
+
+
+def read_tail(path: str, end: Optional[int], count: int,
+              chunk_size: int = 8192) -> Tuple[List[dict], int]:
+    """Lee los últimos `count` registros de un segmento que terminan en `end`
+    
+    `end=None` significa hasta el final del archivo. Retorna los registros
+    (más antiguo primero) y el offset donde empieza el primero de ellos; 0
+    indica que se llegó al inicio del segmento. En el formato anterior
+    (.json) los offsets son índices de registro en lugar de bytes.
+    """
+    if path.endswith(".json"):
+        records = [record for record, _ in iter_records(path)]
+        if end is None or end > len(records):
+            end = len(records)
+        start = max(0, end - count)
+        return records[start:end], start
+    
+    if path.endswith(".gz"):
+        # No se puede retroceder en gzip: se recorre hacia adelante
+        # conservando sólo una ventana de `count` registros
+        window = deque(maxlen=count)
+        previous_end = 0
+        for record, position in iter_records(path):
+            if end is not None and position > end:
+                break
+            window.append((record, previous_end))
+            previous_end = position
+        if not window:
+            return [], 0
+        return [record for record, _ in window], window[0][1]
+    
+    if end is None:
+        end = os.path.getsize(path)
+    data = b""
+    pos = end
+    with open(path, 'rb') as f:
+        # Una línea más de las pedidas para saber dónde empieza la primera
+        while pos > 0 and data.count(b"\n") <= count:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            data = f.read(read_size) + data
+    
+    raw_lines = data.split(b"\n")
+    if raw_lines and raw_lines[-1] == b"":
+        raw_lines.pop()
+    
+    start = pos
+    if len(raw_lines) > count:
+        skipped = raw_lines[:-count]
+        raw_lines = raw_lines[-count:]
+        start = pos + sum(len(line) + 1 for line in skipped)
+    
+    records = []
+    for line in raw_lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records, start
+
+
+def iter_log_records(log_dir: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Iterator[dict]:
+    """Itera en orden cronológico los registros de todos los segmentos
+    
+    `start` y `end` son timestamps o fechas "YYYY-MM-DD"; los segmentos
+    fuera del rango se descartan por su nombre sin abrirlos.
+    """
+    start_day = start[:10].replace("-", "") if start else None
+    end_day = end[:10].replace("-", "") if end else None
+    for segment in list_segments(log_dir):
+        if start_day and segment.date < start_day:
+            continue
+        if end_day and segment.date > end_day:
+            break
+        try:
+            for record, _ in iter_records(segment.path):
+                timestamp = record.get("timestamp", "")
+                if start and timestamp < start:
+                    continue
+                if end and timestamp[:len(end)] > end:
+                    continue
+                yield record
+        except OSError:
+            # Segmento rotado o eliminado mientras se leía
+            continue
+
+
+class LogRotator:
+    """Rota, comprime y purga segmentos de log
+    
+    - Un segmento activo que supera `max_segment_bytes` se cierra y comprime
+    - Los segmentos activos de días anteriores se cierran y comprimen
+    - Los segmentos de más de `max_age_days` días se eliminan
+    - Si el total supera `max_total_bytes` se eliminan los más antiguos
+    """
+    
+    def __init__(self, log_dir: str, max_segment_bytes: int = 2 * 1024 * 1024,
+                 max_age_days: int = 90, max_total_bytes: int = 50 * 1024 * 1024):
+        self.log_dir = log_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+    
+    def needs_rotation(self, path: str) -> bool:
+        try:
+            return os.path.getsize(path) >= self.max_segment_bytes
+        except OSError:
+            return False
+    
+    def seal(self, path: str) -> Optional[str]:
+        """Cierra un segmento activo: lo renombra y lo comprime
+        
+        Retorna la ruta del segmento comprimido, o None si falló.
+        """
+        segment = parse_segment(self.log_dir, os.path.basename(path))
+        if segment is None or not segment.is_active:
+            return None
+        
+        existing = [
+            s.seq for s in list_segments(self.log_dir)
+            if s.date == segment.date and s.seq is not None
+        ]
+        seq = max(existing, default=0) + 1
+        sealed = os.path.join(self.log_dir, f"activity_{segment.date}_{seq:03d}.jsonl")
+        try:
+            os.replace(path, sealed)
+        except OSError:
+            return None
+        
+        compressed = sealed + ".gz"
+        try:
+            with open(sealed, 'rb') as src, gzip.open(compressed, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(sealed)
+        except OSError:
+            # Sin compresión el segmento sigue siendo legible
+            if os.path.exists(compressed):
+                os.remove(compressed)
+            return sealed
+        return compressed
+    
+    def compact(self, today: Optional[str] = None,
+                max_age_days: Optional[int] = None) -> Tuple[Dict[str, str], List[str]]:
+        """Aplica las políticas de antigüedad y espacio total
+        
+        Retorna (renombrados {anterior: nuevo}, eliminados) con nombres de
+        archivo, para que el índice pueda actualizarse.
+        """
+        today = today or datetime.now().strftime("%Y%m%d")
+        renamed: Dict[str, str] = {}
+        removed: List[str] = []
+        
+        # Cerrar los segmentos activos de días anteriores
+        for segment in list_segments(self.log_dir):
+            if segment.is_active and segment.date < today:
+                sealed = self.seal(segment.path)
+                if sealed:
+                    renamed[segment.name] = os.path.basename(sealed)
+        
+        cutoff = (
+            datetime.strptime(today, "%Y%m%d")
+            - timedelta(days=self.max_age_days if max_age_days is None else max_age_days)
+        ).strftime("%Y%m%d")
+        segments = list_segments(self.log_dir)
+        remaining = []
+        for segment in segments:
+            if segment.date < cutoff:
+                if self._remove(segment):
+                    removed.append(segment.name)
+            else:
+                remaining.append(segment)
+        
+        sizes = []
+        for segment in remaining:
+            try:
+                sizes.append((segment, os.path.getsize(segment.path)))
+            except OSError:
+                continue
+        total = sum(size for _, size in sizes)
+        for segment, size in sizes:
+            if total <= self.max_total_bytes:
+                break
+            if segment.is_active and segment.date == today:
+                continue
+            if self._remove(segment):
+                removed.append(segment.name)
+                total -= size
+        
+        return renamed, removed
+    
+    @staticmethod
+    def _remove(segment: Segment) -> bool:
+        try:
+            os.remove(segment.path)
+            return True
+        except OSError:
+            return False
+    
+    def total_size(self) -> int:
+        """Espacio ocupado por todos los segmentos"""
+        total = 0
+        for segment in list_segments(self.log_dir):
+            try:
+                total += os.path.getsize(segment.path)
+            except OSError:
+                continue
+        return total
+
+
+class LogFollower:
+    """Sigue el segmento activo leyendo sólo lo agregado desde la última vez
+    
+    Guarda el offset (bytes) leído del segmento activo. Si el segmento se
+    rota, termina de leerlo desde el segmento cerrado que lo reemplazó y
+    continúa con el nuevo activo desde el principio; lo mismo al cambiar de día.
+    """
+    
+    def __init__(self, log_dir: str, from_end: bool = True):
+        self.log_dir = log_dir
+        self._day = datetime.now().strftime("%Y%m%d")
+        self._offset = 0
+        self._known_seq = self._max_sealed_seq(self._day)
+        self._shrunk = False
+        if from_end:
+            try:
+                self._offset = os.path.getsize(self.active_path)
+            except OSError:
+                self._offset = 0
+    
+    @property
+    def active_path(self) -> str:
+        """Segmento activo que se está siguiendo"""
+        return os.path.join(self.log_dir, f"activity_{self._day}.jsonl")
+    
+    def _sealed_after(self, day: str, seq: int) -> List[Segment]:
+        return [
+            s for s in list_segments(self.log_dir)
+            if s.date == day and s.seq is not None and s.seq > seq
+        ]
+    
+    def _max_sealed_seq(self, day: str) -> int:
+        return max((s.seq for s in self._sealed_after(day, 0)), default=0)
+    
+    def _drain_rotated(self) -> List[dict]:
+        """Lee lo pendiente de segmentos cerrados desde la última lectura"""
+        records = []
+        sealed = self._sealed_after(self._day, self._known_seq)
+        for i, segment in enumerate(sealed):
+            offset = self._offset if i == 0 else 0
+            try:
+                records.extend(record for record, _ in iter_records(segment.path, offset))
+            except OSError:
+                continue
+        if sealed:
+            self._known_seq = sealed[-1].seq
+            self._offset = 0
+            self._shrunk = False
+        return records
+    
+    def poll(self) -> List[dict]:
+        """Registros nuevos (más antiguo primero) desde la última llamada"""
+        records = self._drain_rotated()
+        
+        today = datetime.now().strftime("%Y%m%d")
+        if today != self._day:
+            # Terminar el día anterior antes de pasar al nuevo
+            records.extend(self._read_active())
+            records.extend(self._drain_rotated())
+            self._day = today
+            self._offset = 0
+            self._known_seq = self._max_sealed_seq(today)
+            self._shrunk = False
+        
+        records.extend(self._read_active())
+        return records
+    
+    def _read_active(self) -> List[dict]:
+        try:
+            size = os.path.getsize(self.active_path)
+        except OSError:
+            return []
+        if size < self._offset:
+            # Puede ser una rotación cuyo segmento cerrado aún no aparece;
+            # si persiste en la siguiente lectura, el archivo se truncó
+            if not self._shrunk:
+                self._shrunk = True
+                return []
+            self._offset = 0
+        self._shrunk = False
+        if size == self._offset:
+            return []
+        
+        records = []
+        try:
+            for record, position in iter_records(self.active_path, self._offset):
+                records.append(record)
+                self._offset = position
+        except OSError:
+            pass
+        return records
@@ -0,0 +1,381 @@
+"""
+Índice SQLite del registro de actividades
+Permite consultar, paginar y agregar entradas de cualquier rango de fechas
+sin cargar los archivos de log en memoria
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from .logger import LogEntry
+from .log_segments import iter_records, list_segments
+
+
+DateLike = Union[str, date, datetime, None]
+
+# Columnas por las que se permite agrupar en aggregate()
+_GROUP_COLUMNS = {
+    "service_id": "service_id",
+    "action": "action",
+    "level": "level",
+    "day": "substr(timestamp, 1, 10)",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    level TEXT NOT NULL,
+    action TEXT NOT NULL,
+    service_id TEXT NOT NULL,
+    service_name TEXT NOT NULL,
+    message TEXT NOT NULL,
+    details TEXT,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_entries_service ON entries (service_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_entries_action ON entries (action, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_entries_level ON entries (level, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    indexed_bytes INTEGER NOT NULL
+);
+"""
+
+# Índice de texto completo sobre mensaje y nombre de servicio, mantenido
+# por triggers en cada inserción/borrado
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    message, service_name, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, message, service_name)
+    VALUES (new.id, new.message, new.service_name);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, message, service_name)
+    VALUES ('delete', old.id, old.message, old.service_name);
+END;
+"""
+
+
+@dataclass
+class LogPage:
+    """Página de resultados de una consulta
+    
+    `next_cursor` se pasa a la siguiente llamada a query() para continuar;
+    es None cuando no hay más resultados.
+    """
+    entries: List[LogEntry] = field(default_factory=list)
+    next_cursor: Optional[Tuple[str, int]] = None
+
+
+def _normalize_bound(value: DateLike, end: bool) -> Optional[str]:
+    """Convierte una fecha/datetime/string a timestamp comparable del log"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        value = value.strftime("%Y-%m-%d")
+    if len(value) == 10:
+        # Fecha sin hora: el rango incluye el día completo
+        return value + (" 23:59:59" if end else " 00:00:00")
+    return value
+
+
+# Una palabra para el tokenizador unicode61 de FTS5: letras y dígitos
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _fold(word: str) -> str:
+    """Minúsculas y sin diacríticos, como compara unicode61"""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Términos de una búsqueda de texto libre
+    
+    Sólo cuentan letras y dígitos: comillas y signos separan palabras y
+    nunca llegan a la consulta. Una búsqueda sin términos no filtra.
+    """
+    return [_fold(word) for word in _WORD.findall(text or "")]
+
+
+def matches_terms(terms: List[str], *texts: Optional[str]) -> bool:
+    """True si cada término empieza alguna palabra de `texts`
+    
+    Es la misma comparación que hace la consulta FTS5, para filtrar
+    entradas que todavía no pasaron por el índice.
+    """
+    words = [_fold(word) for text in texts for word in _WORD.findall(text or "")]
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+def _fts_query(terms: List[str]) -> str:
+    """Consulta FTS5: todos los términos, por prefijo"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class LogStore:
+    """Índice persistente de las entradas de log
+    
+    Los segmentos de log siguen siendo la fuente de verdad; el índice guarda
+    cuántos bytes de cada segmento activo ya procesó y sólo lee lo nuevo.
+    Los segmentos comprimidos se indexan una sola vez, en streaming.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._fts = False
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._fts = self._setup_fts(conn)
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def _setup_fts(conn: sqlite3.Connection) -> bool:
+        """Crea el índice de texto completo; False si SQLite no trae FTS5"""
+        existed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+        ).fetchone() is not None
+        try:
+            conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if not existed:
+            # Índice creado sobre una base existente: poblarlo una vez
+            with conn:
+                conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+        return True
+    
+    def close(self):
+        """Cierra la conexión con el índice"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def sync_file(self, path: str) -> int:
+        """Indexa las líneas agregadas a un archivo desde la última vez
+        
+        Retorna el número de entradas nuevas indexadas.
+        """
+        name = os.path.basename(path)
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT indexed_bytes FROM sources WHERE name = ?", (name,)
+            ).fetchone()
+            
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return 0
+            
+            if path.endswith(".gz") or path.endswith(".json"):
+                # Segmentos archivados y formato anterior no cambian
+                if row is not None:
+                    return 0
+                offset = 0
+            else:
+                offset = row[0] if row else 0
+                if size == offset:
+                    return 0
+                if size < offset:
+                    # Archivo reemplazado o truncado: reindexar desde cero
+                    conn.execute("DELETE FROM entries WHERE source = ?", (name,))
+                    offset = 0
+            
+            rows = []
+            indexed = offset
+            try:
+                for record, position in iter_records(path, offset):
+                    rows.append(self._to_row(record, name))
+                    indexed = position
+            except OSError:
+                return 0
+            if path.endswith(".gz") or path.endswith(".json"):
+                indexed = size
+            
+            with conn:
+                conn.executemany(
+                    "INSERT INTO entries (timestamp, level, action, service_id, "
+                    "service_name, message, details, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sources (name, indexed_bytes) VALUES (?, ?)",
+                    (name, indexed)
+                )
+            return len(rows)
+    
+    def sync_directory(self, log_dir: str) -> int:
+        """Indexa todos los segmentos de un directorio que tengan datos nuevos"""
+        total = 0
+        for segment in list_segments(log_dir):
+            total += self.sync_file(segment.path)
+        return total
+    
+    def forget_source(self, name: str):
+        """Quita del índice las entradas de un archivo eliminado"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM entries WHERE source = ?", (name,))
+                conn.execute("DELETE FROM sources WHERE name = ?", (name,))
+    
+    @staticmethod
+    def _to_row(record: dict, source: str) -> tuple:
+        details = record.get("details")
+        return (
+            record.get("timestamp", ""),
+            record.get("level", ""),
+            record.get("action", ""),
+            record.get("service_id", ""),
+            record.get("service_name", ""),
+            record.get("message", ""),
+            json.dumps(details, ensure_ascii=False) if details is not None else None,
+            source,
+        )
+    
+    def _where(self, start: DateLike = None, end: DateLike = None,
+               service_id: Optional[str] = None, action: Optional[str] = None,
+               level: Optional[str] = None,
+               text: Optional[str] = None) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        start_ts = _normalize_bound(start, end=False)
+        end_ts = _normalize_bound(end, end=True)
+        if start_ts:
+            clauses.append("timestamp >= ?")
+            params.append(start_ts)
+        if end_ts:
+            clauses.append("timestamp <= ?")
+            params.append(end_ts)
+        if service_id:
+            clauses.append("service_id = ?")
+            params.append(service_id)
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        terms = search_terms(text)
+        if terms and self._fts:
+            clauses.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append(_fts_query(terms))
+        else:
+            for term in terms:
+                clauses.append("(message LIKE ? OR service_name LIKE ?)")
+                params.extend([f"%{term}%"] * 2)
+        return clauses, params
+    
+    def query(self, start: DateLike = None, end: DateLike = None,
+              service_id: Optional[str] = None, action: Optional[str] = None,
+              level: Optional[str] = None, text: Optional[str] = None,
+              limit: int = 50, cursor: Optional[Tuple[str, int]] = None) -> LogPage:
+        """Consulta paginada de entradas, más recientes primero
+        
+        La paginación es por cursor (timestamp, id), así que el costo de una
+        página no depende de cuántas se hayan recorrido antes. `text` busca
+        palabras (por prefijo) en el mensaje y el nombre del servicio.
+        `limit` debe ser al menos 1.
+        """
+        if limit < 1:
+            raise ValueError(f"limit debe ser mayor que cero: {limit}")
+        with self._lock:
+            self._connection()
+        clauses, params = self._where(start, end, service_id, action, level, text)
+        if cursor:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(cursor)
+        sql = (
+            "SELECT id, timestamp, level, action, service_id, service_name, message, details "
+            "FROM entries"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        
+        page = LogPage()
+        for row in rows[:limit]:
+            page.entries.append(LogEntry(
+                timestamp=row[1],
+                level=row[2],
+                action=row[3],
+                service_id=row[4],
+                service_name=row[5],
+                message=row[6],
+                details=json.loads(row[7]) if row[7] else None
+            ))
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            page.next_cursor = (last[1], last[0])
+        return page
+    
+    def count(self, start: DateLike = None, end: DateLike = None,
+              service_id: Optional[str] = None, action: Optional[str] = None,
+              level: Optional[str] = None, text: Optional[str] = None) -> int:
+        """Cuenta las entradas que cumplen los filtros sin cargarlas"""
+        with self._lock:
+            self._connection()
+        clauses, params = self._where(start, end, service_id, action, level, text)
+        sql = "SELECT COUNT(*) FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self._connection().execute(sql, params).fetchone()[0]
+    
+    def aggregate(self, group_by: str, start: DateLike = None, end: DateLike = None,
+                  service_id: Optional[str] = None, action: Optional[str] = None,
+                  level: Optional[str] = None, text: Optional[str] = None) -> Dict[str, int]:
+        """Cuenta entradas agrupadas por service_id, action, level o day"""
+        if group_by not in _GROUP_COLUMNS:
+            raise ValueError(f"Agrupación no soportada: {group_by}")
+        column = _GROUP_COLUMNS[group_by]
+        with self._lock:
+            self._connection()
+        clauses, params = self._where(start, end, service_id, action, level, text)
+        sql = f"SELECT {column}, COUNT(*) FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" GROUP BY {column} ORDER BY {column}"
+        with self._lock:
+            return dict(self._connection().execute(sql, params).fetchall())
+    
+    def services(self) -> Dict[str, str]:
+        """Servicios presentes en el log: {service_id: service_name}"""
+        with self._lock:
+            return dict(self._connection().execute(
+                "SELECT service_id, MAX(service_name) FROM entries GROUP BY service_id"
+            ).fetchall())
+    
+    def source_counts(self) -> Dict[str, int]:
+        """Número de entradas indexadas por archivo de log"""
+        with self._lock:
+            return dict(self._connection().execute(
+                "SELECT source, COUNT(*) FROM entries GROUP BY source"
+            ).fetchall())
@@ -4,11 +4,20 @@ Sistema de logging para registrar todas las acciones de la aplicación
 
 import os
 import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Deque, Tuple, Iterator, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .log_segments import (
+    LogRotator, Segment, iter_log_records, list_segments, parse_segment, read_tail
+)
+
 
 class LogLevel(Enum):
     INFO = "info"
@@ -17,6 +26,12 @@ class LogLevel(Enum):
     ERROR = "error"
 
 
+class QueueFullPolicy(Enum):
+    """Qué hacer cuando la cola de escritura está llena"""
+    BLOCK = "block"   # Esperar hasta que el writer libere espacio
+    DROP = "drop"     # Descartar la entrada en disco y contar la pérdida
+
+
 @dataclass
 class LogEntry:
     """Representa una entrada del log"""
@@ -33,47 +48,464 @@ class LogEntry:
 
 
 class ActivityLogger:
-    """Gestiona el registro de actividades de la aplicación"""
+    """Gestiona el registro de actividades de la aplicación
+    
+    Las entradas se agregan en memoria de inmediato y se encolan para que un
+    hilo escritor dedicado las persista en lotes (formato JSON Lines), de
+    modo que el hilo de la GUI nunca toca el disco.
+    
+    En memoria sólo se conservan las últimas `max_entries` entradas (buffer
+    circular). El historial no se parsea al construir el logger: se lee bajo
+    demanda desde el final de los segmentos de log.
+    
+    El segmento activo se rota por tamaño y al cambiar de día; los segmentos
+    cerrados se comprimen y se purgan por antigüedad y espacio total (ver
+    LogRotator).
+    
+    El índice SQLite de consultas no se actualiza al escribir: lo escrito se
+    indexa en la siguiente consulta, así el hilo escritor sólo agrega líneas
+    (`index_on_write=True` vuelve a indexar tras cada lote).
+    
+    Las detecciones sólo se registran cuando cambia el estado del servicio, y
+    los eventos idénticos repetidos dentro de `coalesce_window` segundos se
+    resumen en una única entrada con el conteo y la primera/última fecha.
+    """
     
-    def __init__(self):
+    LOG_EXTENSION = ".jsonl"
+    INDEX_FILENAME = "activity_index.sqlite3"
+    TAIL_CHUNK_SIZE = 8192
+    
+    def __init__(self, queue_size: int = 1000, batch_size: int = 100,
+                 full_policy: QueueFullPolicy = QueueFullPolicy.DROP,
+                 block_timeout: float = 1.0, max_entries: int = 500,
+                 coalesce_window: float = 60.0,
+                 max_segment_bytes: int = 2 * 1024 * 1024,
+                 max_age_days: int = 90,
+                 max_total_bytes: int = 50 * 1024 * 1024,
+                 index_on_write: bool = False):
         self.log_dir = os.path.join(os.path.expanduser("~"), ".win-ai-tools-logs")
         os.makedirs(self.log_dir, exist_ok=True)
-        self.current_log_file = os.path.join(
-            self.log_dir, 
-            f"activity_{datetime.now().strftime('%Y%m%d')}.json"
+        self._entries: Deque[LogEntry] = deque(maxlen=max_entries)
+        
+        # Rotación de segmentos (el hilo escritor es quien rota)
+        self._rotator = LogRotator(
+            self.log_dir, max_segment_bytes, max_age_days, max_total_bytes
+        )
+        self._segments_lock = threading.Lock()
+        self._compacted_day: Optional[str] = None
+        
+        # Cursor del historial: todo lo anterior a (segmento, offset) aún no
+        # se cargó; lo posterior lo escribe esta sesión y ya está en memoria.
+        # Un offset None significa "hasta el final del segmento".
+        self._history_path: Optional[str] = self.current_log_file
+        try:
+            self._history_offset: Optional[int] = os.path.getsize(self._history_path)
+        except OSError:
+            self._history_offset = 0
+        
+        # Índice SQLite para consultas entre días (se abre en el primer uso)
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._index_synced = False
+        self.index_on_write = index_on_write
+        # Segmentos con líneas escritas que el índice todavía no vio
+        self._unindexed: Set[str] = set()
+        self._unindexed_lock = threading.Lock()
+        
+        # Último estado registrado por servicio y grupos de eventos repetidos
+        self.coalesce_window = coalesce_window
+        self._last_detection: Dict[str, str] = {}
+        self._groups: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self._groups_lock = threading.Lock()
+        
+        # Callbacks notificados con cada entrada nueva
+        self._listeners = []
+        
+        # Cola acotada y política de desborde
+        self.batch_size = batch_size
+        self.full_policy = full_policy
+        self.block_timeout = block_timeout
+        self._queue: "queue.Queue[Optional[LogEntry]]" = queue.Queue(maxsize=queue_size)
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._closed = False
+        
+        # Métricas
+        self._stats_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._suppressed = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+        self._total_write_time = 0.0
+        self._last_write_time = 0.0
+        self._max_write_time = 0.0
+        
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="ActivityLogWriter", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+    
+    @property
+    def current_log_file(self) -> str:
+        """Segmento activo del día actual"""
+        return self._log_file_for(datetime.now().strftime("%Y-%m-%d"))
+    
+    def _log_file_for(self, date: str) -> str:
+        """Ruta del archivo de log para una fecha YYYY-MM-DD"""
+        return os.path.join(
+            self.log_dir,
+            f"activity_{date.replace('-', '')}{self.LOG_EXTENSION}"
         )
-        self._entries: List[LogEntry] = []
-        self._load_today_logs()
     
-    def _load_today_logs(self):
-        """Carga los logs del día actual si existen"""
+    @property
+    def store(self):
+        """Índice de consultas (LogStore), creado en el primer uso"""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    from .log_store import LogStore
+                    self._store = LogStore(self._index_path())
+        return self._store
+    
+    def _index_path(self) -> str:
+        return os.path.join(self.log_dir, self.INDEX_FILENAME)
+    
+    def _load_history(self, count: int):
+        """Carga hasta `count` entradas anteriores a la sesión leyendo los
+        segmentos hacia atrás, sin parsear el resto de los archivos"""
+        count = min(count, self._entries.maxlen - len(self._entries))
+        if count <= 0:
+            return
+        
+        older: List[LogEntry] = []
+        with self._segments_lock:
+            while len(older) < count and self._history_path is not None:
+                if self._history_offset == 0:
+                    previous = self._previous_segment(self._history_path)
+                    self._history_path = previous.path if previous else None
+                    self._history_offset = None
+                    continue
+                try:
+                    records, self._history_offset = read_tail(
+                        self._history_path, self._history_offset,
+                        count - len(older), self.TAIL_CHUNK_SIZE
+                    )
+                except OSError:
+                    records, self._history_offset = [], 0
+                batch = []
+                for record in records:
+                    try:
+                        batch.append(LogEntry(**record))
+                    except TypeError:
+                        continue
+                older = batch + older
+        
+        self._entries.extendleft(reversed(older))
+    
+    def _previous_segment(self, path: str) -> Optional[Segment]:
+        """Segmento inmediatamente anterior (cronológicamente) a `path`"""
+        current = parse_segment(self.log_dir, os.path.basename(path))
+        if current is None:
+            return None
+        previous = None
+        for segment in list_segments(self.log_dir):
+            if segment.sort_key() >= current.sort_key():
+                break
+            previous = segment
+        return previous
+    
+    def _has_more_history(self) -> bool:
+        return self._history_path is not None
+    
+    def _seal_segment(self, path: str):
+        """Rota un segmento activo que superó el tamaño máximo"""
+        with self._segments_lock:
+            sealed = self._rotator.seal(path)
+            if sealed and self._history_path == path:
+                self._history_path = sealed
+        if sealed:
+            self._reindex_renamed({os.path.basename(path): os.path.basename(sealed)})
+    
+    def _compact_segments(self, max_age_days: Optional[int] = None):
+        """Cierra segmentos de días anteriores y aplica antigüedad y espacio total"""
+        with self._segments_lock:
+            renamed, removed = self._rotator.compact(max_age_days=max_age_days)
+            if self._history_path is not None:
+                name = os.path.basename(self._history_path)
+                if name in renamed:
+                    self._history_path = os.path.join(self.log_dir, renamed[name])
+                elif name in removed:
+                    self._history_path = None
+        self._compacted_day = datetime.now().strftime("%Y%m%d")
+        self._reindex_renamed(renamed)
+        if self._store is not None or os.path.exists(self._index_path()):
+            for name in removed:
+                self.store.forget_source(name)
+    
+    def _reindex_renamed(self, renamed: Dict[str, str]):
+        """Actualiza el índice tras renombrar segmentos"""
+        if not renamed:
+            return
+        if self._store is None and not os.path.exists(self._index_path()):
+            return
+        for old_name, new_name in renamed.items():
+            try:
+                self.store.forget_source(old_name)
+                self.store.sync_file(os.path.join(self.log_dir, new_name))
+            except Exception:
+                pass
+    
+    def _enqueue(self, entry: LogEntry):
+        """Encola una entrada para el hilo escritor según la política de desborde"""
+        if self._closed:
+            with self._stats_lock:
+                self._dropped += 1
+            return
+        
+        with self._pending_cond:
+            self._pending += 1
         try:
-            if os.path.exists(self.current_log_file):
-                with open(self.current_log_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self._entries = [
-                        LogEntry(**entry) for entry in data.get("entries", [])
-                    ]
-        except Exception:
-            self._entries = []
+            if self.full_policy == QueueFullPolicy.BLOCK:
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            self._mark_done(1)
+            return
+        
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self._max_queue_depth:
+                self._max_queue_depth = depth
+    
+    def _mark_done(self, count: int):
+        """Descuenta entradas pendientes y despierta a quien espere en flush()"""
+        with self._pending_cond:
+            self._pending -= count
+            if self._pending <= 0:
+                self._pending = 0
+                self._pending_cond.notify_all()
     
-    def _save_logs(self):
-        """Guarda los logs en archivo"""
+    def _writer_loop(self):
+        """Bucle del hilo escritor: drena la cola en lotes"""
         try:
-            data = {
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "entries": [entry.to_dict() for entry in self._entries]
-            }
-            with open(self.current_log_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._compact_segments()
         except Exception:
             pass
+        
+        while True:
+            try:
+                item = self._queue.get(timeout=self._group_check_interval())
+            except queue.Empty:
+                # Cerrar grupos de repetidos vencidos aunque no lleguen eventos
+                summaries = self._close_groups()
+                if summaries:
+                    self._write_batch(summaries)
+                continue
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._write_batch(batch)
+            self._mark_done(len(batch))
+            if stop:
+                return
+    
+    def _write_batch(self, batch: List[LogEntry]):
+        """Agrega un lote de entradas al archivo del día correspondiente"""
+        # Agrupar por día para que el cambio de fecha abra un archivo nuevo
+        by_file: Dict[str, List[str]] = {}
+        for entry in batch:
+            path = self._log_file_for(entry.timestamp[:10])
+            by_file.setdefault(path, []).append(
+                json.dumps(entry.to_dict(), ensure_ascii=False)
+            )
+        
+        start = time.perf_counter()
+        errors = 0
+        for path, lines in by_file.items():
+            try:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+            except Exception:
+                errors += len(lines)
+        elapsed = time.perf_counter() - start
+        
+        # Indexar ahora (opcional) o en la próxima consulta, y rotar lo que
+        # haya superado el tamaño máximo
+        for path in by_file:
+            if self.index_on_write:
+                try:
+                    self.store.sync_file(path)
+                except Exception:
+                    pass
+            else:
+                with self._unindexed_lock:
+                    self._unindexed.add(path)
+            if self._rotator.needs_rotation(path):
+                self._seal_segment(path)
+        
+        if self._compacted_day != datetime.now().strftime("%Y%m%d"):
+            try:
+                self._compact_segments()
+            except Exception:
+                pass
+        
+        with self._stats_lock:
+            self._batches += 1
+            self._written += len(batch) - errors
+            self._write_errors += errors
+            self._total_write_time += elapsed
+            self._last_write_time = elapsed
+            if elapsed > self._max_write_time:
+                self._max_write_time = elapsed
+    
+    def add_listener(self, callback):
+        """Registra un callback que recibe cada LogEntry nueva
+        
+        Los resúmenes de eventos repetidos pueden notificarse desde el hilo
+        escritor: los callbacks de la GUI deben reenviar al hilo principal.
+        """
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Elimina un callback registrado con add_listener"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, entry: LogEntry):
+        for listener in list(self._listeners):
+            try:
+                listener(entry)
+            except Exception:
+                pass
+    
+    def _group_check_interval(self) -> Optional[float]:
+        if self.coalesce_window <= 0:
+            return None
+        return min(self.coalesce_window, 5.0)
+    
+    def _close_groups(self, force: bool = False) -> List[LogEntry]:
+        """Cierra los grupos de repetidos vencidos y retorna sus resúmenes"""
+        now = time.monotonic()
+        summaries = []
+        with self._groups_lock:
+            for key in list(self._groups):
+                group = self._groups[key]
+                if not force and now - group["started"] < self.coalesce_window:
+                    continue
+                del self._groups[key]
+                if group["count"] == 0:
+                    continue
+                first = group["entry"]
+                summary = LogEntry(
+                    timestamp=group["last"],
+                    level=first.level,
+                    action=first.action,
+                    service_id=first.service_id,
+                    service_name=first.service_name,
+                    message=f"{first.message} (repetido {group['count']} veces)",
+                    details=dict(
+                        first.details or {},
+                        count=group["count"],
+                        first=group["first"],
+                        last=group["last"]
+                    )
+                )
+                self._entries.append(summary)
+                summaries.append(summary)
+        for summary in summaries:
+            self._notify(summary)
+        return summaries
+    
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a que todas las entradas encoladas estén en disco
+        
+        Retorna False si se agotó el tiempo de espera.
+        """
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+    
+    def close(self, timeout: Optional[float] = 5.0):
+        """Vacía la cola y detiene el hilo escritor (llamar al salir)"""
+        if self._closed:
+            return
+        # Los grupos de repetidos abiertos se escriben antes de cerrar
+        for summary in self._close_groups(force=True):
+            self._enqueue(summary)
+        self.flush(timeout)
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer.join(timeout)
+        if self._store is not None:
+            self._store.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del escritor: profundidad de cola y latencia de escritura"""
+        with self._stats_lock:
+            avg = self._total_write_time / self._batches if self._batches else 0.0
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_queue_depth": self._max_queue_depth,
+                "full_policy": self.full_policy.value,
+                "written": self._written,
+                "dropped": self._dropped,
+                "write_errors": self._write_errors,
+                "suppressed": self._suppressed,
+                "coalesced": self._coalesced,
+                "batches": self._batches,
+                "last_write_ms": self._last_write_time * 1000,
+                "avg_write_ms": avg * 1000,
+                "max_write_ms": self._max_write_time * 1000,
+            }
     
     def log(self, level: LogLevel, action: str, service_id: str, 
             service_name: str, message: str, details: Dict = None):
-        """Agrega una entrada al log"""
+        """Agrega una entrada al log
+        
+        Si un evento idéntico ya se registró dentro de la ventana de
+        agrupación, sólo se cuenta; el resumen se escribe al cerrar el grupo.
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for summary in self._close_groups():
+            self._enqueue(summary)
+        
+        key = (level.value, action, service_id, message)
+        if self.coalesce_window > 0:
+            with self._groups_lock:
+                group = self._groups.get(key)
+                if group is not None:
+                    group["count"] += 1
+                    if group["count"] == 1:
+                        group["first"] = timestamp
+                    group["last"] = timestamp
+                    with self._stats_lock:
+                        self._coalesced += 1
+                    return group["entry"]
+        
         entry = LogEntry(
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            timestamp=timestamp,
             level=level.value,
             action=action,
             service_id=service_id,
@@ -81,18 +513,38 @@ class ActivityLogger:
             message=message,
             details=details
         )
+        if self.coalesce_window > 0:
+            with self._groups_lock:
+                self._groups[key] = {
+                    "entry": entry,
+                    "started": time.monotonic(),
+                    "count": 0,
+                    "first": None,
+                    "last": None,
+                }
         self._entries.append(entry)
-        self._save_logs()
+        self._enqueue(entry)
+        self._notify(entry)
         return entry
     
     def log_detection(self, service_id: str, service_name: str, status: str):
-        """Log de detección de servicio"""
+        """Log de detección de servicio (sólo si el estado cambió)
+        
+        Retorna None cuando el estado es el mismo que el último registrado.
+        """
+        previous = self._last_detection.get(service_id)
+        if previous == status:
+            with self._stats_lock:
+                self._suppressed += 1
+            return None
+        self._last_detection[service_id] = status
         return self.log(
             LogLevel.INFO,
             "DETECTION",
             service_id,
             service_name,
-            f"Servicio detectado con estado: {status}"
+            f"Servicio detectado con estado: {status}",
+            {"status": status, "previous": previous}
         )
     
     def log_disable(self, service_id: str, service_name: str, success: bool, message: str):
@@ -140,34 +592,163 @@ class ActivityLogger:
             message
         )
     
+    def log_enforce(self, service_id: str, service_name: str, observed: str,
+                    desired: str, success: bool, message: str):
+        """Log de una corrección de deriva hecha por el agente"""
+        level = LogLevel.WARNING if success else LogLevel.ERROR
+        if success:
+            msg = f"Deriva corregida: {observed} -> {desired}"
+        else:
+            msg = f"No se pudo corregir la deriva ({observed} -> {desired}): {message}"
+        return self.log(
+            level,
+            "ENFORCE",
+            service_id,
+            service_name,
+            msg,
+            {"observed": observed, "desired": desired}
+        )
+    
     def get_entries(self, limit: int = 50) -> List[LogEntry]:
         """Obtiene las últimas entradas del log"""
-        return list(reversed(self._entries[-limit:]))
+        if len(self._entries) < limit and self._has_more_history():
+            self._load_history(limit - len(self._entries))
+        
+        result = []
+        for entry in reversed(self._entries):
+            if len(result) >= limit:
+                break
+            result.append(entry)
+        return result
     
     def get_entries_for_service(self, service_id: str, limit: int = 20) -> List[LogEntry]:
-        """Obtiene entradas de un servicio específico"""
-        filtered = [e for e in self._entries if e.service_id == service_id]
-        return list(reversed(filtered[-limit:]))
+        """Obtiene entradas de un servicio específico (de cualquier día)"""
+        return self.query(service_id=service_id, limit=limit).entries
+    
+    def _ensure_index(self):
+        """Deja el índice al día antes de una consulta"""
+        # Lo encolado debe estar en disco para aparecer en el índice
+        self.flush(timeout=1.0)
+        with self._unindexed_lock:
+            written, self._unindexed = self._unindexed, set()
+        if not self._index_synced:
+            # Primera consulta: indexar días anteriores o de otros procesos
+            self.store.sync_directory(self.log_dir)
+            self._index_synced = True
+        else:
+            # Lo escrito desde la última consulta, y el segmento del día por
+            # si otro proceso (p. ej. la CLI) escribió en él
+            for path in written | {self.current_log_file}:
+                self.store.sync_file(path)
+    
+    def query(self, start=None, end=None, service_id: Optional[str] = None,
+              action: Optional[str] = None, level: Optional[str] = None,
+              text: Optional[str] = None, limit: int = 50,
+              cursor: Optional[Tuple[str, int]] = None):
+        """Consulta paginada de entradas entre días (ver LogStore.query)"""
+        self._ensure_index()
+        return self.store.query(
+            start=start, end=end, service_id=service_id, action=action,
+            level=level, text=text, limit=limit, cursor=cursor
+        )
+    
+    def count(self, start=None, end=None, service_id: Optional[str] = None,
+              action: Optional[str] = None, level: Optional[str] = None,
+              text: Optional[str] = None) -> int:
+        """Cuenta entradas que cumplen los filtros sin cargarlas"""
+        self._ensure_index()
+        return self.store.count(
+            start=start, end=end, service_id=service_id, action=action,
+            level=level, text=text
+        )
+    
+    def aggregate(self, group_by: str, start=None, end=None,
+                  service_id: Optional[str] = None, action: Optional[str] = None,
+                  level: Optional[str] = None, text: Optional[str] = None) -> Dict[str, int]:
+        """Conteos agrupados por service_id, action, level o day"""
+        self._ensure_index()
+        return self.store.aggregate(
+            group_by, start=start, end=end, service_id=service_id,
+            action=action, level=level, text=text
+        )
+    
+    def get_logged_services(self) -> Dict[str, str]:
+        """Servicios que aparecen en el log: {service_id: service_name}"""
+        self._ensure_index()
+        return self.store.services()
+    
+    def iter_entries(self, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Iterator[LogEntry]:
+        """Itera en orden cronológico las entradas de todos los segmentos
+        (activos y comprimidos) sin cargarlos completos en memoria"""
+        self.flush(timeout=1.0)
+        for record in iter_log_records(self.log_dir, start, end):
+            try:
+                yield LogEntry(**record)
+            except TypeError:
+                continue
+    
+    def get_log_files_info(self) -> List[Dict[str, Any]]:
+        """Lista los segmentos de log con fecha, tamaño y número de entradas"""
+        self._ensure_index()
+        counts = self.store.source_counts()
+        info = []
+        for segment in reversed(list_segments(self.log_dir)):
+            try:
+                size = os.path.getsize(segment.path)
+            except OSError:
+                continue
+            info.append({
+                "filename": segment.name,
+                "path": segment.path,
+                "date": f"{segment.date[:4]}-{segment.date[4:6]}-{segment.date[6:8]}",
+                "size": size,
+                "compressed": segment.compressed,
+                "entries": counts.get(segment.name, 0),
+            })
+        return info
     
     def get_all_log_files(self) -> List[str]:
         """Lista todos los archivos de log disponibles"""
-        try:
-            files = [f for f in os.listdir(self.log_dir) if f.endswith('.json')]
-            return sorted(files, reverse=True)
-        except:
-            return []
+        return [segment.name for segment in reversed(list_segments(self.log_dir))]
     
     def clear_old_logs(self, days_to_keep: int = 30):
         """Elimina logs más antiguos que X días"""
         try:
-            cutoff = datetime.now().timestamp() - (days_to_keep * 86400)
-            for filename in os.listdir(self.log_dir):
-                filepath = os.path.join(self.log_dir, filename)
-                if os.path.getmtime(filepath) < cutoff:
-                    os.remove(filepath)
-        except:
+            self._compact_segments(max_age_days=days_to_keep)
+        except Exception:
             pass
 
 
-# Instancia global del logger
-activity_logger = ActivityLogger()
+_logger_instance: Optional[ActivityLogger] = None
+_logger_lock = threading.Lock()
+
+
+def get_activity_logger() -> ActivityLogger:
+    """Retorna el logger global, creándolo en el primer uso"""
+    global _logger_instance
+    if _logger_instance is None:
+        with _logger_lock:
+            if _logger_instance is None:
+                _logger_instance = ActivityLogger()
+    return _logger_instance
+
+
+class _LazyActivityLogger:
+    """Proxy que difiere la construcción del logger global hasta su primer uso
+    
+    Importar este módulo no crea directorios, no abre archivos ni arranca el
+    hilo escritor.
+    """
+    
+    def __getattr__(self, name):
+        return getattr(get_activity_logger(), name)
+    
+    def close(self, timeout: Optional[float] = 5.0):
+        # Cerrar un logger que nunca se usó no debe crearlo
+        if _logger_instance is not None:
+            _logger_instance.close(timeout)
+
+
+# Instancia global del logger (construcción perezosa)
+activity_logger = _LazyActivityLogger()
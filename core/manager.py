@@ -3,53 +3,41 @@ Gestor de servicios AI
 Habilita, deshabilita y remueve servicios AI de Windows
 """
 
-import winreg
 import subprocess
 import os
 import json
 from datetime import datetime
-from typing import Tuple, Optional
-from .ai_services import AIService, ServiceStatus
+from typing import List, Tuple, Optional, Callable, Set
+from .ai_services import AIService, ServiceStatus, intern_hive
+from .registry import RegistryBackend, WinRegistry
+from .runner import command_runner
+from .system_state import SystemState, capture_registry, capture_state
 
 
 class AIServiceManager:
     """Gestiona la habilitación/deshabilitación de servicios AI"""
     
-    def __init__(self):
+    def __init__(self, registry: Optional[RegistryBackend] = None):
+        self.registry = registry or WinRegistry()
+        # El directorio se crea al escribir el primer backup
         self.backup_dir = os.path.join(os.path.expanduser("~"), ".win-ai-tools-backup")
-        os.makedirs(self.backup_dir, exist_ok=True)
     
     def disable_service(self, service: AIService) -> Tuple[bool, str]:
         """Deshabilita un servicio AI"""
-        errors = []
-        success_count = 0
-        
         # Modificar Registry
-        if service.registry_paths:
-            for reg_info in service.registry_paths:
-                success, error = self._set_registry_value(
-                    reg_info["hive"],
-                    reg_info["path"],
-                    reg_info["key"],
-                    reg_info["disable_value"]
-                )
-                if success:
-                    success_count += 1
-                else:
-                    errors.append(error)
+        success_count, errors = self._apply_registry_rules(service, disable=True)
         
         # Remover Appx packages
-        if service.appx_packages:
-            for package in service.appx_packages:
-                success, error = self._remove_appx_package(package)
-                if success:
-                    success_count += 1
-                elif "not found" not in error.lower():
-                    errors.append(error)
+        for rule in service.appx_rules:
+            success, error = self._remove_appx_package(rule.package)
+            if success:
+                success_count += 1
+            elif "not found" not in error.lower():
+                errors.append(error)
         
         # Deshabilitar Windows Feature
-        if service.windows_feature:
-            success, error = self._disable_windows_feature(service.windows_feature)
+        if service.feature_rule:
+            success, error = self._disable_windows_feature(service.feature_rule.name)
             if success:
                 success_count += 1
             elif "not found" not in error.lower():
@@ -62,26 +50,12 @@ class AIServiceManager:
     
     def enable_service(self, service: AIService) -> Tuple[bool, str]:
         """Habilita un servicio AI (restaura valores por defecto)"""
-        errors = []
-        success_count = 0
-        
         # Modificar Registry
-        if service.registry_paths:
-            for reg_info in service.registry_paths:
-                success, error = self._set_registry_value(
-                    reg_info["hive"],
-                    reg_info["path"],
-                    reg_info["key"],
-                    reg_info["enable_value"]
-                )
-                if success:
-                    success_count += 1
-                else:
-                    errors.append(error)
+        success_count, errors = self._apply_registry_rules(service, disable=False)
         
         # Habilitar Windows Feature
-        if service.windows_feature:
-            success, error = self._enable_windows_feature(service.windows_feature)
+        if service.feature_rule:
+            success, error = self._enable_windows_feature(service.feature_rule.name)
             if success:
                 success_count += 1
             elif "not found" not in error.lower():
@@ -92,18 +66,91 @@ class AIServiceManager:
         else:
             return False, "; ".join(errors) if errors else "No se realizaron cambios"
     
+    def apply_registry_rules(self, service: AIService, disable: bool) -> Tuple[bool, str]:
+        """Re-escribe sólo los valores de registro del servicio, sin PowerShell"""
+        success_count, errors = self._apply_registry_rules(service, disable)
+        if errors:
+            return False, "; ".join(errors)
+        if success_count > 0:
+            return True, f"Registro restablecido ({success_count} valores)"
+        return False, "No se realizaron cambios"
+    
+    def _apply_registry_rules(self, service: AIService, disable: bool) -> Tuple[int, List[str]]:
+        """(valores escritos, errores) al aplicar las reglas de registro"""
+        errors = []
+        success_count = 0
+        for rule in service.registry_rules:
+            success, error = self._set_registry_value(
+                rule.hive, rule.path, rule.key,
+                rule.disable_value if disable else rule.enable_value
+            )
+            if success:
+                success_count += 1
+            else:
+                errors.append(error)
+        return success_count, errors
+    
+    def apply_bundle(self, bundle, catalog=None,
+                     cancelled: Optional[Callable[[], bool]] = None) -> List[Tuple[str, str, bool, str]]:
+        """Ejecuta un perfil compilado sin detectar: (service_id, acción, éxito, mensaje)
+        
+        Lanza StaleBundleError si el bundle es de otro catálogo. Cada clave
+        del registro se abre una vez para todos sus valores; después corren
+        los pasos de Appx/Features. Un servicio cuenta como aplicado si al
+        menos uno de sus cambios se aplicó, como en disable_service().
+        """
+        bundle.check(catalog)
+        applied = {service_id: 0 for service_id, _ in bundle.actions}
+        errors = {service_id: [] for service_id, _ in bundle.actions}
+        
+        for write in bundle.writes:
+            if cancelled and cancelled():
+                break
+            try:
+                self.registry.set_dwords(write.hive, write.path, dict(write.values))
+                error = None
+            except PermissionError:
+                error = f"Sin permisos para modificar: {write.path}"
+            except Exception as e:
+                error = f"Error en registry: {str(e)}"
+            for owners in write.owners:
+                for service_id in owners:
+                    if error is None:
+                        applied[service_id] += 1
+                    elif error not in errors[service_id]:
+                        errors[service_id].append(error)
+        
+        for op in bundle.ops:
+            if cancelled and cancelled():
+                break
+            if op.kind == "appx":
+                success, error = self._remove_appx_package(op.target)
+            elif op.action == "disable":
+                success, error = self._disable_windows_feature(op.target)
+            else:
+                success, error = self._enable_windows_feature(op.target)
+            if success:
+                applied[op.service_id] += 1
+            elif "not found" not in error.lower():
+                errors[op.service_id].append(error)
+        
+        results = []
+        for service_id, action in bundle.actions:
+            count = applied[service_id]
+            if count > 0:
+                verb = "deshabilitado" if action == "disable" else "habilitado"
+                results.append((service_id, action, True,
+                                f"Servicio {verb} ({count} cambios aplicados)"))
+            else:
+                message = "; ".join(errors[service_id]) or "No se realizaron cambios"
+                results.append((service_id, action, False, message))
+        return results
+    
     def _set_registry_value(self, hive, path: str, key: str, value: int) -> Tuple[bool, str]:
         """Establece un valor en el registro de Windows"""
         try:
-            # Crear la key si no existe
-            reg_key = winreg.CreateKeyEx(
-                hive,
-                path,
-                0,
-                winreg.KEY_WRITE
-            )
-            winreg.SetValueEx(reg_key, key, 0, winreg.REG_DWORD, value)
-            winreg.CloseKey(reg_key)
+            # Crea la key si no existe
+            self.registry.set_dword(hive, path, key, value)
             return True, ""
         except PermissionError:
             return False, f"Sin permisos para modificar: {path}\\{key}"
@@ -115,11 +162,8 @@ class AIServiceManager:
         try:
             # Primero verificar si existe
             check_cmd = f"Get-AppxPackage -Name '*{package_name}*'"
-            check_result = subprocess.run(
-                ["powershell", "-Command", check_cmd],
-                capture_output=True,
-                text=True,
-                timeout=30
+            check_result = command_runner.run(
+                "appx.find", ["powershell", "-Command", check_cmd], timeout=30
             )
             
             if not check_result.stdout.strip():
@@ -127,18 +171,15 @@ class AIServiceManager:
             
             # Remover el paquete
             remove_cmd = f"Get-AppxPackage -Name '*{package_name}*' | Remove-AppxPackage"
-            result = subprocess.run(
-                ["powershell", "-Command", remove_cmd],
-                capture_output=True,
-                text=True,
-                timeout=60
+            result = command_runner.run(
+                "appx.remove", ["powershell", "-Command", remove_cmd], timeout=60, adaptive=False
             )
             
             if result.returncode == 0:
                 return True, ""
             else:
                 return False, result.stderr or "Error removing package"
-                
+        
         except subprocess.TimeoutExpired:
             return False, "Timeout removing package"
         except Exception as e:
@@ -148,18 +189,15 @@ class AIServiceManager:
         """Deshabilita una Windows Feature"""
         try:
             cmd = f"Disable-WindowsOptionalFeature -Online -FeatureName '{feature_name}' -NoRestart"
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=120
+            result = command_runner.run(
+                "feature.disable", ["powershell", "-Command", cmd], timeout=120, adaptive=False
             )
             
             if result.returncode == 0 or "not found" in result.stderr.lower():
                 return True, ""
             else:
                 return False, result.stderr or "Error disabling feature"
-                
+        
         except subprocess.TimeoutExpired:
             return False, "Timeout disabling feature"
         except Exception as e:
@@ -169,70 +207,65 @@ class AIServiceManager:
         """Habilita una Windows Feature"""
         try:
             cmd = f"Enable-WindowsOptionalFeature -Online -FeatureName '{feature_name}' -NoRestart"
-            result = subprocess.run(
-                ["powershell", "-Command", cmd],
-                capture_output=True,
-                text=True,
-                timeout=120
+            result = command_runner.run(
+                "feature.enable", ["powershell", "-Command", cmd], timeout=120, adaptive=False
             )
             
             if result.returncode == 0:
                 return True, ""
             else:
                 return False, result.stderr or "Error enabling feature"
-                
+        
         except subprocess.TimeoutExpired:
             return False, "Timeout enabling feature"
         except Exception as e:
             return False, str(e)
     
-    def create_backup(self, services: list) -> Tuple[bool, str]:
-        """Crea backup de todas las configuraciones actuales"""
+    def create_backup(self, services: list,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      cancelled: Optional[Callable[[], bool]] = None,
+                      state: Optional[SystemState] = None) -> Tuple[bool, str]:
+        """Crea backup de todas las configuraciones actuales
+        
+        Los valores salen de `state` (p. ej. la captura con la que se acaba
+        de detectar) o, sin ella, de una captura del registro en la que cada
+        clave se abre una sola vez. El archivo se escribe de forma atómica,
+        así el backup nunca queda a medias. `progress(done, total)` informa
+        el avance y `cancelled()` permite abortar antes de escribir.
+        """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            os.makedirs(self.backup_dir, exist_ok=True)
             backup_file = os.path.join(self.backup_dir, f"backup_{timestamp}.json")
             
+            if state is None:
+                state = capture_state(self.registry, services, probes=False,
+                                      progress=progress, cancelled=cancelled)
+                if state is None:
+                    return False, "Backup cancelado"
+            
             backup_data = {
                 "timestamp": timestamp,
-                "services": []
+                "services": [
+                    {
+                        "id": service.id,
+                        "name": service.name,
+                        "registry_values": state.backup_values(service)
+                    }
+                    for service in services
+                ]
             }
             
-            for service in services:
-                service_backup = {
-                    "id": service.id,
-                    "name": service.name,
-                    "registry_values": []
-                }
-                
-                # Exportar valores de registry actuales
-                if service.registry_paths:
-                    for reg_info in service.registry_paths:
-                        try:
-                            key = winreg.OpenKey(
-                                reg_info["hive"],
-                                reg_info["path"],
-                                0,
-                                winreg.KEY_READ
-                            )
-                            value, _ = winreg.QueryValueEx(key, reg_info["key"])
-                            winreg.CloseKey(key)
-                            
-                            service_backup["registry_values"].append({
-                                "path": reg_info["path"],
-                                "key": reg_info["key"],
-                                "value": value,
-                                "hive": "HKLM" if reg_info["hive"] == winreg.HKEY_LOCAL_MACHINE else "HKCU"
-                            })
-                        except:
-                            pass
-                
-                backup_data["services"].append(service_backup)
+            if cancelled and cancelled():
+                return False, "Backup cancelado"
             
-            with open(backup_file, 'w') as f:
+            temp_file = backup_file + ".tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(backup_data, f, indent=2)
+            os.replace(temp_file, backup_file)
             
             return True, backup_file
-            
+        
         except Exception as e:
             return False, str(e)
     
@@ -252,17 +285,48 @@ class AIServiceManager:
         except:
             return []
     
-    def restore_backup(self, backup_path: str) -> Tuple[bool, str]:
-        """Restaura configuraciones desde un backup"""
+    def restore_backup(self, backup_path: str,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       cancelled: Optional[Callable[[], bool]] = None,
+                       changed_services: Optional[Set[str]] = None,
+                       state: Optional[SystemState] = None) -> Tuple[bool, str]:
+        """Restaura configuraciones desde un backup
+        
+        Sólo escribe los valores que difieren del estado actual, tomado de
+        `state` si se indica; los valores que esa captura no cubre se leen
+        en una captura agrupada. Los ids de los servicios modificados se
+        agregan a `changed_services`, para que la interfaz re-detecte sólo
+        esos.
+        """
         try:
             with open(backup_path, 'r') as f:
                 backup_data = json.load(f)
             
-            restored_count = 0
-            
+            pending = []
             for service_data in backup_data.get("services", []):
                 for reg_value in service_data.get("registry_values", []):
-                    hive = winreg.HKEY_LOCAL_MACHINE if reg_value["hive"] == "HKLM" else winreg.HKEY_CURRENT_USER
+                    hive = intern_hive(reg_value["hive"])
+                    pending.append((service_data.get("id"), hive, reg_value))
+            
+            # Estado actual para comparar: sólo se lee lo que `state` no cubre
+            reads = {}
+            for _, hive, reg_value in pending:
+                if state is None or not state.covers(hive, reg_value["path"], reg_value["key"]):
+                    names = reads.setdefault((hive, reg_value["path"]), [])
+                    if reg_value["key"] not in names:
+                        names.append(reg_value["key"])
+            values = list(state.registry.values()) if state is not None else []
+            if reads:
+                values += capture_registry(self.registry, reads)
+            current = SystemState(values)
+            
+            restored_count = 0
+            total = len(pending)
+            for done, (service_id, hive, reg_value) in enumerate(pending, start=1):
+                if cancelled and cancelled():
+                    return False, f"Restauración cancelada ({restored_count} valores restaurados)"
+                
+                if current.differs(hive, reg_value["path"], reg_value["key"], reg_value["value"]):
                     success, _ = self._set_registry_value(
                         hive,
                         reg_value["path"],
@@ -271,8 +335,12 @@ class AIServiceManager:
                     )
                     if success:
                         restored_count += 1
+                        if changed_services is not None and service_id:
+                            changed_services.add(service_id)
+                if progress:
+                    progress(done, total)
             
             return True, f"Restaurados {restored_count} valores"
-            
+        
         except Exception as e:
             return False, str(e)
@@ -0,0 +1,87 @@
+"""
+Perfiles de configuración y planes de cambios
+Un perfil indica el estado deseado de cada servicio; un plan es la lista de
+acciones necesarias para llevar el sistema a ese estado. Los perfiles se
+declaran en el catálogo (sección "profiles" de services.json)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .ai_services import AIService, ServiceStatus
+from .catalog import Catalog, default_catalog
+
+
+def profile_names(catalog: Optional[Catalog] = None) -> List[str]:
+    """Perfiles disponibles en el catálogo (por defecto, el incluido)"""
+    return list((catalog or default_catalog()).profiles)
+
+
+def unknown_profile_message(name: str, catalog: Optional[Catalog] = None) -> str:
+    """Mensaje de error para un perfil inexistente, con los disponibles"""
+    return f"Perfil desconocido: {name} (disponibles: {', '.join(profile_names(catalog))})"
+
+
+def targets_for(services: List[AIService], profile: Optional[str] = None,
+                enable: bool = False, catalog: Optional[Catalog] = None) -> Dict[str, ServiceStatus]:
+    """Estado deseado según un perfil, o el mismo estado para todos
+    
+    Sin perfil, todos los `services` quedan habilitados (`enable`) o
+    deshabilitados. Lanza KeyError si el perfil no existe.
+    """
+    if profile:
+        return resolve_profile(profile, services, catalog)
+    desired = ServiceStatus.ENABLED if enable else ServiceStatus.DISABLED
+    return {service.id: desired for service in services}
+
+
+@dataclass
+class PlanStep:
+    """Acción necesaria sobre un servicio"""
+    service: AIService
+    action: str                  # "disable" o "enable"
+    current: ServiceStatus
+    desired: ServiceStatus
+
+
+def resolve_profile(name: str, services: List[AIService],
+                    catalog: Optional[Catalog] = None) -> Dict[str, ServiceStatus]:
+    """Estado deseado por servicio según un perfil del catálogo
+    
+    "*" aplica a los servicios que el perfil no nombra. Lanza KeyError si
+    el perfil no existe.
+    """
+    profile = (catalog or default_catalog()).profiles[name]
+    default = profile.get("*")
+    targets = {}
+    for service in services:
+        desired = profile.get(service.id, default)
+        if desired is not None:
+            targets[service.id] = desired
+    return targets
+
+
+def build_plan(services: List[AIService], targets: Dict[str, ServiceStatus]) -> List[PlanStep]:
+    """Acciones para pasar del estado detectado al deseado
+    
+    Los servicios no instalados se omiten; los de estado desconocido se
+    incluyen porque aplicar la acción es inocuo si ya estaban en ese estado.
+    """
+    plan = []
+    for service in services:
+        desired = targets.get(service.id)
+        if desired is None or service.status in (desired, ServiceStatus.NOT_INSTALLED):
+            continue
+        action = action_for(desired)
+        if action:
+            plan.append(PlanStep(service, action, service.status, desired))
+    return plan
+
+
+def action_for(desired: ServiceStatus) -> Optional[str]:
+    """Acción que lleva a `desired`; None si el estado no se puede imponer"""
+    if desired == ServiceStatus.DISABLED:
+        return "disable"
+    if desired == ServiceStatus.ENABLED:
+        return "enable"
+    return None
@@ -0,0 +1,351 @@
+"""
+Acceso al registro de Windows
+El detector y el gestor leen y escriben a través de un backend, para poder
+usar el registro real (winreg), uno en memoria (pruebas, agente) o una
+exportación .reg sin conexión (análisis fuera de Windows)
+
+Los hives se identifican con los nombres internados de ai_services (HKLM,
+HKCU); cada backend los traduce a lo que necesite.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .ai_services import HKLM, HKCU
+
+
+# (última escritura, {nombre: (valor, tipo REG_*)})
+KeyRead = Tuple[Optional[int], Dict[str, Tuple[Any, str]]]
+
+
+def value_type(value: Any) -> str:
+    """Tipo REG_* inferido de un valor Python (backends sin tipo propio)"""
+    if isinstance(value, int):
+        return "REG_DWORD" if 0 <= value <= 0xFFFFFFFF else "REG_QWORD"
+    if isinstance(value, str):
+        return "REG_SZ"
+    if isinstance(value, (bytes, bytearray)):
+        return "REG_BINARY"
+    if isinstance(value, list):
+        return "REG_MULTI_SZ"
+    return "REG_NONE"
+
+
+class RegistryBackend:
+    """Interfaz común de los backends de registro"""
+    
+    def read_values(self, hive, path: str, names: Iterable[str]) -> Dict[str, Any]:
+        """Lee varios valores de una clave; omite los que no existen"""
+        raise NotImplementedError
+    
+    def set_dword(self, hive, path: str, name: str, value: int):
+        """Escribe un valor REG_DWORD, creando la clave si no existe
+        
+        Lanza PermissionError u OSError si no se puede escribir.
+        """
+        raise NotImplementedError
+    
+    def set_dwords(self, hive, path: str, values: Dict[str, int]):
+        """Escribe varios REG_DWORD de una misma clave
+        
+        Los backends que pueden lo hacen con una sola apertura de la clave.
+        """
+        for name, value in values.items():
+            self.set_dword(hive, path, name, value)
+    
+    def last_write(self, hive, path: str) -> Optional[int]:
+        """Marca de la última escritura de una clave; None si no existe
+        
+        Sólo se compara por igualdad: sirve para detectar cambios por sondeo.
+        """
+        raise NotImplementedError
+    
+    def read_key(self, hive, path: str, names: Iterable[str]) -> Optional[KeyRead]:
+        """Valores con su tipo y la última escritura de una clave, en una lectura
+        
+        Retorna (última escritura, {nombre: (valor, tipo)}) o None si la clave
+        no existe. Los backends que pueden hacerlo con una sola apertura de
+        la clave lo redefinen.
+        """
+        stamp = self.last_write(hive, path)
+        if stamp is None:
+            return None
+        values = self.read_values(hive, path, names)
+        return stamp, {name: (value, value_type(value)) for name, value in values.items()}
+
+
+class WinRegistry(RegistryBackend):
+    """Registro real vía winreg (sólo Windows)"""
+    
+    def __init__(self):
+        # Import aquí: falla al construir el backend, no al importar el módulo
+        import winreg
+        self._winreg = winreg
+        self._hkeys = {HKLM: winreg.HKEY_LOCAL_MACHINE, HKCU: winreg.HKEY_CURRENT_USER}
+        self._type_names = {
+            getattr(winreg, name): name
+            for name in ("REG_NONE", "REG_SZ", "REG_EXPAND_SZ", "REG_BINARY",
+                         "REG_DWORD", "REG_MULTI_SZ", "REG_QWORD")
+        }
+    
+    def hkey(self, hive: str):
+        """Constante winreg.HKEY_* de un hive"""
+        return self._hkeys[hive]
+    
+    def read_values(self, hive, path: str, names: Iterable[str]) -> Dict[str, Any]:
+        winreg = self._winreg
+        values = {}
+        try:
+            key = winreg.OpenKey(self._hkeys[hive], path, 0, winreg.KEY_READ)
+        except OSError:
+            return values
+        try:
+            for name in names:
+                try:
+                    values[name], _ = winreg.QueryValueEx(key, name)
+                except OSError:
+                    pass
+        finally:
+            winreg.CloseKey(key)
+        return values
+    
+    def set_dword(self, hive, path: str, name: str, value: int):
+        winreg = self._winreg
+        key = winreg.CreateKeyEx(self._hkeys[hive], path, 0, winreg.KEY_WRITE)
+        try:
+            winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
+        finally:
+            winreg.CloseKey(key)
+    
+    def set_dwords(self, hive, path: str, values: Dict[str, int]):
+        winreg = self._winreg
+        key = winreg.CreateKeyEx(self._hkeys[hive], path, 0, winreg.KEY_WRITE)
+        try:
+            for name, value in values.items():
+                winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
+        finally:
+            winreg.CloseKey(key)
+    
+    def last_write(self, hive, path: str) -> Optional[int]:
+        winreg = self._winreg
+        try:
+            key = winreg.OpenKey(self._hkeys[hive], path, 0, winreg.KEY_READ)
+        except OSError:
+            return None
+        try:
+            # Tercer elemento: última escritura en unidades de 100 ns
+            return winreg.QueryInfoKey(key)[2]
+        finally:
+            winreg.CloseKey(key)
+    
+    def read_key(self, hive, path: str, names: Iterable[str]) -> Optional[KeyRead]:
+        winreg = self._winreg
+        try:
+            key = winreg.OpenKey(self._hkeys[hive], path, 0, winreg.KEY_READ)
+        except OSError:
+            return None
+        values = {}
+        try:
+            stamp = winreg.QueryInfoKey(key)[2]
+            for name in names:
+                try:
+                    value, kind = winreg.QueryValueEx(key, name)
+                except OSError:
+                    continue
+                values[name] = (value, self._type_names.get(kind, f"REG_{kind}"))
+        finally:
+            winreg.CloseKey(key)
+        return stamp, values
+
+
+class MemoryRegistry(RegistryBackend):
+    """Registro en memoria, thread-safe
+    
+    Las rutas no distinguen mayúsculas, como en Windows. `read_only=True`
+    simula un usuario sin permisos de administrador. Los listeners reciben
+    (hive, path) después de cada escritura, como una notificación de cambio.
+    """
+    
+    def __init__(self, values: Optional[Dict[Tuple[Any, str, str], Any]] = None,
+                 read_only: bool = False):
+        self._lock = threading.Lock()
+        self._keys: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+        self._versions: Dict[Tuple[Any, str], int] = {}
+        self._listeners: List[Callable[[Any, str], None]] = []
+        self.read_only = read_only
+        self.reads = 0
+        self.writes = 0
+        for (hive, path, name), value in (values or {}).items():
+            self._keys.setdefault((hive, path.lower()), {})[name] = value
+    
+    def read_values(self, hive, path: str, names: Iterable[str]) -> Dict[str, Any]:
+        with self._lock:
+            self.reads += 1
+            key = self._keys.get((hive, path.lower()))
+            if key is None:
+                return {}
+            return {name: key[name] for name in names if name in key}
+    
+    def set_dword(self, hive, path: str, name: str, value: int):
+        if self.read_only:
+            raise PermissionError(f"Acceso denegado: {path}\\{name}")
+        with self._lock:
+            self.writes += 1
+            self._keys.setdefault((hive, path.lower()), {})[name] = value
+            self._touch(hive, path)
+        self._notify(hive, path)
+    
+    def set_dwords(self, hive, path: str, values: Dict[str, int]):
+        if self.read_only:
+            raise PermissionError(f"Acceso denegado: {path}")
+        with self._lock:
+            self.writes += len(values)
+            self._keys.setdefault((hive, path.lower()), {}).update(values)
+            self._touch(hive, path)
+        self._notify(hive, path)
+    
+    def last_write(self, hive, path: str) -> Optional[int]:
+        with self._lock:
+            if (hive, path.lower()) not in self._keys:
+                return None
+            return self._versions.get((hive, path.lower()), 0)
+    
+    def read_key(self, hive, path: str, names: Iterable[str]) -> Optional[KeyRead]:
+        with self._lock:
+            self.reads += 1
+            key = self._keys.get((hive, path.lower()))
+            if key is None:
+                return None
+            return self._versions.get((hive, path.lower()), 0), {
+                name: (key[name], value_type(key[name])) for name in names if name in key
+            }
+    
+    def add_listener(self, callback: Callable[[Any, str], None]):
+        """Registra un callback(hive, path) para cada escritura"""
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[Any, str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _touch(self, hive, path: str):
+        key = (hive, path.lower())
+        self._versions[key] = self._versions.get(key, 0) + 1
+    
+    def _notify(self, hive, path: str):
+        for callback in list(self._listeners):
+            callback(hive, path)
+    
+    def get(self, hive, path: str, name: str, default=None):
+        """Valor actual (para pruebas)"""
+        with self._lock:
+            return self._keys.get((hive, path.lower()), {}).get(name, default)
+    
+    def delete(self, hive, path: str, name: str):
+        """Elimina un valor, como si una actualización lo hubiera borrado"""
+        with self._lock:
+            self._keys.get((hive, path.lower()), {}).pop(name, None)
+            self._touch(hive, path)
+        self._notify(hive, path)
+
+
+class OfflineRegistry(MemoryRegistry):
+    """Registro leído de exportaciones .reg (regedit /e, reg export)
+    
+    Permite detectar el estado de otra máquina desde cualquier plataforma.
+    Es de sólo lectura salvo que se indique lo contrario; las escrituras
+    quedan en memoria y nunca se vuelcan al archivo.
+    """
+    
+    def __init__(self, *paths: str, read_only: bool = True):
+        values = {}
+        for path in paths:
+            values.update(parse_reg_file(path))
+        super().__init__(values, read_only=read_only)
+
+
+_REG_ROOTS = {
+    "HKEY_LOCAL_MACHINE": HKLM,
+    "HKLM": HKLM,
+    "HKEY_CURRENT_USER": HKCU,
+    "HKCU": HKCU,
+}
+_REG_VALUE = re.compile(r'^(@|"(?:[^"\\]|\\.)*")=(.*)$')
+
+
+def parse_reg_file(path: str) -> Dict[Tuple[str, str, str], Any]:
+    """Valores de un archivo .reg: {(hive, path, nombre): valor}
+    
+    Admite REGEDIT4 y la versión 5.00 (UTF-16). Se ignoran los hives que no
+    son HKLM/HKCU, las claves y valores eliminados ("-") y los tipos
+    desconocidos. DWORD y QWORD se leen como int, REG_SZ como str y el resto
+    de hex(...) como bytes.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw.startswith(b"\xff\xfe") or raw.startswith(b"\xfe\xff"):
+        text = raw.decode("utf-16")
+    else:
+        text = raw.decode("utf-8-sig", errors="replace")
+    
+    values = {}
+    hive = key_path = None
+    for line in _join_continuations(text.splitlines()):
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            name = line[1:-1]
+            root, _, sub_path = name.partition("\\")
+            if name.startswith("-") or root not in _REG_ROOTS:
+                hive = key_path = None
+            else:
+                hive, key_path = _REG_ROOTS[root], sub_path
+            continue
+        if hive is None:
+            continue
+        match = _REG_VALUE.match(line)
+        if not match:
+            continue
+        raw_name, data = match.groups()
+        name = "" if raw_name == "@" else _unescape(raw_name[1:-1])
+        value = _parse_reg_data(data.strip())
+        if value is not None:
+            values[(hive, key_path, name)] = value
+    return values
+
+
+def _join_continuations(lines: List[str]) -> List[str]:
+    """Une las líneas terminadas en "\\" (valores hex largos)"""
+    joined, current = [], ""
+    for line in lines:
+        stripped = line.rstrip()
+        if stripped.endswith("\\") and not stripped.endswith('"'):
+            current += stripped[:-1].strip()
+            continue
+        joined.append(current + line.strip() if current else line)
+        current = ""
+    if current:
+        joined.append(current)
+    return joined
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _parse_reg_data(data: str):
+    if data == "-":
+        return None
+    if data.startswith('"') and data.endswith('"'):
+        return _unescape(data[1:-1])
+    if data.lower().startswith("dword:"):
+        return int(data[6:], 16)
+    if data.lower().startswith("hex"):
+        kind, _, hex_bytes = data.partition(":")
+        payload = bytes(int(part, 16) for part in hex_bytes.split(",") if part.strip())
+        if kind.lower() == "hex(b)":
+            return int.from_bytes(payload, "little")
+        return payload
+    return None
@@ -0,0 +1,298 @@
+"""
+Vigilancia de claves del registro
+Avisa qué servicios cambiaron para re-detectar sólo esos, en lugar de
+re-escanear todo el catálogo periódicamente
+
+Backends:
+- Windows: RegNotifyChangeKeyValue (notificaciones del sistema)
+- Sondeo de la última escritura de cada clave (fuera de Windows, o para
+  claves que todavía no existen y no se pueden abrir)
+- MemoryRegistry: eventos sintéticos en cada escritura (pruebas)
+"""
+
+import sys
+import time
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .ai_services import AIService
+from .registry import RegistryBackend, MemoryRegistry, WinRegistry
+
+
+WatchKey = Tuple[str, str]  # (hive, path en minúsculas)
+
+
+def _watch_key(hive, path: str) -> WatchKey:
+    return (hive, path.lower())
+
+
+class _PollingWatch:
+    """Compara periódicamente la última escritura de cada clave"""
+    
+    def __init__(self, registry: RegistryBackend, keys: Dict[WatchKey, str],
+                 on_keys: Callable[[Set[WatchKey]], None], interval: float):
+        self.registry = registry
+        self.keys = keys  # {clave normalizada: ruta original}
+        self.on_keys = on_keys
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last = {}
+    
+    def start(self):
+        self._last = {key: self._read(key) for key in self.keys}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="RegistryPoll", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+    
+    def _read(self, key: WatchKey) -> Optional[int]:
+        try:
+            return self.registry.last_write(key[0], self.keys[key])
+        except Exception:
+            return None
+    
+    def poll(self):
+        """Un ciclo de sondeo (también usable sin hilo)"""
+        changed = set()
+        for key in self.keys:
+            stamp = self._read(key)
+            if stamp != self._last.get(key):
+                self._last[key] = stamp
+                changed.add(key)
+        if changed:
+            self.on_keys(changed)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+class _MemoryWatch:
+    """Recibe los eventos sintéticos de un MemoryRegistry"""
+    
+    def __init__(self, registry: MemoryRegistry, keys: Dict[WatchKey, str],
+                 on_keys: Callable[[Set[WatchKey]], None]):
+        self.registry = registry
+        self.keys = keys
+        self.on_keys = on_keys
+    
+    def _on_write(self, hive, path: str):
+        key = _watch_key(hive, path)
+        if key in self.keys:
+            self.on_keys({key})
+    
+    def start(self):
+        self.registry.add_listener(self._on_write)
+    
+    def stop(self):
+        self.registry.remove_listener(self._on_write)
+
+
+class _NotifyWatch:
+    """Notificaciones de cambio de Windows (RegNotifyChangeKeyValue)
+    
+    Las claves que no se pueden abrir (aún no existen) se devuelven en
+    `unwatched` para vigilarlas por sondeo.
+    """
+    
+    REG_NOTIFY_CHANGE_NAME = 0x1
+    REG_NOTIFY_CHANGE_LAST_SET = 0x4
+    WAIT_OBJECT_0 = 0
+    INFINITE = 0xFFFFFFFF
+    
+    def __init__(self, registry: WinRegistry, keys: Dict[WatchKey, str],
+                 on_keys: Callable[[Set[WatchKey]], None]):
+        import ctypes
+        from ctypes import wintypes
+        import winreg
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._winreg = winreg
+        self._advapi32 = ctypes.windll.advapi32
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._kernel32.WaitForMultipleObjects.argtypes = [
+            wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD
+        ]
+        self._advapi32.RegNotifyChangeKeyValue.argtypes = [
+            wintypes.HKEY, wintypes.BOOL, wintypes.DWORD, wintypes.HANDLE, wintypes.BOOL
+        ]
+        
+        self.on_keys = on_keys
+        self.unwatched: Dict[WatchKey, str] = {}
+        self._watched = []  # (clave, handle winreg, evento)
+        for key, path in keys.items():
+            try:
+                handle = winreg.OpenKey(registry.hkey(key[0]), path, 0, winreg.KEY_NOTIFY)
+            except OSError:
+                self.unwatched[key] = path
+                continue
+            event = self._kernel32.CreateEventW(None, False, False, None)
+            self._watched.append((key, handle, event))
+        # WaitForMultipleObjects admite 64 handles, uno es el de parada
+        for key, handle, event in self._watched[63:]:
+            self.unwatched[key] = keys[key]
+            handle.Close()
+            self._kernel32.CloseHandle(event)
+        self._watched = self._watched[:63]
+        self._stop_event = self._kernel32.CreateEventW(None, True, False, None)
+        self._thread = None
+    
+    def _arm(self, handle, event):
+        self._advapi32.RegNotifyChangeKeyValue(
+            self._wintypes.HKEY(handle.handle), False,
+            self.REG_NOTIFY_CHANGE_NAME | self.REG_NOTIFY_CHANGE_LAST_SET,
+            event, True
+        )
+    
+    def start(self):
+        for _, handle, event in self._watched:
+            self._arm(handle, event)
+        self._thread = threading.Thread(target=self._run, name="RegistryNotify", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._kernel32.SetEvent(self._stop_event)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for _, handle, event in self._watched:
+            handle.Close()
+            self._kernel32.CloseHandle(event)
+        self._watched = []
+        self._kernel32.CloseHandle(self._stop_event)
+    
+    def _run(self):
+        handles = [self._stop_event] + [event for _, _, event in self._watched]
+        array = (self._wintypes.HANDLE * len(handles))(*handles)
+        while True:
+            result = self._kernel32.WaitForMultipleObjects(len(handles), array, False, self.INFINITE)
+            index = result - self.WAIT_OBJECT_0
+            if index <= 0 or index >= len(handles):
+                return
+            key, handle, event = self._watched[index - 1]
+            # La notificación es de un solo uso: volver a armarla
+            self._arm(handle, event)
+            self.on_keys({key})
+
+
+class RegistryWatcher:
+    """Vigila las claves de las reglas de registro y agrupa los cambios por servicio
+    
+    `on_change(service_ids)` se llama desde un hilo propio, una vez que pasó
+    `debounce` segundos sin nuevos cambios (o `max_delay` desde el primero),
+    con todos los servicios afectados por la ráfaga.
+    """
+    
+    def __init__(self, services: List[AIService], registry: RegistryBackend,
+                 on_change: Callable[[Set[str]], None],
+                 debounce: float = 0.5, max_delay: float = 5.0,
+                 poll_interval: float = 5.0):
+        self.registry = registry
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        
+        self._services_by_key: Dict[WatchKey, Set[str]] = {}
+        self._paths: Dict[WatchKey, str] = {}
+        for service in services:
+            for rule in service.registry_rules:
+                key = _watch_key(rule.hive, rule.path)
+                self._services_by_key.setdefault(key, set()).add(service.id)
+                self._paths[key] = rule.path
+        
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._first_event = None
+        self._last_event = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._dispatcher = None
+        self._backends = []
+        self.events = 0
+        self.deliveries = 0
+    
+    @property
+    def backend_names(self) -> List[str]:
+        return [type(backend).__name__ for backend in self._backends]
+    
+    def start(self):
+        """Arranca el backend adecuado para el registro y el despachador"""
+        if isinstance(self.registry, MemoryRegistry):
+            self._backends = [_MemoryWatch(self.registry, self._paths, self._on_keys)]
+        else:
+            remaining = dict(self._paths)
+            if sys.platform == "win32" and isinstance(self.registry, WinRegistry):
+                try:
+                    notify = _NotifyWatch(self.registry, remaining, self._on_keys)
+                    self._backends.append(notify)
+                    remaining = notify.unwatched
+                except Exception:
+                    pass
+            if remaining:
+                self._backends.append(
+                    _PollingWatch(self.registry, remaining, self._on_keys, self.poll_interval)
+                )
+        
+        for backend in self._backends:
+            backend.start()
+        self._stop.clear()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="RegistryWatch", daemon=True)
+        self._dispatcher.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for backend in self._backends:
+            backend.stop()
+        self._backends = []
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=2.0)
+            self._dispatcher = None
+    
+    def _on_keys(self, keys: Iterable[WatchKey]):
+        """Llamado por los backends (desde cualquier hilo)"""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._pending |= self._services_by_key.get(key, set())
+            self.events += 1
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+        self._wake.set()
+    
+    def flush(self) -> Set[str]:
+        """Entrega ya los cambios pendientes, sin esperar el debounce"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._first_event = self._last_event = None
+        if pending:
+            self.deliveries += 1
+            self.on_change(pending)
+        return pending
+    
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                if self._first_event is None:
+                    timeout = None
+                else:
+                    now = time.monotonic()
+                    deadline = min(self._last_event + self.debounce,
+                                   self._first_event + self.max_delay)
+                    timeout = deadline - now
+            
+            if timeout is not None and timeout <= 0:
+                self.flush()
+                continue
+            
+            self._wake.wait(timeout)
+            self._wake.clear()
@@ -0,0 +1,205 @@
+"""
+Ejecución de comandos externos (PowerShell)
+Todas las llamadas a subprocess de `core` pasan por aquí. El timeout de
+cada tipo de comando se aprende de sus latencias recientes en lugar de
+usar un valor fijo, y un circuit breaker por ejecutable hace que, tras
+varios fallos seguidos (timeout o no se pudo lanzar), las llamadas
+siguientes fallen de inmediato en lugar de esperar cada una su timeout.
+Si el ejecutable no existe se detecta una sola vez por sesión.
+"""
+
+import time
+import shutil
+import threading
+import subprocess
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+
+class CommandUnavailable(OSError):
+    """El ejecutable no existe o su circuito está abierto: no se lanzó nada"""
+
+
+class _Latency:
+    """Latencias recientes de un tipo de comando"""
+    
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Circuit:
+    """Circuit breaker de un ejecutable: closed -> open -> half-open"""
+    
+    def __init__(self):
+        self.failures = 0          # fallos consecutivos
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.rejected = 0
+    
+    def state(self, now: float, reset_after: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if now - self.opened_at >= reset_after else "open"
+
+
+class CommandRunner:
+    """Lanza comandos con timeouts adaptativos y corte rápido ante fallos
+    
+    - Timeout (sólo consultas, `adaptive=True`): `timeout_factor` veces el
+      percentil `percentile` de las últimas `window` duraciones del mismo
+      `kind`, entre `min_timeout` y el timeout por defecto de la llamada
+      (que sigue siendo el máximo). Hasta tener `min_samples` se usa el
+      timeout por defecto. Un timeout cuenta como muestra de su duración,
+      así el siguiente es más holgado. Los comandos que modifican el
+      sistema usan siempre su timeout fijo: cortar a medias una remoción
+      Appx o un cambio de feature deja el sistema en un estado desconocido.
+    - Circuito: `failure_threshold` fallos seguidos de un ejecutable lo
+      abren; mientras está abierto las llamadas lanzan CommandUnavailable
+      sin ejecutar nada. Pasados `reset_after` segundos se deja pasar una
+      llamada de prueba: si funciona se cierra, si falla se vuelve a abrir.
+    - Un código de salida distinto de cero no es un fallo: es la respuesta
+      del comando (p. ej. "feature no encontrada").
+    """
+    
+    def __init__(self, min_timeout: float = 5.0, timeout_factor: float = 3.0,
+                 percentile: float = 0.95, min_samples: int = 5, window: int = 50,
+                 failure_threshold: int = 3, reset_after: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 which: Callable[[str], Optional[str]] = shutil.which):
+        self.min_timeout = min_timeout
+        self.timeout_factor = timeout_factor
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self._which = which
+        self._lock = threading.Lock()
+        self._latency: Dict[str, _Latency] = {}
+        self._circuits: Dict[str, _Circuit] = {}
+        self._available: Dict[str, bool] = {}
+    
+    def available(self, executable: str) -> bool:
+        """Si el ejecutable existe; se averigua una vez por sesión"""
+        with self._lock:
+            known = self._available.get(executable)
+        if known is None:
+            known = self._which(executable) is not None
+            with self._lock:
+                self._available[executable] = known
+        return known
+    
+    def timeout_for(self, kind: str, default: float) -> float:
+        """Timeout que se usaría ahora para `kind`"""
+        with self._lock:
+            learned = self._learned(self._latency.get(kind))
+        return default if learned is None else min(default, learned)
+    
+    def _learned(self, latency: Optional[_Latency]) -> Optional[float]:
+        if latency is None or len(latency.samples) < self.min_samples:
+            return None
+        return max(self.min_timeout, latency.percentile(self.percentile) * self.timeout_factor)
+    
+    def run(self, kind: str, args: List[str], timeout: float, adaptive: bool = True,
+            **kwargs) -> subprocess.CompletedProcess:
+        """subprocess.run(args, capture_output=True, text=True) con timeout adaptativo
+        
+        `kind` agrupa llamadas comparables (p. ej. "appx.list"); `timeout`
+        es el máximo, o el timeout exacto con `adaptive=False` (comandos
+        que modifican el sistema). Lanza CommandUnavailable sin ejecutar
+        nada si el ejecutable no existe o su circuito está abierto, y
+        subprocess.TimeoutExpired si se agota el timeout.
+        """
+        executable = args[0]
+        if not self.available(executable):
+            raise CommandUnavailable(f"{executable} no está disponible en este sistema")
+        
+        with self._lock:
+            circuit = self._circuits.setdefault(executable, _Circuit())
+            state = circuit.state(self.clock(), self.reset_after)
+            if state == "open":
+                circuit.rejected += 1
+                raise CommandUnavailable(
+                    f"{executable}: demasiados fallos seguidos, se reintentará más tarde"
+                )
+            if state == "half-open":
+                # Una sola llamada de prueba; las demás siguen fallando rápido
+                circuit.opened_at = self.clock()
+        
+        effective = self.timeout_for(kind, timeout) if adaptive else timeout
+        kwargs.setdefault("capture_output", True)
+        kwargs.setdefault("text", True)
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(args, timeout=effective, **kwargs)
+        except subprocess.TimeoutExpired:
+            self._record(kind, executable, effective, failed=True, timed_out=True)
+            raise
+        except OSError:
+            self._record(kind, executable, None, failed=True)
+            raise
+        self._record(kind, executable, time.perf_counter() - start, failed=False)
+        return result
+    
+    def _record(self, kind: str, executable: str, duration: Optional[float],
+                failed: bool, timed_out: bool = False):
+        with self._lock:
+            latency = self._latency.setdefault(kind, _Latency(self.window))
+            latency.calls += 1
+            if duration is not None:
+                latency.samples.append(duration)
+            circuit = self._circuits.setdefault(executable, _Circuit())
+            if not failed:
+                circuit.failures = 0
+                circuit.opened_at = None
+                return
+            latency.failures += 1
+            latency.timeouts += timed_out
+            circuit.failures += 1
+            if circuit.failures >= self.failure_threshold:
+                if circuit.opened_at is None:
+                    circuit.trips += 1
+                circuit.opened_at = self.clock()
+    
+    def stats(self) -> dict:
+        """Latencias aprendidas, timeouts vigentes y estado de los circuitos"""
+        now = self.clock()
+        with self._lock:
+            commands = {}
+            for kind, latency in self._latency.items():
+                p50 = latency.percentile(0.5)
+                p95 = latency.percentile(0.95)
+                commands[kind] = {
+                    "calls": latency.calls,
+                    "failures": latency.failures,
+                    "timeouts": latency.timeouts,
+                    "p50_ms": None if p50 is None else round(p50 * 1000, 1),
+                    "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+                    "learned_timeout_s": self._learned(latency),
+                }
+            executables = {
+                executable: {"available": available}
+                for executable, available in self._available.items()
+            }
+            for executable, circuit in self._circuits.items():
+                executables.setdefault(executable, {}).update({
+                    "circuit": circuit.state(now, self.reset_after),
+                    "consecutive_failures": circuit.failures,
+                    "trips": circuit.trips,
+                    "rejected": circuit.rejected,
+                })
+        return {"commands": commands, "executables": executables}
+
+
+# Instancia compartida por detector, gestor y captura de estado
+command_runner = CommandRunner()
@@ -0,0 +1,605 @@
+"""
+Servidor local JSON-RPC
+Un único proceso mantiene el detector "caliente" (estados ya detectados,
+backend de registro abierto, vigilancia de claves) y atiende a la interfaz
+gráfica y a la CLI a la vez, en lugar de que cada invocación re-detecte
+todo y lance sus propios PowerShell
+
+Transporte: multiprocessing.connection (named pipe en Windows, socket Unix
+en el resto), un mensaje JSON-RPC 2.0 por send_bytes/recv_bytes. Cada
+conexión se autentica con una clave por usuario guardada en un archivo
+0600 (`default_authkey_path`): sólo quien puede leerla puede pedir
+`apply`.
+
+Métodos:
+    detect      {service_ids?, max_age?}           -> [{id, name, status, source, evidence, version}]
+    plan        {profile?, service_ids?, enable?}  -> [{id, action, current, desired}]
+    apply       {profile?, service_ids?, enable?, backup?}
+                                                   -> {backup, results: [{id, action, success, message}]}
+    log.query   {start?, end?, service_id?, action?, level?, text?, limit?, cursor?}
+                                                   -> {entries, next_cursor}
+    invalidate  {service_ids?}                     -> servicios descartados de la caché
+    stats       {}                                 -> contadores del servidor y de PowerShell
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import tempfile
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .detector import AIServiceDetector
+from .manager import AIServiceManager
+from .profiles import build_plan, targets_for, unknown_profile_message
+from .runner import command_runner
+
+
+PIPE_NAME = "win-ai-tools"
+
+# Códigos de error JSON-RPC 2.0 (-32000 a -32099: propios del servidor)
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+BACKUP_FAILED = -32000
+
+
+def default_address() -> str:
+    """Named pipe en Windows; socket Unix por usuario en el resto"""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{PIPE_NAME}"
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"{PIPE_NAME}-{uid}.sock")
+
+
+def default_authkey_path() -> str:
+    """Clave del servidor, en el perfil del usuario"""
+    return os.path.join(os.path.expanduser("~"), ".win-ai-tools-server.key")
+
+
+def load_authkey(path: Optional[str] = None, create: bool = False) -> Optional[bytes]:
+    """Clave compartida por servidor y clientes; None si no existe
+    
+    Con `create` se genera si falta, con permisos 0600 desde el primer
+    byte (en Windows el perfil del usuario ya es privado).
+    """
+    path = path or default_authkey_path()
+    try:
+        with open(path, "rb") as f:
+            key = f.read()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    if not create:
+        return None
+    key = os.urandom(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+@contextmanager
+def _private_umask():
+    """El socket Unix nace con permisos 0600, sin ventana entre crear y chmod"""
+    if sys.platform == "win32":
+        yield
+        return
+    previous = os.umask(0o077)
+    try:
+        yield
+    finally:
+        os.umask(previous)
+
+
+class RpcError(Exception):
+    """Error JSON-RPC, del lado del servidor o recibido por el cliente"""
+    
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+    
+    def to_dict(self) -> dict:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+class ServiceServer:
+    """Atiende pedidos JSON-RPC de varios clientes con un detector compartido
+    
+    - Detecciones idénticas en curso se comparten: un `detect` cuyos
+      servicios ya están cubiertos por otra pasada en curso espera a esa en
+      lugar de lanzar la suya.
+    - Los estados detectados valen `cache_ttl` segundos; el RegistryWatcher
+      los invalida en cuanto cambian las claves de un servicio.
+    - Un mensaje puede ser un lote (lista JSON-RPC): sus pedidos se ejecutan
+      en paralelo y las respuestas vuelven en el mismo orden.
+    - `apply` se serializa: dos clientes nunca modifican el sistema a la vez.
+    
+    Los clientes deben presentar `authkey` (por defecto la del archivo por
+    usuario, que se crea al arrancar); una conexión sin ella se corta
+    antes de leer ningún pedido. En Unix el socket además se crea con
+    permisos 0600.
+    """
+    
+    def __init__(self, address: Optional[str] = None,
+                 detector: Optional[AIServiceDetector] = None,
+                 manager: Optional[AIServiceManager] = None,
+                 cache_ttl: float = 30.0, max_workers: int = 8, logger=None,
+                 authkey: Optional[bytes] = None):
+        self.address = address or default_address()
+        self.authkey = authkey
+        self.detector = detector or AIServiceDetector()
+        self.manager = manager or AIServiceManager(registry=self.detector.registry)
+        self.cache_ttl = cache_ttl
+        self._logger = logger
+        
+        self._services = {service.id: service for service in self.detector.services}
+        self._detected_at: Dict[str, float] = {}
+        # Se incrementa al invalidar: una pasada que empezó antes no revalida
+        self._generation: Dict[str, int] = {}
+        self._inflight: Dict[Optional[FrozenSet[str]], Future] = {}
+        self._lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="RpcBatch")
+        self._stop = threading.Event()
+        self._listener = None
+        self._thread = None
+        self._watcher = None
+        
+        self.stats = {
+            "connections": 0,
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "detections": 0,
+            "coalesced": 0,
+            "cache_hits": 0,
+        }
+        self._methods = {
+            "detect": self.detect,
+            "plan": self.plan,
+            "apply": self.apply,
+            "log.query": self.log_query,
+            "invalidate": self.invalidate,
+            "stats": self.get_stats,
+        }
+    
+    @property
+    def logger(self):
+        if self._logger is None:
+            from .logger import activity_logger
+            self._logger = activity_logger
+        return self._logger
+    
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+    
+    # ---- Métodos RPC ----
+    
+    def detect(self, service_ids: Optional[List[str]] = None,
+               max_age: Optional[float] = None) -> List[dict]:
+        """Estado de los servicios, re-detectando sólo los vencidos"""
+        ids = self._validate(service_ids)
+        max_age = self.cache_ttl if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                service_id for service_id in ids
+                if now - self._detected_at.get(service_id, float("-inf")) > max_age
+            ]
+        
+        if stale:
+            key = None if len(stale) == len(self._services) else frozenset(stale)
+            self._detect_shared(key)
+        else:
+            self._count("cache_hits")
+        # Una sola instantánea: todas las filas son del mismo momento
+        snapshot = self.detector.snapshot
+        return [self._service_row(service_id, snapshot) for service_id in ids]
+    
+    def plan(self, profile: Optional[str] = None, service_ids: Optional[List[str]] = None,
+             enable: bool = False, max_age: Optional[float] = None) -> List[dict]:
+        """Cambios necesarios para llegar al perfil (o al estado `enable`)"""
+        return [
+            {"id": step.service.id, "action": step.action,
+             "current": step.current.value, "desired": step.desired.value}
+            for step in self._plan(profile, service_ids, enable, max_age)[0]
+        ]
+    
+    def apply(self, profile: Optional[str] = None, service_ids: Optional[List[str]] = None,
+              enable: bool = False, backup: bool = True) -> dict:
+        """Aplica el plan sobre un estado recién detectado, con backup previo
+        
+        El plan y el backup salen de la misma captura del sistema.
+        """
+        with self._apply_lock:
+            plan, state = self._plan(profile, service_ids, enable, max_age=0, capture=True)
+            backup_path = None
+            results = []
+            if plan and backup:
+                success, result = self.manager.create_backup(self.detector.services, state=state)
+                self.logger.log_backup(success, result)
+                if not success:
+                    raise RpcError(BACKUP_FAILED, f"No se pudo crear el backup previo: {result}")
+                backup_path = result
+            
+            for step in plan:
+                service = step.service
+                if step.action == "disable":
+                    success, message = self.manager.disable_service(service)
+                    self.logger.log_disable(service.id, service.name, success, message)
+                else:
+                    success, message = self.manager.enable_service(service)
+                    self.logger.log_enable(service.id, service.name, success, message)
+                results.append({"id": service.id, "action": step.action,
+                                "success": success, "message": message})
+            
+            self.invalidate([step.service.id for step in plan])
+            return {"backup": backup_path, "results": results}
+    
+    def log_query(self, start: Optional[str] = None, end: Optional[str] = None,
+                  service_id: Optional[str] = None, action: Optional[str] = None,
+                  level: Optional[str] = None, text: Optional[str] = None,
+                  limit: int = 50, cursor: Optional[List] = None) -> dict:
+        """Consulta paginada del registro de actividades"""
+        try:
+            page = self.logger.query(
+                start=start, end=end, service_id=service_id, action=action,
+                level=level, text=text, limit=limit,
+                cursor=tuple(cursor) if cursor else None
+            )
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        return {
+            "entries": [entry.to_dict() for entry in page.entries],
+            "next_cursor": list(page.next_cursor) if page.next_cursor else None,
+        }
+    
+    def invalidate(self, service_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Descarta estados en caché (todos si no se indican servicios)"""
+        with self._lock:
+            ids = list(self._services) if service_ids is None else list(service_ids)
+            dropped = []
+            for service_id in ids:
+                self._generation[service_id] = self._generation.get(service_id, 0) + 1
+                if self._detected_at.pop(service_id, None) is not None:
+                    dropped.append(service_id)
+        return dropped
+    
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cached"] = len(self._detected_at)
+            stats["inflight"] = len(self._inflight)
+        # Latencias y circuitos de PowerShell aprendidos por este proceso
+        stats["commands"] = command_runner.stats()
+        return stats
+    
+    # ---- Detección compartida ----
+    
+    def _validate(self, service_ids: Optional[List[str]]) -> List[str]:
+        """Ids en orden del catálogo; RpcError si alguno no existe"""
+        if service_ids is None:
+            return list(self._services)
+        unknown = [service_id for service_id in service_ids if service_id not in self._services]
+        if unknown:
+            raise RpcError(INVALID_PARAMS, f"Servicios desconocidos: {', '.join(unknown)}")
+        wanted = set(service_ids)
+        return [service_id for service_id in self._services if service_id in wanted]
+    
+    def _service_row(self, service_id: str, snapshot) -> dict:
+        service = self._services[service_id]
+        observation = snapshot.get(service_id)
+        return {
+            "id": service.id,
+            "name": service.name,
+            "status": snapshot.status(service_id).value,
+            "source": observation.source if observation else "none",
+            "evidence": observation.evidence if observation else "",
+            "version": snapshot.version,
+        }
+    
+    def _detect_shared(self, key: Optional[FrozenSet[str]]):
+        """Detecta `key` (None = todos) o espera a una pasada en curso que lo cubra"""
+        with self._lock:
+            running = next(
+                (future for running_key, future in self._inflight.items()
+                 if running_key is None or (key is not None and key <= running_key)),
+                None
+            )
+            if running is not None:
+                self.stats["coalesced"] += 1
+            else:
+                future = Future()
+                self._inflight[key] = future
+                ids = list(self._services) if key is None else list(key)
+                generations = {service_id: self._generation.get(service_id, 0) for service_id in ids}
+        if running is not None:
+            running.result()
+            return
+        
+        started = time.monotonic()
+        try:
+            self.detector.detect_all(service_ids=None if key is None else ids)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._inflight.pop(key, None)
+            self.stats["detections"] += 1
+            for service_id in ids:
+                if self._generation.get(service_id, 0) == generations[service_id]:
+                    self._detected_at[service_id] = started
+        future.set_result(None)
+    
+    def _plan(self, profile: Optional[str], service_ids: Optional[List[str]],
+              enable: bool, max_age: Optional[float], capture: bool = False):
+        """(plan, captura); con `capture` el estado se deriva de una captura nueva"""
+        catalog = self.detector.catalog
+        if profile and profile not in catalog.profiles:
+            raise RpcError(INVALID_PARAMS, unknown_profile_message(profile, catalog))
+        ids = self._validate(service_ids)
+        state = None
+        if capture:
+            # Todo el catálogo: la misma captura alimenta el backup
+            state = self.detector.capture_state()
+            self.detector.detect_from_state(state, ids)
+        else:
+            self.detect(ids, max_age)
+        services = [self._services[service_id] for service_id in ids]
+        return build_plan(services, targets_for(services, profile, enable, catalog)), state
+    
+    # ---- Protocolo ----
+    
+    def handle(self, payload: bytes) -> Optional[bytes]:
+        """Procesa un mensaje (pedido o lote); None si no lleva respuesta"""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return _encode(_error_response(None, RpcError(PARSE_ERROR, "JSON inválido")))
+        
+        if isinstance(message, list):
+            if not message:
+                return _encode(_error_response(None, RpcError(INVALID_REQUEST, "Lote vacío")))
+            self._count("batches")
+            responses = [r for r in self._pool.map(self._handle_request, message) if r is not None]
+            return _encode(responses) if responses else None
+        
+        response = self._handle_request(message)
+        return None if response is None else _encode(response)
+    
+    def _handle_request(self, request) -> Optional[dict]:
+        if (not isinstance(request, dict) or request.get("jsonrpc") != "2.0"
+                or not isinstance(request.get("method"), str)):
+            request_id = request.get("id") if isinstance(request, dict) else None
+            self._count("errors")
+            return _error_response(request_id, RpcError(INVALID_REQUEST, "Pedido inválido"))
+        
+        self._count("requests")
+        # Sin "id" es una notificación: se ejecuta pero no se responde
+        notification = "id" not in request
+        request_id = request.get("id")
+        try:
+            result = self._call(request["method"], request.get("params"))
+        except RpcError as e:
+            error = e
+        except Exception as e:
+            error = RpcError(INTERNAL_ERROR, str(e))
+        else:
+            return None if notification else {"jsonrpc": "2.0", "id": request_id, "result": result}
+        
+        self._count("errors")
+        return None if notification else _error_response(request_id, error)
+    
+    def _call(self, name: str, params):
+        method = self._methods.get(name)
+        if method is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Método desconocido: {name}")
+        args, kwargs = [], {}
+        if isinstance(params, list):
+            args = params
+        elif isinstance(params, dict):
+            kwargs = params
+        elif params is not None:
+            raise RpcError(INVALID_PARAMS, "params debe ser un objeto o una lista")
+        try:
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        return method(*args, **kwargs)
+    
+    # ---- Conexiones ----
+    
+    def start(self, watch: bool = True):
+        """Empieza a aceptar conexiones en un hilo propio
+        
+        Lanza RuntimeError si ya hay otro servidor en la misma dirección.
+        """
+        if self.authkey is None:
+            self.authkey = load_authkey(create=True)
+        running = connect(self.address, self.authkey)
+        if running is not None:
+            running.close()
+            raise RuntimeError(f"Ya hay un servidor en {self.address}")
+        if sys.platform != "win32" and os.path.exists(self.address):
+            # Socket abandonado por un servidor que terminó sin limpiar
+            os.unlink(self.address)
+        
+        self._stop.clear()
+        with _private_umask():
+            self._listener = Listener(self.address, authkey=self.authkey)
+        if sys.platform != "win32":
+            os.chmod(self.address, 0o600)
+        
+        if watch:
+            from .registry_watch import RegistryWatcher
+            self._watcher = RegistryWatcher(
+                self.detector.services, self.detector.registry, self.invalidate, debounce=0.2
+            )
+            self._watcher.start()
+        
+        self._thread = threading.Thread(target=self._accept_loop, name="RpcServer", daemon=True)
+        self._thread.start()
+    
+    def wait(self):
+        """Bloquea hasta stop(), despertando a menudo para que llegue Ctrl+C"""
+        while not self._stop.wait(0.5):
+            pass
+    
+    def stop(self):
+        """Deja de aceptar conexiones; las abiertas terminan tras su pedido en curso"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._listener is not None:
+            # accept() no se interrumpe al cerrar el listener: despertarlo
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except (OSError, AuthenticationError):
+                pass
+            if self._thread is not None:
+                self._thread.join(timeout=2.0)
+                self._thread = None
+            self._listener.close()
+            self._listener = None
+        self._pool.shutdown(wait=False)
+    
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, AuthenticationError, EOFError):
+                # Un cliente sin la clave (o que cortó a mitad del saludo)
+                continue
+            if self._stop.is_set():
+                conn.close()
+                return
+            self._count("connections")
+            threading.Thread(
+                target=self._serve_connection, args=(conn,), name="RpcConnection", daemon=True
+            ).start()
+    
+    def _serve_connection(self, conn):
+        try:
+            while not self._stop.is_set():
+                try:
+                    payload = conn.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                response = self.handle(payload)
+                if response is not None:
+                    conn.send_bytes(response)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+
+def _encode(message) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8")
+
+
+def _error_response(request_id, error: RpcError) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": error.to_dict()}
+
+
+class ServiceClient:
+    """Cliente del servidor local
+    
+    Una conexión atiende un pedido a la vez; para pedidos concurrentes usar
+    `batch()` o varias conexiones.
+    """
+    
+    def __init__(self, address: Optional[str] = None, authkey: Optional[bytes] = None):
+        self.address = address or default_address()
+        authkey = authkey or load_authkey()
+        if authkey is None:
+            raise FileNotFoundError(f"No existe la clave del servidor: {default_authkey_path()}")
+        self._conn = Client(self.address, authkey=authkey)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def call(self, method: str, **params):
+        """Ejecuta un método; lanza RpcError si el servidor responde con error"""
+        request = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        return _result(self._roundtrip(request))
+    
+    def batch(self, calls: List[Tuple[str, dict]]) -> List[Any]:
+        """Varios pedidos en un mensaje; resultados en el mismo orden
+        
+        Un pedido fallido deja su RpcError en su posición en lugar de lanzarlo.
+        """
+        requests = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        responses = self._roundtrip(requests)
+        if isinstance(responses, dict):
+            # El servidor rechazó el lote completo
+            raise _rpc_error(responses["error"])
+        by_id = {response.get("id"): response for response in responses}
+        results = []
+        for request in requests:
+            response = by_id[request["id"]]
+            results.append(_rpc_error(response["error"]) if "error" in response else response["result"])
+        return results
+    
+    def _roundtrip(self, message):
+        with self._lock:
+            self._conn.send_bytes(_encode(message))
+            return json.loads(self._conn.recv_bytes())
+    
+    def close(self):
+        self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _rpc_error(error: dict) -> RpcError:
+    return RpcError(error.get("code", INTERNAL_ERROR), error.get("message", ""), error.get("data"))
+
+
+def _result(response: dict):
+    if "error" in response:
+        raise _rpc_error(response["error"])
+    return response["result"]
+
+
+def connect(address: Optional[str] = None,
+            authkey: Optional[bytes] = None) -> Optional[ServiceClient]:
+    """Cliente conectado al servidor, o None si no hay ninguno corriendo
+    
+    Un servidor que rechaza la clave cuenta como ausente.
+    """
+    authkey = authkey or load_authkey()
+    if authkey is None:
+        # Sin archivo de clave nunca arrancó un servidor de este usuario
+        return None
+    try:
+        return ServiceClient(address, authkey)
+    except (OSError, AuthenticationError, EOFError):
+        return None
@@ -0,0 +1,146 @@
+"""
+Instantáneas de detección
+Cada resultado de detección se publica como una nueva instantánea inmutable
+(versionada, con fecha y con la evidencia que decidió cada estado). La
+referencia a la instantánea actual se reemplaza de forma atómica: quien lee
+nunca bloquea ni ve un estado a medias, y dos pasadas superpuestas pueden
+correr libremente porque, por servicio, gana la pasada más nueva.
+"""
+
+import time
+import itertools
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .ai_services import ServiceStatus
+
+
+@dataclass(frozen=True)
+class Observation:
+    """Estado de un servicio y la evidencia que lo decidió"""
+    __slots__ = ("status", "source", "evidence", "pass_id", "observed_at")
+    
+    status: ServiceStatus
+    source: str          # "registry", "appx", "feature" o "none"
+    evidence: str        # p. ej. "HKLM\...\TurnOffWindowsCopilot=1"
+    pass_id: int         # pasada que lo produjo: la más nueva gana
+    observed_at: float   # time.time()
+    
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status.value,
+            "source": self.source,
+            "evidence": self.evidence,
+            "pass_id": self.pass_id,
+            "observed_at": self.observed_at,
+        }
+
+
+class DetectionSnapshot:
+    """Estado detectado de todos los servicios en un momento dado (inmutable)
+    
+    `changed` son los servicios que cambiaron respecto de la versión
+    anterior, así diff() contra ella no recorre todo el catálogo.
+    """
+    __slots__ = ("version", "timestamp", "observations", "changed", "parent_version")
+    
+    def __init__(self, version: int = 0,
+                 observations: Optional[Mapping[str, Observation]] = None,
+                 changed: Iterable[str] = (), parent_version: Optional[int] = None,
+                 timestamp: Optional[float] = None):
+        init = object.__setattr__
+        init(self, "version", version)
+        init(self, "timestamp", time.time() if timestamp is None else timestamp)
+        init(self, "observations", MappingProxyType(dict(observations or {})))
+        init(self, "changed", frozenset(changed))
+        init(self, "parent_version", parent_version)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("DetectionSnapshot es inmutable")
+    
+    def __len__(self) -> int:
+        return len(self.observations)
+    
+    def get(self, service_id: str) -> Optional[Observation]:
+        return self.observations.get(service_id)
+    
+    def status(self, service_id: str) -> ServiceStatus:
+        observation = self.observations.get(service_id)
+        return observation.status if observation is not None else ServiceStatus.UNKNOWN
+    
+    def merge(self, observations: Mapping[str, Observation]) -> "DetectionSnapshot":
+        """Nueva versión con `observations` aplicadas
+        
+        Una observación de una pasada más vieja que la ya publicada para ese
+        servicio se descarta. Retorna `self` si nada cambió.
+        """
+        merged = dict(self.observations)
+        changed = []
+        for service_id, observation in observations.items():
+            current = merged.get(service_id)
+            if current is not None and current.pass_id > observation.pass_id:
+                continue
+            merged[service_id] = observation
+            if current is None or (current.status, current.evidence) != (observation.status, observation.evidence):
+                changed.append(service_id)
+        if not changed and all(
+            merged[service_id] is self.observations.get(service_id) for service_id in observations
+        ):
+            return self
+        return DetectionSnapshot(self.version + 1, merged, changed, self.version)
+    
+    def diff(self, older: "DetectionSnapshot") -> Dict[str, Tuple[ServiceStatus, ServiceStatus]]:
+        """Servicios cuyo estado cambió desde `older`: {id: (antes, ahora)}"""
+        if older is self:
+            return {}
+        if older.version == self.parent_version:
+            candidates: Iterable[str] = self.changed
+        else:
+            candidates = set(self.observations) | set(older.observations)
+        changes = {}
+        for service_id in candidates:
+            before, after = older.status(service_id), self.status(service_id)
+            if before != after:
+                changes[service_id] = (before, after)
+        return changes
+    
+    def to_dict(self) -> dict:
+        """Forma serializable (JSON) de la instantánea"""
+        return {
+            "version": self.version,
+            "timestamp": self.timestamp,
+            "services": {
+                service_id: observation.to_dict()
+                for service_id, observation in self.observations.items()
+            },
+        }
+
+
+class SnapshotRef:
+    """Referencia a la instantánea publicada
+    
+    `current` se lee sin lock (asignar un atributo es atómico); sólo las
+    publicaciones se serializan entre sí.
+    """
+    
+    def __init__(self, initial: Optional[DetectionSnapshot] = None):
+        self._current = initial or DetectionSnapshot()
+        self._lock = threading.Lock()
+        self._passes = itertools.count(1)
+    
+    @property
+    def current(self) -> DetectionSnapshot:
+        return self._current
+    
+    def new_pass(self) -> int:
+        """Número de una nueva pasada de detección (creciente)"""
+        with self._lock:
+            return next(self._passes)
+    
+    def publish(self, observations: Mapping[str, Observation]) -> DetectionSnapshot:
+        """Aplica observaciones y publica la nueva instantánea"""
+        with self._lock:
+            self._current = self._current.merge(observations)
+            return self._current
@@ -0,0 +1,110 @@
+"""
+Perfil de arranque de la aplicación
+Marca hitos del arranque y, opcionalmente, mide el tiempo de cada import
+con el mismo formato que `python -X importtime`
+"""
+
+import os
+import sys
+import time
+import builtins
+import threading
+from typing import List, Tuple, Optional
+
+
+# Variable de entorno que activa el perfil sin pasar --profile-startup
+PROFILE_ENV = "WIN_AI_TOOLS_PROFILE_STARTUP"
+
+
+class StartupProfile:
+    """Hitos de arranque medidos desde la creación del perfil"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        # (nivel de anidamiento, módulo, propio µs, acumulado µs)
+        self.imports: List[Tuple[int, str, int, int]] = []
+        self._original_import = None
+        self._stack: List[list] = []
+    
+    def mark(self, name: str):
+        """Registra un hito; sólo cuenta la primera vez que ocurre"""
+        if any(existing == name for existing, _ in self.marks):
+            return
+        self.marks.append((name, (time.perf_counter() - self.started) * 1000))
+    
+    def elapsed_ms(self, name: str) -> Optional[float]:
+        """Milisegundos desde el inicio hasta un hito, o None si no ocurrió"""
+        return next((ms for existing, ms in self.marks if existing == name), None)
+    
+    @property
+    def import_timing(self) -> bool:
+        return self._original_import is not None
+    
+    def enable_import_timing(self):
+        """Empieza a medir los imports del hilo principal"""
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        main_thread = threading.main_thread()
+        
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if (level or name in sys.modules
+                    or threading.current_thread() is not main_thread):
+                return self._original_import(name, globals, locals, fromlist, level)
+            
+            frame = [name, 0]  # módulo, µs de imports hijos
+            self._stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                cumulative = int((time.perf_counter() - start) * 1e6)
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1][1] += cumulative
+                self.imports.append((len(self._stack), name, cumulative - frame[1], cumulative))
+        
+        builtins.__import__ = timed_import
+    
+    def disable_import_timing(self):
+        """Deja de medir imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+    
+    def report(self) -> str:
+        """Texto con los hitos y, si se midieron, los imports más costosos"""
+        lines = ["Startup profile", "==============="]
+        previous = 0.0
+        for name, ms in self.marks:
+            lines.append(f"{name:<24} {ms:9.1f} ms  (+{ms - previous:.1f})")
+            previous = ms
+        
+        if self.imports:
+            lines.append("")
+            lines.append("import time: self [us] | cumulative | imported package")
+            for depth, name, self_us, cumulative_us in self.imports:
+                lines.append(f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}")
+            
+            top = sorted(self.imports, key=lambda item: item[2], reverse=True)[:10]
+            lines.append("")
+            lines.append("Slowest imports (self time)")
+            for _, name, self_us, _ in top:
+                lines.append(f"{self_us / 1000:9.1f} ms  {name}")
+        return "\n".join(lines)
+    
+    def write_report(self, log_dir: str, filename: str = "startup_profile.txt") -> Optional[str]:
+        """Escribe el reporte en el directorio de logs"""
+        path = os.path.join(log_dir, filename)
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.report() + "\n")
+            return path
+        except OSError:
+            return None
+
+
+# Perfil global: se crea al importar este módulo, que main.py importa primero
+startup_profile = StartupProfile()
@@ -0,0 +1,347 @@
+"""
+Estado del sistema
+Una captura, en una sola pasada agrupada, de todo lo que el catálogo
+consulta: cada valor de registro (con tipo, existencia y última escritura
+de su clave), el inventario de paquetes Appx y el estado de las Windows
+Features. La detección, el backup y la restauración se derivan de la misma
+captura sin volver a leer el sistema, y se puede serializar para
+compararla más tarde.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from .ai_services import AIService, ServiceStatus, intern_hive
+from .registry import RegistryBackend
+from .runner import command_runner
+
+
+FEATURE_ENABLED = "Enabled"
+FEATURE_DISABLED = "Disabled"
+FEATURE_NOT_FOUND = "NotFound"
+
+
+@dataclass(frozen=True)
+class RegistryValue:
+    """Un valor del registro tal como se encontró al capturar"""
+    __slots__ = ("hive", "path", "name", "exists", "value", "type", "last_write")
+    
+    hive: str
+    path: str
+    name: str
+    exists: bool
+    value: Any                 # None si no existe
+    type: Optional[str]        # "REG_DWORD", ...; None si no existe
+    last_write: Optional[int]  # de la clave; None si la clave no existe
+    
+    def to_dict(self) -> dict:
+        value = self.value
+        if isinstance(value, (bytes, bytearray)):
+            value = value.hex()
+        return {
+            "hive": self.hive, "path": self.path, "name": self.name,
+            "exists": self.exists, "value": value, "type": self.type,
+            "last_write": self.last_write,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "RegistryValue":
+        value = data["value"]
+        if data["type"] == "REG_BINARY" and isinstance(value, str):
+            value = bytes.fromhex(value)
+        return cls(intern_hive(data["hive"]), data["path"], data["name"],
+                   data["exists"], value, data["type"], data["last_write"])
+
+
+def _value_key(hive, path: str, name: str) -> Tuple[str, str, str]:
+    return (hive, path.lower(), name)
+
+
+class SystemState:
+    """Captura inmutable del estado del sistema
+    
+    `appx_packages` es None si el inventario no se consultó (o falló);
+    una feature ausente de `features` tiene estado desconocido. Un valor
+    que no se llegó a leer (clave fuera de la captura o error de lectura)
+    no está en `registry`: value() retorna None, distinto de un
+    RegistryValue con exists=False.
+    """
+    __slots__ = ("captured_at", "registry", "appx_packages", "features")
+    
+    def __init__(self, registry: Iterable[RegistryValue] = (),
+                 appx_packages: Optional[Iterable[str]] = None,
+                 features: Optional[Mapping[str, str]] = None,
+                 captured_at: Optional[float] = None):
+        init = object.__setattr__
+        init(self, "captured_at", time.time() if captured_at is None else captured_at)
+        init(self, "registry", MappingProxyType({
+            _value_key(value.hive, value.path, value.name): value for value in registry
+        }))
+        init(self, "appx_packages", None if appx_packages is None else frozenset(appx_packages))
+        init(self, "features", MappingProxyType(dict(features or {})))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SystemState es inmutable")
+    
+    def value(self, hive, path: str, name: str) -> Optional[RegistryValue]:
+        return self.registry.get(_value_key(hive, path, name))
+    
+    def covers(self, hive, path: str, name: str) -> bool:
+        """True si el valor se leyó en esta captura (exista o no)"""
+        return _value_key(hive, path, name) in self.registry
+    
+    # ---- Detección ----
+    
+    def registry_evidence(self, service: AIService) -> Tuple[ServiceStatus, str]:
+        for rule in service.registry_rules:
+            found = self.value(rule.hive, rule.path, rule.key)
+            if found is None or not found.exists:
+                # Key no existe, servicio probablemente habilitado por defecto
+                continue
+            evidence = f"{rule.hive}\\{rule.path}\\{rule.key}={found.value}"
+            if found.value == rule.disable_value:
+                return ServiceStatus.DISABLED, evidence
+            elif found.value == rule.enable_value:
+                return ServiceStatus.ENABLED, evidence
+        
+        # Si no encontramos keys deshabilitantes, asumimos habilitado
+        return ServiceStatus.ENABLED, "sin valores de política (habilitado por defecto)"
+    
+    def appx_evidence(self, service: AIService) -> Tuple[ServiceStatus, str]:
+        if self.appx_packages is None:
+            return ServiceStatus.UNKNOWN, "inventario Appx no disponible"
+        for rule in service.appx_rules:
+            package = rule.package.lower()
+            if any(package in installed.lower() for installed in self.appx_packages):
+                return ServiceStatus.ENABLED, f"paquete instalado: {rule.package}"
+        return ServiceStatus.NOT_INSTALLED, "ningún paquete instalado"
+    
+    def feature_evidence(self, service: AIService) -> Tuple[ServiceStatus, str]:
+        feature = service.feature_rule.name
+        state = self.features.get(feature)
+        if state is None:
+            return ServiceStatus.UNKNOWN, f"feature {feature}: estado no consultado"
+        if state == FEATURE_NOT_FOUND:
+            return ServiceStatus.NOT_INSTALLED, f"feature {feature} no encontrada"
+        if state == FEATURE_ENABLED:
+            return ServiceStatus.ENABLED, f"feature {feature}: Enabled"
+        if state == FEATURE_DISABLED:
+            return ServiceStatus.DISABLED, f"feature {feature}: Disabled"
+        return ServiceStatus.UNKNOWN, f"feature {feature}: estado no reconocido"
+    
+    def evaluate(self, service: AIService, probes: bool = True) -> Tuple[ServiceStatus, str, str]:
+        """(estado, fuente, evidencia), con el mismo orden que el detector"""
+        if service.registry_rules:
+            status, evidence = self.registry_evidence(service)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "registry", evidence
+        
+        if not probes:
+            return ServiceStatus.UNKNOWN, "none", "probes desactivados"
+        
+        if service.appx_rules:
+            status, evidence = self.appx_evidence(service)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "appx", evidence
+        
+        if service.feature_rule:
+            status, evidence = self.feature_evidence(service)
+            if status != ServiceStatus.UNKNOWN:
+                return status, "feature", evidence
+        
+        return ServiceStatus.UNKNOWN, "none", "ningún chequeo concluyente"
+    
+    # ---- Backup / restauración ----
+    
+    def backup_values(self, service: AIService) -> List[dict]:
+        """Entradas "registry_values" del backup de un servicio (sólo las existentes)"""
+        entries = []
+        for rule in service.registry_rules:
+            found = self.value(rule.hive, rule.path, rule.key)
+            if found is None or not found.exists:
+                continue
+            entries.append({
+                "path": rule.path,
+                "key": rule.key,
+                "value": found.value,
+                "hive": rule.hive,
+                "type": found.type
+            })
+        return entries
+    
+    def differs(self, hive, path: str, name: str, value: Any) -> bool:
+        """True si restaurar `value` cambiaría el sistema (o no se sabe)"""
+        found = self.value(hive, path, name)
+        return found is None or not found.exists or found.value != value
+    
+    # ---- Serialización y comparación ----
+    
+    def diff(self, older: "SystemState") -> Dict[str, Tuple[Any, Any]]:
+        """Diferencias desde `older`: {elemento: (antes, ahora)}
+        
+        Los elementos son rutas de valores ("HKLM\\ruta\\nombre"),
+        "appx:<paquete>" o "feature:<nombre>". Los valores inexistentes o
+        no capturados se comparan como None.
+        """
+        changes = {}
+        for key in set(self.registry) | set(older.registry):
+            before, after = older.registry.get(key), self.registry.get(key)
+            before_value = before.value if before is not None and before.exists else None
+            after_value = after.value if after is not None and after.exists else None
+            if before_value != after_value:
+                sample = after or before
+                changes[f"{sample.hive}\\{sample.path}\\{sample.name}"] = (before_value, after_value)
+        
+        if self.appx_packages is not None and older.appx_packages is not None:
+            for package in older.appx_packages - self.appx_packages:
+                changes[f"appx:{package}"] = (True, False)
+            for package in self.appx_packages - older.appx_packages:
+                changes[f"appx:{package}"] = (False, True)
+        
+        for feature in set(self.features) | set(older.features):
+            before, after = older.features.get(feature), self.features.get(feature)
+            if before != after:
+                changes[f"feature:{feature}"] = (before, after)
+        return changes
+    
+    def to_dict(self) -> dict:
+        return {
+            "captured_at": self.captured_at,
+            "registry": [value.to_dict() for value in self.registry.values()],
+            "appx_packages": None if self.appx_packages is None else sorted(self.appx_packages),
+            "features": dict(self.features),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "SystemState":
+        return cls(
+            registry=[RegistryValue.from_dict(value) for value in data.get("registry", [])],
+            appx_packages=data.get("appx_packages"),
+            features=data.get("features"),
+            captured_at=data.get("captured_at"),
+        )
+    
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, path: str) -> "SystemState":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def capture_registry(registry: RegistryBackend,
+                     reads: Mapping[Tuple[str, str], Iterable[str]],
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[RegistryValue]]:
+    """Lee {(hive, path): nombres} abriendo cada clave una vez; None si se canceló"""
+    values = []
+    total = len(reads)
+    for done, ((hive, path), names) in enumerate(reads.items(), start=1):
+        if cancelled and cancelled():
+            return None
+        try:
+            read = registry.read_key(hive, path, names)
+        except OSError:
+            # Sin leer: queda fuera de la captura
+            read = False
+        if read is None:
+            values.extend(RegistryValue(hive, path, name, False, None, None, None) for name in names)
+        elif read:
+            stamp, found = read
+            for name in names:
+                if name in found:
+                    value, kind = found[name]
+                    values.append(RegistryValue(hive, path, name, True, value, kind, stamp))
+                else:
+                    values.append(RegistryValue(hive, path, name, False, None, None, stamp))
+        if progress:
+            progress(done, total)
+    return values
+
+
+def read_appx_inventory() -> Optional[FrozenSet[str]]:
+    """Nombres de los paquetes Appx instalados (una llamada); None si falló"""
+    try:
+        result = command_runner.run(
+            "appx.list",
+            ["powershell", "-Command", "Get-AppxPackage | Select-Object -ExpandProperty Name"],
+            timeout=30
+        )
+    except Exception:
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return frozenset(line.strip() for line in result.stdout.splitlines() if line.strip())
+
+
+def read_feature_states(names: Iterable[str]) -> Dict[str, str]:
+    """Estado de varias Windows Features en una sola llamada a PowerShell
+    
+    Las que no existen quedan como FEATURE_NOT_FOUND; si PowerShell no se
+    puede ejecutar, el resultado está vacío (estado desconocido).
+    """
+    names = sorted(set(names))
+    if not names:
+        return {}
+    quoted = ",".join("'" + name.replace("'", "''") + "'" for name in names)
+    script = (
+        f"foreach ($n in @({quoted})) {{ "
+        "$f = Get-WindowsOptionalFeature -Online -FeatureName $n -ErrorAction SilentlyContinue; "
+        "if ($f) { \"$n=$($f.State)\" } else { \"$n=NotFound\" } }"
+    )
+    try:
+        result = command_runner.run(
+            "feature.query", ["powershell", "-Command", script], timeout=30
+        )
+    except Exception:
+        return {}
+    if result.returncode != 0:
+        return {name: FEATURE_NOT_FOUND for name in names}
+    
+    states = {}
+    for line in result.stdout.splitlines():
+        name, sep, state = line.strip().partition("=")
+        if sep and name in names:
+            states[name] = state
+    return states
+
+
+def capture_state(registry: RegistryBackend, services: Iterable[AIService],
+                  probes: bool = True,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  cancelled: Optional[Callable[[], bool]] = None) -> Optional[SystemState]:
+    """Captura lo que consultan `services` en una pasada agrupada
+    
+    Cada clave del registro se abre una sola vez aunque varias reglas la
+    compartan; con `probes`, el inventario Appx y las features se consultan
+    con una llamada a PowerShell cada uno. `progress(done, total)` informa
+    las claves leídas. Retorna None si `cancelled()` se vuelve verdadero.
+    """
+    services = list(services)
+    reads: Dict[Tuple[str, str], List[str]] = {}
+    spelled: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    for service in services:
+        for rule in service.registry_rules:
+            key = spelled.setdefault((rule.hive, rule.path.lower()), (rule.hive, rule.path))
+            names = reads.setdefault(key, [])
+            if rule.key not in names:
+                names.append(rule.key)
+    
+    values = capture_registry(registry, reads, progress, cancelled)
+    if values is None:
+        return None
+    
+    appx_packages = None
+    features = {}
+    if probes:
+        if any(service.appx_rules for service in services):
+            appx_packages = read_appx_inventory()
+        features = read_feature_states(
+            service.feature_rule.name for service in services if service.feature_rule
+        )
+    return SystemState(values, appx_packages, features)
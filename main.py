@@ -1,13 +1,35 @@
 """
 Windows AI Removal Tool
 Aplicación para gestionar y remover servicios de AI de Windows 11
+
+Opciones de arranque:
+    --profile-startup     Mide hitos e imports del arranque y escribe
+                          startup_profile.txt en el directorio de logs
+                          (también con WIN_AI_TOOLS_PROFILE_STARTUP=1)
+    --exit-after-startup  Cierra la aplicación al terminar el arranque
+                          diferido (usado por benchmarks/startup_budget.py)
 """
 
+import os
 import sys
+
+# Primero el perfil de arranque, para que mida los imports que siguen
+from core.startup_profile import startup_profile, PROFILE_ENV
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv or bool(os.environ.get(PROFILE_ENV))
+EXIT_AFTER_STARTUP = "--exit-after-startup" in sys.argv
+
+if PROFILE_STARTUP:
+    startup_profile.enable_import_timing()
+
 import ctypes
 from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
 from ui.main_window import MainWindow
+from ui.styles import apply_theme
+from core.logger import activity_logger
+
+startup_profile.mark("imports")
 
 
 def is_admin():
@@ -18,25 +40,62 @@ def is_admin():
         return False
 
 
+def _warn_not_admin(parent):
+    """Avisa que faltan permisos de administrador (solo lectura)"""
+    msg = QMessageBox(parent)
+    msg.setIcon(QMessageBox.Icon.Warning)
+    msg.setWindowTitle("Permisos Requeridos")
+    msg.setText("Esta aplicación requiere permisos de administrador para modificar configuraciones del sistema.")
+    msg.setInformativeText("Por favor, ejecute la aplicación como Administrador.")
+    msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+    msg.open()
+
+
 def main():
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
-    
-    # Verificar permisos de administrador
-    if not is_admin():
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Icon.Warning)
-        msg.setWindowTitle("Permisos Requeridos")
-        msg.setText("Esta aplicación requiere permisos de administrador para modificar configuraciones del sistema.")
-        msg.setInformativeText("Por favor, ejecute la aplicación como Administrador.")
-        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
-        msg.exec()
-        # Continuar de todos modos para mostrar la interfaz (solo lectura)
+    apply_theme(app)
+    startup_profile.mark("qapplication")
     
     window = MainWindow()
+    startup_profile.mark("window_built")
     window.show()
     
-    sys.exit(app.exec())
+    watchdog = None
+    
+    def on_startup_finished():
+        nonlocal watchdog
+        startup_profile.mark("startup_finished")
+        
+        # Medir la latencia del event loop durante el resto de la sesión
+        from ui.stall_watchdog import StallWatchdog
+        watchdog = StallWatchdog(activity_logger.log_dir)
+        watchdog.start()
+        
+        if PROFILE_STARTUP:
+            startup_profile.disable_import_timing()
+            startup_profile.write_report(activity_logger.log_dir)
+            print(startup_profile.report(), file=sys.stderr)
+        
+        if EXIT_AFTER_STARTUP:
+            first_paint = startup_profile.elapsed_ms("first_paint")
+            print(f"time_to_first_paint_ms={first_paint:.1f}")
+            QTimer.singleShot(0, app.quit)
+        elif not is_admin():
+            # Después del primer frame, sin bloquear la ventana
+            _warn_not_admin(window)
+    
+    window.startup_finished.connect(on_startup_finished)
+    
+    exit_code = app.exec()
+    
+    if watchdog is not None:
+        watchdog.stop()
+        watchdog.write_report()
+    
+    # Vaciar la cola del logger antes de salir
+    activity_logger.close()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+"""EnforcementAgent con MemoryRegistry y reloj falso"""
+
+import pytest
+
+from core.agent import EnforcementAgent
+from core.ai_services import ServiceStatus
+from core.detector import AIServiceDetector
+from core.manager import AIServiceManager
+from core.registry import MemoryRegistry
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.enforced = []
+    
+    def log_enforce(self, service_id, service_name, observed, desired, success, message):
+        self.enforced.append((service_id, observed, desired, success))
+
+
+class RecordingManager(AIServiceManager):
+    """Registra las llamadas que lanzarían PowerShell"""
+    
+    def __init__(self, registry):
+        super().__init__(registry=registry)
+        self.full_calls = []
+    
+    def disable_service(self, service):
+        self.full_calls.append(("disable", service.id))
+        return True, "ok"
+    
+    def enable_service(self, service):
+        self.full_calls.append(("enable", service.id))
+        return True, "ok"
+
+
+WEB_SEARCH = ("HKCU", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Search", "CortanaConsent")
+
+
+def make_agent(registry=None, targets=None, detector=None, **kwargs):
+    registry = registry if registry is not None else MemoryRegistry()
+    detector = detector or AIServiceDetector(registry=registry, probes=False)
+    clock = FakeClock()
+    kwargs.setdefault("registry_interval", 60.0)
+    kwargs.setdefault("probe_interval", None)
+    agent = EnforcementAgent(
+        targets or {"web_search": ServiceStatus.DISABLED},
+        detector=detector,
+        manager=RecordingManager(registry),
+        clock=clock,
+        logger=RecordingLogger(),
+        **kwargs
+    )
+    return agent, clock, registry
+
+
+def test_checks_are_due_immediately_then_every_interval():
+    agent, clock, _ = make_agent(MemoryRegistry({WEB_SEARCH: 0}))
+    assert agent.next_due() == clock.now
+    
+    assert agent.tick() == pytest.approx(60.0 * 1.5)
+    assert agent.stats["registry_checks"] == 1
+    
+    # Nada vence antes de tiempo
+    clock.now += 30
+    agent.tick()
+    assert agent.stats["registry_checks"] == 1
+    clock.now += 60
+    agent.tick()
+    assert agent.stats["registry_checks"] == 2
+
+
+def test_only_targeted_services_with_registry_rules_are_scheduled():
+    agent, _, _ = make_agent(targets={
+        "web_search": ServiceStatus.DISABLED,
+        "copilot": ServiceStatus.DISABLED,
+    }, probe_interval=3600.0)
+    assert set(agent.intervals()) == {"web_search/registry", "copilot/registry", "copilot/probe"}
+
+
+def test_interval_relaxes_without_drift_up_to_max_factor():
+    agent, clock, _ = make_agent(MemoryRegistry({WEB_SEARCH: 0}), max_factor=4.0)
+    for _ in range(10):
+        clock.now = agent.next_due()
+        agent.tick()
+    assert agent.intervals()["web_search/registry"] == 240.0
+    assert agent.stats["drift"] == 0
+
+
+def test_registry_drift_rewrites_only_registry_values():
+    agent, clock, registry = make_agent(MemoryRegistry({WEB_SEARCH: 1}))
+    agent.tick()
+    
+    hive, path, name = WEB_SEARCH
+    assert registry.read_values(hive, path, [name]) == {name: 0}
+    assert agent.manager.full_calls == []
+    assert agent.stats["drift"] == 1
+    assert agent.stats["enforced"] == 1
+    assert agent.intervals()["web_search/registry"] == 30.0
+    event = agent.history[-1]
+    assert (event.service_id, event.kind, event.success) == ("web_search", "registry", True)
+    assert agent.logger.enforced == [("web_search", "enabled", "disabled", True)]
+
+
+def test_repeated_drift_tightens_down_to_min_interval():
+    agent, clock, registry = make_agent(MemoryRegistry(), min_interval=20.0)
+    hive, path, name = WEB_SEARCH
+    for _ in range(4):
+        registry.set_dword(hive, path, name, 1)
+        clock.now = agent.next_due()
+        agent.tick()
+    assert agent.stats["enforced"] == 4
+    assert agent.intervals()["web_search/registry"] == 20.0
+
+
+def test_failed_enforcement_backs_off_exponentially():
+    agent, clock, _ = make_agent(MemoryRegistry(read_only=True), max_factor=8.0)
+    expected = [120.0, 240.0, 480.0, 480.0]
+    for interval in expected:
+        clock.now = agent.next_due()
+        agent.tick()
+        assert agent.intervals()["web_search/registry"] == interval
+    assert agent.stats["failures"] == 4
+    assert agent.stats["enforced"] == 0
+
+
+def test_backoff_resets_after_a_successful_check():
+    agent, clock, registry = make_agent(MemoryRegistry(read_only=True))
+    agent.tick()
+    assert agent.intervals()["web_search/registry"] == 120.0
+    
+    registry.read_only = False
+    clock.now = agent.next_due()
+    agent.tick()
+    assert agent.intervals()["web_search/registry"] == 60.0
+    assert agent.stats["enforced"] == 1
+
+
+def test_notify_changed_makes_the_registry_check_due_now():
+    agent, clock, registry = make_agent(MemoryRegistry({WEB_SEARCH: 0}))
+    agent.tick()
+    clock.now += 5
+    
+    hive, path, name = WEB_SEARCH
+    registry.set_dword(hive, path, name, 1)
+    agent.notify_changed({"web_search"})
+    assert agent.next_due() == clock.now
+    agent.tick()
+    assert registry.read_values(hive, path, [name]) == {name: 0}
+    assert agent.stats["change_events"] == 1
+
+
+class ProbeDetector(AIServiceDetector):
+    """Probes deterministas; registra el orden en que se consultan"""
+    
+    def __init__(self, registry, appx, feature):
+        super().__init__(registry=registry)
+        self.appx = appx
+        self.feature = feature
+        self.probed = []
+    
+    def _appx_evidence(self, service, appx_inventory=None):
+        self.probed.append("appx")
+        return self.appx, ""
+    
+    def _feature_evidence(self, service):
+        self.probed.append("feature")
+        return self.feature, ""
+
+
+def test_probe_drift_runs_the_full_action():
+    registry = MemoryRegistry()
+    detector = ProbeDetector(registry, ServiceStatus.UNKNOWN, ServiceStatus.ENABLED)
+    agent, clock, _ = make_agent(
+        registry, {"recall": ServiceStatus.DISABLED}, detector=detector,
+        registry_interval=1e9, probe_interval=3600.0
+    )
+    # El chequeo de registro vence a la vez; sólo interesa el probe
+    agent.tick()
+    assert detector.probed == ["feature"]
+    assert agent.manager.full_calls == [("disable", "recall")]
+    assert agent.intervals()["recall/probe"] == 1800.0
+
+
+def test_not_installed_is_not_drift():
+    registry = MemoryRegistry()
+    detector = ProbeDetector(registry, ServiceStatus.NOT_INSTALLED, ServiceStatus.UNKNOWN)
+    agent, _, _ = make_agent(
+        registry, {"copilot": ServiceStatus.DISABLED}, detector=detector,
+        probe_interval=3600.0
+    )
+    agent.manager.apply_registry_rules = lambda service, disable: (True, "ok")
+    agent.tick()
+    assert agent.manager.full_calls == []
+    assert agent.stats["probe_checks"] == 1
@@ -0,0 +1,130 @@
+"""Bundles: compilación, serialización y rechazo de bundles viejos"""
+
+import dataclasses
+import json
+
+import pytest
+
+from core.bundles import BundleError, ProfileBundle, StaleBundleError, compile_bundle
+from core.catalog import Catalog, default_catalog, parse_catalog, parse_profiles
+from core.manager import AIServiceManager
+from core.registry import MemoryRegistry
+
+
+def service(service_id, key="Off", disable_value=1, path=r"SOFTWARE\Policies\Shared"):
+    return {
+        "id": service_id, "name": service_id, "description": "",
+        "registry_paths": [{"hive": "HKLM", "path": path, "key": key,
+                            "disable_value": disable_value, "enable_value": 0}],
+    }
+
+
+def catalog_of(*services):
+    data = {"version": 1, "services": list(services),
+            "profiles": {"disable-all-ai": {"*": "disabled"}}}
+    return Catalog(parse_catalog(data), parse_profiles(data))
+
+
+def test_values_of_the_same_key_are_grouped_with_their_owners():
+    catalog = catalog_of(
+        service("first", key="A"),
+        service("second", key="B", path=r"software\policies\SHARED"),
+        service("third", key="A"),
+        service("other", path=r"SOFTWARE\Policies\Alone"),
+    )
+    bundle = compile_bundle("disable-all-ai", catalog)
+    assert bundle.catalog_digest == catalog.digest
+    assert bundle.actions == (("first", "disable"), ("second", "disable"),
+                              ("third", "disable"), ("other", "disable"))
+    # Una escritura por clave, ordenadas
+    assert [write.path for write in bundle.writes] == [
+        r"SOFTWARE\Policies\Alone", r"SOFTWARE\Policies\Shared"
+    ]
+    shared = bundle.writes[1]
+    assert shared.values == (("A", 1), ("B", 1))
+    assert shared.owners == (("first", "third"), ("second",))
+
+
+def test_conflicting_values_are_rejected():
+    catalog = catalog_of(service("first", disable_value=1), service("second", disable_value=2))
+    with pytest.raises(BundleError, match="recibe 1 y 2"):
+        compile_bundle("disable-all-ai", catalog)
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(BundleError, match="Perfil desconocido"):
+        compile_bundle("nope")
+    # Los perfiles salen del catálogo contra el que se compila
+    with pytest.raises(BundleError, match="Perfil desconocido"):
+        compile_bundle("keep-voice-typing", catalog_of(service("first")))
+
+
+def test_shipped_profiles_compile_with_appx_and_feature_steps():
+    bundle = compile_bundle("keep-voice-typing")
+    assert ("ai_voice_typing", "enable") in bundle.actions
+    kinds = {(op.service_id, op.kind) for op in bundle.ops}
+    assert ("copilot", "appx") in kinds
+    assert ("recall", "feature") in kinds
+
+
+def test_save_and_load_round_trip(tmp_path):
+    bundle = compile_bundle("disable-all-ai")
+    path = tmp_path / "bundle.json"
+    bundle.save(str(path))
+    assert ProfileBundle.load(str(path)) == bundle
+
+
+@pytest.mark.parametrize("content, message", [
+    ("{", "JSON inválido"),
+    (json.dumps({"format": 99}), "formato de bundle no soportado"),
+    (json.dumps({"format": 1, "profile": "x"}), "bundle inválido"),
+])
+def test_invalid_bundle_files(tmp_path, content, message):
+    path = tmp_path / "bundle.json"
+    path.write_text(content)
+    with pytest.raises(BundleError, match=message):
+        ProfileBundle.load(str(path))
+
+
+def test_stale_bundle_is_rejected_before_writing_anything():
+    bundle = compile_bundle("disable-all-ai", catalog_of(service("first")))
+    changed = catalog_of(service("first", disable_value=2))
+    with pytest.raises(StaleBundleError):
+        bundle.check(changed)
+    
+    registry = MemoryRegistry()
+    with pytest.raises(StaleBundleError):
+        AIServiceManager(registry=registry).apply_bundle(bundle, changed)
+    assert registry.writes == 0
+
+
+def test_texts_do_not_make_a_bundle_stale():
+    data = service("first")
+    bundle = compile_bundle("disable-all-ai", catalog_of(data))
+    bundle.check(catalog_of(dict(data, name="Renombrado", description="Otro texto")))
+
+
+def test_stale_error_is_a_bundle_error():
+    assert issubclass(StaleBundleError, BundleError)
+
+
+def test_apply_bundle_writes_every_value_without_detecting():
+    catalog = default_catalog()
+    bundle = dataclasses.replace(compile_bundle("disable-all-ai", catalog), ops=())
+    registry = MemoryRegistry()
+    results = AIServiceManager(registry=registry).apply_bundle(bundle, catalog)
+    
+    assert [(service_id, success) for service_id, _, success, _ in results] == [
+        (service_id, True) for service_id, _ in bundle.actions
+    ]
+    assert registry.writes == sum(len(write.values) for write in bundle.writes)
+    for write in bundle.writes:
+        names = [name for name, _ in write.values]
+        assert registry.read_values(write.hive, write.path, names) == dict(write.values)
+
+
+def test_apply_bundle_reports_registry_errors_per_service():
+    catalog = catalog_of(service("first"))
+    bundle = compile_bundle("disable-all-ai", catalog)
+    results = AIServiceManager(registry=MemoryRegistry(read_only=True)).apply_bundle(bundle, catalog)
+    assert results == [("first", "disable", False, r"Sin permisos para modificar: SOFTWARE\Policies\Shared")]
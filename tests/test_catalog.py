@@ -0,0 +1,154 @@
+"""Catálogo de servicios: validación del esquema e índices"""
+
+import copy
+import json
+
+import pytest
+
+from core.ai_services import ServiceStatus
+from core.catalog import CatalogError, load_catalog, parse_catalog, parse_profiles
+
+
+SERVICE = {
+    "id": "sample",
+    "name": "Sample",
+    "description": "Servicio de prueba",
+    "registry_paths": [
+        {"hive": "HKLM", "path": r"SOFTWARE\Policies\Sample", "key": "Off",
+         "disable_value": 1, "enable_value": 0},
+    ],
+    "appx_packages": ["Sample.App"],
+    "windows_feature": "SampleFeature",
+}
+
+
+def catalog_with(*services):
+    return {"version": 1, "services": [copy.deepcopy(s) for s in services] or [copy.deepcopy(SERVICE)]}
+
+
+def with_changes(**changes):
+    service = copy.deepcopy(SERVICE)
+    for name, value in changes.items():
+        if value is None:
+            service.pop(name, None)
+        else:
+            service[name] = value
+    return service
+
+
+def with_rule(**changes):
+    rule = dict(SERVICE["registry_paths"][0], **changes)
+    return with_changes(registry_paths=[rule])
+
+
+def test_valid_catalog_compiles_every_rule():
+    (definition,) = parse_catalog(catalog_with())
+    assert definition.id == "sample"
+    assert definition.registry_rules[0].key == "Off"
+    assert [rule.package for rule in definition.appx_rules] == ["Sample.App"]
+    assert definition.feature_rule.name == "SampleFeature"
+
+
+def test_optional_fields_may_be_omitted():
+    service = with_changes(registry_paths=None, appx_packages=None, windows_feature=None)
+    (definition,) = parse_catalog(catalog_with(service))
+    assert definition.registry_rules == ()
+    assert definition.appx_rules == ()
+    assert definition.feature_rule is None
+
+
+@pytest.mark.parametrize("data, message", [
+    ([], "se esperaba un objeto"),
+    ({"version": 2, "services": []}, "versión no soportada: 2"),
+    ({"version": 1, "services": {}}, "'services' debe ser una lista"),
+    (catalog_with(with_changes(name=None)), "services[0]: falta el campo 'name'"),
+    (catalog_with(with_changes(extra=True)), "services[0]: campos desconocidos: extra"),
+    (catalog_with(with_changes(id="Bad-Id")), "services[0].id: 'Bad-Id' no cumple"),
+    (catalog_with(with_changes(name=3)), "services[0].name: tipo inválido (int)"),
+    (catalog_with(with_changes(appx_packages=[""])), "services[0].appx_packages[0]"),
+    (catalog_with(with_rule(hive="HKCR")), "services[0].registry_paths[0].hive: debe ser"),
+    (catalog_with(with_rule(key="")), "registry_paths[0]: path y key no pueden estar vacíos"),
+    (catalog_with(with_rule(disable_value=True)), "registry_paths[0].disable_value: tipo inválido (bool)"),
+    (catalog_with(with_rule(enable_value="0")), "registry_paths[0].enable_value: tipo inválido (str)"),
+    (catalog_with(SERVICE, SERVICE), "services[1].id: 'sample' duplicado"),
+])
+def test_schema_errors_name_the_offending_field(data, message):
+    with pytest.raises(CatalogError) as error:
+        parse_catalog(data, "test.json")
+    assert str(error.value).startswith("test.json")
+    assert message in str(error.value)
+
+
+def test_load_catalog_reports_invalid_json_and_cross_file_duplicates(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{")
+    with pytest.raises(CatalogError, match="JSON inválido"):
+        load_catalog(str(broken))
+    
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    first.write_text(json.dumps(catalog_with()))
+    second.write_text(json.dumps(catalog_with()))
+    with pytest.raises(CatalogError, match="ya está definido en"):
+        load_catalog(str(first), str(second))
+
+
+def test_indexes_are_case_insensitive_and_shared_keys_list_every_owner(tmp_path):
+    other = with_changes(id="other", appx_packages=["Sample.App"], windows_feature=None)
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(catalog_with(SERVICE, other)))
+    catalog = load_catalog(str(path))
+    
+    owners = catalog.services_for_key("HKLM", r"software\policies\SAMPLE")
+    assert [definition.id for definition in owners] == ["sample", "other"]
+    assert [d.id for d in catalog.services_for_package("sample.app")] == ["sample", "other"]
+    assert catalog.position("other") == 1
+    assert "other" in catalog and "missing" not in catalog
+
+
+def test_digest_changes_only_with_operations(tmp_path):
+    def digest(service):
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps(catalog_with(service)))
+        return load_catalog(str(path)).digest
+    
+    base = digest(SERVICE)
+    assert digest(with_changes(description="Otro texto")) == base
+    assert digest(with_rule(disable_value=2)) != base
+    assert digest(with_changes(appx_packages=["Other.App"])) != base
+
+
+def test_shipped_catalog_is_valid():
+    catalog = load_catalog()
+    assert len(catalog) == len({definition.id for definition in catalog}) > 0
+    assert set(catalog.profiles) == {"disable-all-ai", "keep-voice-typing"}
+    assert catalog.profiles["keep-voice-typing"]["ai_voice_typing"] == ServiceStatus.ENABLED
+
+
+@pytest.mark.parametrize("profiles, message", [
+    ([], "'profiles' debe ser un objeto"),
+    ({"Bad Name": {"*": "disabled"}}, "no cumple [a-z0-9-]+"),
+    ({"empty": {}}, "se esperaba un objeto no vacío"),
+    ({"odd": {"*": "unknown"}}, "profiles.odd.*: debe ser disabled o enabled"),
+])
+def test_profile_schema_errors(profiles, message):
+    data = dict(catalog_with(), profiles=profiles)
+    with pytest.raises(CatalogError) as error:
+        parse_profiles(data, "test.json")
+    assert message in str(error.value)
+
+
+def test_profiles_are_checked_against_every_loaded_file(tmp_path):
+    base, extra = tmp_path / "base.json", tmp_path / "extra.json"
+    base.write_text(json.dumps(dict(catalog_with(), profiles={"mine": {"other": "disabled"}})))
+    with pytest.raises(CatalogError, match="servicio desconocido 'other'"):
+        load_catalog(str(base))
+    
+    # El servicio lo define una extensión
+    extra.write_text(json.dumps(catalog_with(with_changes(id="other"))))
+    catalog = load_catalog(str(base), str(extra))
+    assert catalog.profiles["mine"] == {"other": ServiceStatus.DISABLED}
+    
+    extra.write_text(json.dumps(dict(catalog_with(with_changes(id="other")),
+                                     profiles={"mine": {"*": "enabled"}})))
+    with pytest.raises(CatalogError, match="el perfil 'mine' ya está definido"):
+        load_catalog(str(base), str(extra))
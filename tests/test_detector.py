@@ -0,0 +1,43 @@
+"""AIServiceDetector: consultas compartidas por pasada"""
+
+from core import detector as detector_module
+from core.ai_services import ServiceStatus
+from core.catalog import Catalog, parse_catalog
+from core.detector import AIServiceDetector
+from core.registry import MemoryRegistry
+
+
+def appx_service(service_id, package):
+    return {"id": service_id, "name": service_id, "description": "", "appx_packages": [package]}
+
+
+def counting_inventory(monkeypatch, packages):
+    calls = []
+    
+    def read_appx_inventory():
+        calls.append(1)
+        return frozenset(packages)
+    
+    monkeypatch.setattr(detector_module, "read_appx_inventory", read_appx_inventory)
+    return calls
+
+
+def test_appx_inventory_is_read_once_per_pass(monkeypatch):
+    calls = counting_inventory(monkeypatch, {"Vendor.First"})
+    catalog = Catalog(parse_catalog({"version": 1, "services": [
+        appx_service(f"app_{i}", f"Vendor.App{i}") for i in range(5)
+    ] + [appx_service("first", "Vendor.First")]}))
+    detector = AIServiceDetector(registry=MemoryRegistry(), catalog=catalog)
+    
+    detector.detect_all()
+    assert len(calls) == 1
+    assert detector.get_service("first").status == ServiceStatus.ENABLED
+    assert detector.get_service("app_0").status == ServiceStatus.NOT_INSTALLED
+    detector.detect_all()
+    assert len(calls) == 2
+
+
+def test_inventory_is_not_read_when_the_registry_decides(monkeypatch):
+    calls = counting_inventory(monkeypatch, set())
+    AIServiceDetector(registry=MemoryRegistry()).detect_all()
+    assert calls == []
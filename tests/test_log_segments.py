@@ -0,0 +1,139 @@
+"""Segmentos de log: rotación, compresión y lectura hacia atrás"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from core.log_segments import (
+    LogFollower, LogRotator, iter_records, list_segments, parse_segment, read_tail
+)
+
+
+def write_lines(path, records, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_all_backwards(path, count, chunk_size=8192):
+    """Recorre un segmento con read_tail como lo hace el logger"""
+    pages, end = [], None
+    while end != 0:
+        records, end = read_tail(path, end, count, chunk_size)
+        pages.append(records)
+    return [record for page in reversed(pages) for record in page]
+
+
+def test_segments_sort_legacy_then_sealed_then_active(tmp_path):
+    for name in ["activity_20260302.jsonl", "activity_20260301_002.jsonl.gz",
+                 "activity_20260301.jsonl", "activity_20260301_001.jsonl.gz",
+                 "activity_20260301.json", "notes.txt"]:
+        (tmp_path / name).write_text("")
+    assert [s.name for s in list_segments(str(tmp_path))] == [
+        "activity_20260301.json",
+        "activity_20260301_001.jsonl.gz",
+        "activity_20260301_002.jsonl.gz",
+        "activity_20260301.jsonl",
+        "activity_20260302.jsonl",
+    ]
+    assert parse_segment(str(tmp_path), "activity_20260301.jsonl").is_active
+    assert not parse_segment(str(tmp_path), "activity_20260301_001.jsonl.gz").is_active
+    assert parse_segment(str(tmp_path), "activity.jsonl") is None
+
+
+def test_iter_records_skips_partial_last_line(tmp_path):
+    path = tmp_path / "activity_20260301.jsonl"
+    write_lines(path, [{"i": 0}, {"i": 1}])
+    with open(path, "a") as f:
+        f.write('{"i": 2')
+    records = list(iter_records(str(path)))
+    assert [record for record, _ in records] == [{"i": 0}, {"i": 1}]
+    # El offset retornado permite continuar justo después
+    assert list(iter_records(str(path), records[0][1]))[0][0] == {"i": 1}
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 8192])
+def test_read_tail_pages_back_to_the_start(tmp_path, chunk_size):
+    path = tmp_path / "activity_20260301.jsonl"
+    records = [{"i": i, "message": "x" * (i % 5)} for i in range(23)]
+    write_lines(path, records)
+    
+    tail, start = read_tail(str(path), None, 5, chunk_size)
+    assert tail == records[-5:]
+    assert start > 0
+    assert read_all_backwards(str(path), 5, chunk_size) == records
+
+
+def test_read_tail_of_compressed_segment(tmp_path):
+    path = tmp_path / "activity_20260301_001.jsonl.gz"
+    records = [{"i": i} for i in range(10)]
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    assert read_tail(str(path), None, 3)[0] == records[-3:]
+    assert read_all_backwards(str(path), 3) == records
+
+
+def test_read_tail_of_legacy_segment_reaches_older_records(tmp_path):
+    path = tmp_path / "activity_20260301.json"
+    records = [{"i": i} for i in range(7)]
+    path.write_text(json.dumps({"entries": records}))
+    
+    tail, start = read_tail(str(path), None, 3)
+    assert tail == records[-3:]
+    assert start == 4
+    assert read_all_backwards(str(path), 3) == records
+
+
+def test_seal_numbers_and_compresses_segments(tmp_path):
+    rotator = LogRotator(str(tmp_path), max_segment_bytes=50)
+    active = tmp_path / "activity_20260301.jsonl"
+    write_lines(active, [{"i": i} for i in range(10)])
+    assert rotator.needs_rotation(str(active))
+    
+    first = rotator.seal(str(active))
+    assert os.path.basename(first) == "activity_20260301_001.jsonl.gz"
+    assert not active.exists()
+    
+    write_lines(active, [{"i": 10}])
+    second = rotator.seal(str(active))
+    assert os.path.basename(second) == "activity_20260301_002.jsonl.gz"
+    assert [r for r, _ in iter_records(first)] == [{"i": i} for i in range(10)]
+    # Sólo se sella un segmento activo
+    assert rotator.seal(second) is None
+
+
+def test_compact_seals_old_days_and_purges_by_age_and_size(tmp_path):
+    rotator = LogRotator(str(tmp_path), max_age_days=30, max_total_bytes=10 ** 9)
+    write_lines(tmp_path / "activity_20260101.jsonl", [{"i": 0}])
+    write_lines(tmp_path / "activity_20260228.jsonl", [{"i": 1}])
+    write_lines(tmp_path / "activity_20260301.jsonl", [{"i": 2}])
+    
+    renamed, removed = rotator.compact(today="20260301")
+    assert renamed == {
+        "activity_20260101.jsonl": "activity_20260101_001.jsonl.gz",
+        "activity_20260228.jsonl": "activity_20260228_001.jsonl.gz",
+    }
+    assert removed == ["activity_20260101_001.jsonl.gz"]
+    
+    # Por espacio se borran los más antiguos, nunca el activo de hoy
+    rotator.max_total_bytes = 0
+    _, removed = rotator.compact(today="20260301")
+    assert removed == ["activity_20260228_001.jsonl.gz"]
+    assert [s.name for s in list_segments(str(tmp_path))] == ["activity_20260301.jsonl"]
+
+
+def test_follower_reads_appended_records_across_rotation(tmp_path):
+    follower = LogFollower(str(tmp_path), from_end=True)
+    active = follower.active_path
+    write_lines(active, [{"i": 0}])
+    assert follower.poll() == [{"i": 0}]
+    assert follower.poll() == []
+    
+    write_lines(active, [{"i": 1}], mode="a")
+    LogRotator(str(tmp_path)).seal(active)
+    write_lines(active, [{"i": 2}])
+    assert follower.poll() == [{"i": 1}, {"i": 2}]
+    assert follower.poll() == []
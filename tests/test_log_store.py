@@ -0,0 +1,178 @@
+"""LogStore: indexación incremental, paginación por cursor y búsqueda de texto"""
+
+import json
+import os
+
+import pytest
+
+from core.log_store import LogStore, matches_terms, search_terms
+
+
+def record(timestamp, service_id="copilot", action="disable", level="INFO",
+           message="Servicio deshabilitado", service_name=None):
+    return {
+        "timestamp": timestamp,
+        "level": level,
+        "action": action,
+        "service_id": service_id,
+        "service_name": service_name or service_id.title(),
+        "message": message,
+    }
+
+
+def write_segment(path, records, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for entry in records:
+            f.write(json.dumps(entry) + "\n")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LogStore(str(tmp_path / "index.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    directory = tmp_path / "logs"
+    directory.mkdir()
+    return directory
+
+
+def test_pages_cover_every_entry_once_newest_first(store, log_dir):
+    records = [record(f"2026-03-01 10:00:{second:02d}") for second in range(7)]
+    # Dos entradas con el mismo timestamp: el id desempata
+    records.append(record("2026-03-01 10:00:06", service_id="recall"))
+    write_segment(log_dir / "activity_20260301.jsonl", records)
+    assert store.sync_directory(str(log_dir)) == 8
+    
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = store.query(limit=3, cursor=cursor)
+        pages += 1
+        seen.extend((entry.timestamp, entry.service_id) for entry in page.entries)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 8
+    assert seen == sorted(seen, key=lambda item: item[0], reverse=True)
+    assert seen[0] == ("2026-03-01 10:00:06", "recall")
+
+
+def test_last_full_page_has_no_cursor(store, log_dir):
+    write_segment(log_dir / "activity_20260301.jsonl",
+                  [record(f"2026-03-01 10:00:0{i}") for i in range(4)])
+    store.sync_directory(str(log_dir))
+    first = store.query(limit=2)
+    second = store.query(limit=2, cursor=first.next_cursor)
+    assert first.next_cursor is not None
+    assert len(second.entries) == 2
+    assert second.next_cursor is None
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_limit_below_one_is_rejected(store, limit):
+    with pytest.raises(ValueError):
+        store.query(limit=limit)
+
+
+def test_filters_and_date_bounds(store, log_dir):
+    write_segment(log_dir / "activity_20260301.jsonl", [
+        record("2026-03-01 09:00:00", service_id="copilot"),
+        record("2026-03-01 12:00:00", service_id="recall", level="ERROR"),
+    ])
+    write_segment(log_dir / "activity_20260302.jsonl", [
+        record("2026-03-02 09:00:00", service_id="copilot", action="enable"),
+    ])
+    store.sync_directory(str(log_dir))
+    
+    assert [e.timestamp for e in store.query(end="2026-03-01").entries] == [
+        "2026-03-01 12:00:00", "2026-03-01 09:00:00"
+    ]
+    assert [e.timestamp for e in store.query(start="2026-03-02").entries] == ["2026-03-02 09:00:00"]
+    assert store.count(service_id="copilot") == 2
+    assert store.count(level="ERROR") == 1
+    assert store.aggregate("action") == {"disable": 2, "enable": 1}
+    assert store.aggregate("day") == {"2026-03-01": 2, "2026-03-02": 1}
+    with pytest.raises(ValueError):
+        store.aggregate("message")
+
+
+def test_text_search_matches_word_prefixes_in_message_and_service_name(store, log_dir):
+    write_segment(log_dir / "activity_20260301.jsonl", [
+        record("2026-03-01 10:00:00", message="Backup creado"),
+        record("2026-03-01 10:00:01", service_id="recall", service_name="Windows Recall",
+               message="Servicio habilitado"),
+        record("2026-03-01 10:00:02", message="Sin permisos para modificar"),
+    ])
+    store.sync_directory(str(log_dir))
+    
+    assert [e.message for e in store.query(text="backup").entries] == ["Backup creado"]
+    assert [e.service_id for e in store.query(text="reca").entries] == ["recall"]
+    assert [e.message for e in store.query(text="sin perm").entries] == [
+        "Sin permisos para modificar"
+    ]
+    # Las comillas no rompen la consulta FTS
+    assert store.count(text='"backup') == 1
+    assert store.count(text="inexistente") == 0
+
+
+@pytest.mark.parametrize("text", ['"', '""', "  ", "-*-"])
+def test_search_without_words_does_not_filter(store, log_dir, text):
+    write_segment(log_dir / "activity_20260301.jsonl", [
+        record("2026-03-01 10:00:00"), record("2026-03-01 10:00:01"),
+    ])
+    store.sync_directory(str(log_dir))
+    assert len(store.query(text=text).entries) == 2
+
+
+def test_search_terms_keep_only_word_characters():
+    assert search_terms('"Café" back-up') == ["cafe", "back", "up"]
+    assert search_terms('"') == []
+
+
+def test_matches_terms_agrees_with_the_index(store, log_dir):
+    messages = ["Backup creado", "Sin permisos para modificar", "Configuración restaurada"]
+    write_segment(log_dir / "activity_20260301.jsonl", [
+        record(f"2026-03-01 10:00:0{i}", message=message) for i, message in enumerate(messages)
+    ])
+    store.sync_directory(str(log_dir))
+    for text in ["backup", "ackup", "sin perm", "configuracion", "perm sin", "rest-aur", '"']:
+        terms = search_terms(text)
+        expected = {entry.message for entry in store.query(text=text).entries}
+        assert {m for m in messages if matches_terms(terms, m, "Copilot")} == expected, text
+
+
+def test_sync_indexes_only_appended_lines(store, log_dir):
+    path = log_dir / "activity_20260301.jsonl"
+    write_segment(path, [record("2026-03-01 10:00:00")])
+    assert store.sync_file(str(path)) == 1
+    assert store.sync_file(str(path)) == 0
+    
+    write_segment(path, [record("2026-03-01 10:00:01")], mode="a")
+    # Línea sin salto final: escritura en curso, todavía no se indexa
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record("2026-03-01 10:00:02")))
+    assert store.sync_file(str(path)) == 1
+    assert store.count() == 2
+
+
+def test_truncated_file_is_reindexed(store, log_dir):
+    path = log_dir / "activity_20260301.jsonl"
+    write_segment(path, [record(f"2026-03-01 10:00:0{i}") for i in range(3)])
+    store.sync_file(str(path))
+    write_segment(path, [record("2026-03-01 11:00:00")])
+    assert store.sync_file(str(path)) == 1
+    assert [e.timestamp for e in store.query().entries] == ["2026-03-01 11:00:00"]
+
+
+def test_forget_source_drops_its_entries(store, log_dir):
+    write_segment(log_dir / "activity_20260301.jsonl", [record("2026-03-01 10:00:00")])
+    write_segment(log_dir / "activity_20260302.jsonl", [record("2026-03-02 10:00:00")])
+    store.sync_directory(str(log_dir))
+    store.forget_source("activity_20260301.jsonl")
+    assert store.source_counts() == {"activity_20260302.jsonl": 1}
+    os.remove(log_dir / "activity_20260301.jsonl")
+    assert store.sync_directory(str(log_dir)) == 0
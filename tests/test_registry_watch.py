@@ -0,0 +1,128 @@
+"""RegistryWatcher con MemoryRegistry: agrupación por servicio y debounce"""
+
+import threading
+import time
+
+from core.catalog import default_catalog
+from core.registry import MemoryRegistry
+from core.registry_watch import RegistryWatcher, _PollingWatch, _watch_key
+
+
+WINDOWS_AI = ("HKLM", r"SOFTWARE\Policies\Microsoft\Windows\WindowsAI")
+SEARCH = ("HKCU", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Search")
+
+
+class Deliveries:
+    """Callback on_change que se puede esperar desde la prueba"""
+    
+    def __init__(self):
+        self.calls = []
+        self._event = threading.Event()
+    
+    def __call__(self, service_ids):
+        self.calls.append(set(service_ids))
+        self._event.set()
+    
+    def wait(self, timeout=2.0):
+        delivered = self._event.wait(timeout)
+        self._event.clear()
+        return delivered
+
+
+def start_watcher(registry, deliveries, **kwargs):
+    services = default_catalog().new_services()
+    watcher = RegistryWatcher(services, registry, deliveries, **kwargs)
+    watcher.start()
+    return watcher
+
+
+def test_memory_backend_reports_every_service_using_the_key():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=0.05)
+    try:
+        assert watcher.backend_names == ["_MemoryWatch"]
+        registry.set_dword(*WINDOWS_AI, "AllowRecallEnablement", 0)
+        assert deliveries.wait()
+        assert deliveries.calls == [{"recall", "ai_explorer"}]
+    finally:
+        watcher.stop()
+
+
+def test_burst_of_writes_is_delivered_once():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=0.2)
+    try:
+        registry.set_dword(*SEARCH, "BingSearchEnabled", 0)
+        registry.set_dword(*SEARCH, "CortanaConsent", 0)
+        registry.set_dword(*WINDOWS_AI, "DisableAIDataAnalysis", 1)
+        assert deliveries.wait()
+        # Nada más llega después del debounce
+        assert not deliveries.wait(0.4)
+        assert deliveries.calls == [{"bing_search", "web_search", "cortana", "recall", "ai_explorer"}]
+        assert watcher.events == 3
+        assert watcher.deliveries == 1
+    finally:
+        watcher.stop()
+
+
+def test_max_delay_bounds_a_continuous_burst():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=0.2, max_delay=0.3)
+    try:
+        started = time.monotonic()
+        # Escrituras cada 0.05 s: el debounce solo nunca vencería
+        while not deliveries.calls and time.monotonic() - started < 2.0:
+            registry.set_dword(*SEARCH, "BingSearchEnabled", 0)
+            time.sleep(0.05)
+        assert deliveries.calls == [{"bing_search", "web_search", "cortana"}]
+        assert time.monotonic() - started < 1.0
+    finally:
+        watcher.stop()
+
+
+def test_writes_to_unwatched_keys_are_ignored():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=0.05)
+    try:
+        registry.set_dword("HKCU", r"SOFTWARE\Unrelated", "Value", 1)
+        assert not deliveries.wait(0.2)
+        assert watcher.events == 0
+    finally:
+        watcher.stop()
+
+
+def test_flush_delivers_pending_changes_immediately():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=60.0, max_delay=60.0)
+    try:
+        registry.set_dword(*SEARCH, "CortanaConsent", 0)
+        assert watcher.flush() == {"bing_search", "web_search", "cortana"}
+        assert watcher.flush() == set()
+        assert deliveries.calls == [{"bing_search", "web_search", "cortana"}]
+    finally:
+        watcher.stop()
+
+
+def test_stop_removes_the_listener():
+    registry, deliveries = MemoryRegistry(), Deliveries()
+    watcher = start_watcher(registry, deliveries, debounce=0.05)
+    watcher.stop()
+    registry.set_dword(*SEARCH, "CortanaConsent", 0)
+    assert watcher.events == 0
+
+
+def test_polling_backend_detects_changed_last_write():
+    registry = MemoryRegistry()
+    key = _watch_key(*SEARCH)
+    changes = []
+    watch = _PollingWatch(registry, {key: SEARCH[1]}, changes.append, interval=60.0)
+    watch._last = {key: watch._read(key)}
+    
+    watch.poll()
+    assert changes == []
+    # La clave aparece: la primera escritura también cuenta como cambio
+    registry.set_dword(*SEARCH, "CortanaConsent", 0)
+    watch.poll()
+    registry.set_dword(*SEARCH, "CortanaConsent", 1)
+    watch.poll()
+    assert changes == [{key}, {key}]
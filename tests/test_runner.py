@@ -0,0 +1,138 @@
+"""CommandRunner: timeouts aprendidos y estados del circuit breaker"""
+
+import subprocess
+import sys
+
+import pytest
+
+from core.runner import CommandRunner, CommandUnavailable
+
+
+PYTHON = sys.executable
+QUICK = [PYTHON, "-c", "pass"]
+SLOW = [PYTHON, "-c", "import time; time.sleep(5)"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_runner(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault("which", lambda executable: executable)
+    return CommandRunner(clock=clock, **kwargs), clock
+
+
+def fail(runner, kind="probe"):
+    """Falla al lanzar (cwd inexistente) sin tocar otro ejecutable"""
+    with pytest.raises(OSError):
+        runner.run(kind, QUICK, timeout=10, cwd="/nonexistent/dir")
+
+
+def test_default_timeout_until_enough_samples():
+    runner, _ = make_runner(min_samples=3, min_timeout=2.0)
+    for _ in range(2):
+        runner.run("appx.list", QUICK, timeout=10)
+    assert runner.timeout_for("appx.list", 10) == 10
+    
+    runner.run("appx.list", QUICK, timeout=10)
+    # Comandos rápidos: el aprendido queda en el mínimo
+    assert runner.timeout_for("appx.list", 10) == 2.0
+    # Nunca supera el timeout por defecto de la llamada
+    assert runner.timeout_for("appx.list", 1.5) == 1.5
+    assert runner.timeout_for("feature.query", 10) == 10
+
+
+def test_learned_timeout_cuts_a_slow_call_and_counts_as_a_sample():
+    runner, _ = make_runner(min_samples=2, min_timeout=1.0, failure_threshold=10)
+    for _ in range(2):
+        runner.run("appx.list", QUICK, timeout=30)
+    with pytest.raises(subprocess.TimeoutExpired) as error:
+        runner.run("appx.list", SLOW, timeout=30)
+    assert error.value.timeout == 1.0
+    
+    stats = runner.stats()["commands"]["appx.list"]
+    assert (stats["calls"], stats["timeouts"], stats["failures"]) == (3, 1, 1)
+    # El timeout entra como muestra: el próximo es más holgado
+    assert runner.timeout_for("appx.list", 30) == pytest.approx(3.0)
+
+
+def test_non_adaptive_calls_keep_their_fixed_timeout():
+    runner, _ = make_runner(min_samples=1, min_timeout=0.5)
+    runner.run("appx.remove", QUICK, timeout=30, adaptive=False)
+    assert runner.timeout_for("appx.remove", 30) < 1.0
+    result = runner.run("appx.remove", [PYTHON, "-c", "import time; time.sleep(1.0)"],
+                        timeout=30, adaptive=False)
+    assert result.returncode == 0
+
+
+def test_nonzero_exit_is_an_answer_not_a_failure():
+    runner, _ = make_runner(failure_threshold=1)
+    result = runner.run("feature.query", [PYTHON, "-c", "raise SystemExit(3)"], timeout=10)
+    assert result.returncode == 3
+    assert runner.stats()["executables"][PYTHON]["circuit"] == "closed"
+
+
+def test_missing_executable_is_looked_up_once():
+    lookups = []
+    
+    def which(executable):
+        lookups.append(executable)
+        return None
+    
+    runner, _ = make_runner(which=which)
+    for _ in range(3):
+        with pytest.raises(CommandUnavailable):
+            runner.run("appx.list", ["powershell", "-Command", "Get-AppxPackage"], timeout=10)
+    assert lookups == ["powershell"]
+    assert runner.stats()["executables"]["powershell"] == {"available": False}
+
+
+def test_circuit_opens_after_consecutive_failures_and_fails_fast():
+    runner, clock = make_runner(failure_threshold=3, reset_after=60)
+    fail(runner)
+    runner.run("probe", QUICK, timeout=10)
+    # Un éxito reinicia la cuenta: hacen falta tres fallos seguidos
+    fail(runner)
+    fail(runner)
+    assert runner.stats()["executables"][PYTHON]["circuit"] == "closed"
+    fail(runner)
+    
+    state = runner.stats()["executables"][PYTHON]
+    assert (state["circuit"], state["trips"]) == ("open", 1)
+    with pytest.raises(CommandUnavailable):
+        runner.run("other.kind", QUICK, timeout=10)
+    assert runner.stats()["executables"][PYTHON]["rejected"] == 1
+    
+    clock.now += 59
+    with pytest.raises(CommandUnavailable):
+        runner.run("probe", QUICK, timeout=10)
+
+
+def test_half_open_probe_closes_the_circuit_on_success():
+    runner, clock = make_runner(failure_threshold=1, reset_after=60)
+    fail(runner)
+    clock.now += 60
+    assert runner.stats()["executables"][PYTHON]["circuit"] == "half-open"
+    
+    runner.run("probe", QUICK, timeout=10)
+    state = runner.stats()["executables"][PYTHON]
+    assert (state["circuit"], state["consecutive_failures"]) == ("closed", 0)
+
+
+def test_half_open_lets_one_probe_through_and_reopens_on_failure():
+    runner, clock = make_runner(failure_threshold=1, reset_after=60)
+    fail(runner)
+    clock.now += 60
+    
+    fail(runner)
+    state = runner.stats()["executables"][PYTHON]
+    # Reabierto sin contar un nuevo disparo; el reloj vuelve a empezar
+    assert (state["circuit"], state["trips"]) == ("open", 1)
+    clock.now += 30
+    with pytest.raises(CommandUnavailable):
+        runner.run("probe", QUICK, timeout=10)
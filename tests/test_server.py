@@ -0,0 +1,210 @@
+"""ServiceServer sobre un socket Unix con MemoryRegistry"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+
+import pytest
+
+from core.detector import AIServiceDetector
+from core.manager import AIServiceManager
+from core.registry import MemoryRegistry
+from core.server import (
+    INVALID_PARAMS, METHOD_NOT_FOUND, RpcError, ServiceClient, ServiceServer, connect
+)
+
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="usa un socket Unix")
+
+AUTHKEY = b"k" * 32
+RECALL = ("HKLM", r"SOFTWARE\Policies\Microsoft\Windows\WindowsAI", "AllowRecallEnablement")
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.actions = []
+    
+    def log_backup(self, success, message):
+        self.actions.append(("backup", success))
+    
+    def log_disable(self, service_id, service_name, success, message):
+        self.actions.append(("disable", service_id))
+    
+    def log_enable(self, service_id, service_name, success, message):
+        self.actions.append(("enable", service_id))
+
+
+class BlockingDetector(AIServiceDetector):
+    """detect_all espera a `release`; cuenta las pasadas"""
+    
+    def __init__(self, registry):
+        super().__init__(registry=registry, probes=False)
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def detect_all(self, on_result=None, service_ids=None):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5.0)
+        return super().detect_all(on_result, service_ids)
+
+
+class SlowManager(AIServiceManager):
+    """Mide cuántas acciones corren a la vez, sin tocar el sistema"""
+    
+    def __init__(self, registry):
+        super().__init__(registry=registry)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+    
+    def disable_service(self, service):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        return True, "ok"
+
+
+@pytest.fixture
+def address():
+    # Rutas cortas: un socket Unix no admite más de ~100 caracteres
+    directory = tempfile.mkdtemp(prefix="srv")
+    yield os.path.join(directory, "s.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def make_server(address):
+    servers = []
+    
+    def make(registry=None, detector=None, manager=None, watch=False, **kwargs):
+        registry = registry if registry is not None else MemoryRegistry()
+        detector = detector or AIServiceDetector(registry=registry, probes=False)
+        server = ServiceServer(
+            address, detector=detector, manager=manager or AIServiceManager(registry=registry),
+            logger=RecordingLogger(), authkey=AUTHKEY, **kwargs
+        )
+        server.start(watch=watch)
+        servers.append(server)
+        return server
+    
+    yield make
+    for server in servers:
+        server.stop()
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_socket_is_private_and_a_wrong_key_is_rejected(make_server, address):
+    server = make_server()
+    assert os.stat(address).st_mode & 0o777 == 0o600
+    
+    assert connect(address, b"x" * 32) is None
+    with pytest.raises(AuthenticationError):
+        ServiceClient(address, b"x" * 32)
+    # El rechazo no corta el accept: la clave correcta sigue entrando
+    with ServiceClient(address, AUTHKEY) as client:
+        assert client.call("invalidate", service_ids=[]) == []
+    assert server.get_stats()["connections"] == 1
+
+
+def test_concurrent_detects_share_the_pass_in_flight(make_server):
+    detector = BlockingDetector(MemoryRegistry())
+    server = make_server(detector=detector)
+    results = {}
+    
+    def detect(name, service_ids):
+        results[name] = server.detect(service_ids)
+    
+    first = threading.Thread(target=detect, args=("all", None))
+    first.start()
+    assert detector.started.wait(2.0)
+    # Cubierto por la pasada completa en curso: espera en lugar de detectar
+    second = threading.Thread(target=detect, args=("copilot", ["copilot"]))
+    second.start()
+    assert wait_for(lambda: server.stats["coalesced"] == 1)
+    detector.release.set()
+    first.join()
+    second.join()
+    
+    assert detector.calls == 1
+    assert server.stats["detections"] == 1
+    assert [row["id"] for row in results["copilot"]] == ["copilot"]
+    assert len(results["all"]) == len(detector.services)
+    # Dentro del TTL sale de la caché
+    server.detect(["copilot"])
+    assert detector.calls == 1
+    assert server.stats["cache_hits"] == 1
+
+
+def test_registry_change_invalidates_the_cached_services(make_server):
+    registry = MemoryRegistry()
+    server = make_server(registry=registry, watch=True, cache_ttl=3600)
+    (recall,) = server.detect(["recall"])
+    assert recall["status"] == "enabled"
+    cached = server.get_stats()["cached"]
+    
+    registry.set_dword(*RECALL, 0)
+    assert wait_for(lambda: server.get_stats()["cached"] < cached)
+    (recall,) = server.detect(["recall"])
+    assert recall["status"] == "disabled"
+    assert server.stats["detections"] == 2
+
+
+def test_batch_keeps_order_and_reports_errors_per_request(make_server, address):
+    make_server()
+    with ServiceClient(address, AUTHKEY) as client:
+        results = client.batch([
+            ("detect", {"service_ids": ["copilot"]}),
+            ("missing.method", {}),
+            ("detect", {"service_ids": ["nope"]}),
+            ("plan", {"service_ids": ["recall"]}),
+            ("detect", {"service_ids": ["recall", "copilot"], "max_age": 0}),
+        ])
+    
+    assert [row["id"] for row in results[0]] == ["copilot"]
+    assert isinstance(results[1], RpcError) and results[1].code == METHOD_NOT_FOUND
+    assert isinstance(results[2], RpcError) and results[2].code == INVALID_PARAMS
+    assert results[3] == [{"id": "recall", "action": "disable",
+                           "current": "enabled", "desired": "disabled"}]
+    # Las filas siguen el orden del catálogo, no el del pedido
+    assert [row["id"] for row in results[4]] == ["copilot", "recall"]
+
+
+def test_concurrent_applies_never_overlap(make_server, address):
+    registry = MemoryRegistry()
+    manager = SlowManager(registry)
+    server = make_server(registry=registry, manager=manager)
+    responses = []
+    
+    def apply():
+        with ServiceClient(address, AUTHKEY) as client:
+            responses.append(client.call("apply", profile="disable-all-ai", backup=False))
+    
+    threads = [threading.Thread(target=apply) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(responses) == 3
+    assert manager.max_active == 1
+    assert manager.calls == sum(len(response["results"]) for response in responses) > 0
+    assert all(response["backup"] is None for response in responses)
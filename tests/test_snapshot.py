@@ -0,0 +1,106 @@
+"""Instantáneas de detección: merge por pasada, diff y publicación"""
+
+import threading
+
+import pytest
+
+from core.ai_services import ServiceStatus
+from core.snapshot import DetectionSnapshot, Observation, SnapshotRef
+
+
+ENABLED, DISABLED, UNKNOWN = ServiceStatus.ENABLED, ServiceStatus.DISABLED, ServiceStatus.UNKNOWN
+
+
+def observe(status, pass_id, evidence=""):
+    return Observation(status, "registry", evidence, pass_id, 0.0)
+
+
+def test_merge_creates_a_new_version_and_leaves_the_old_one_intact():
+    first = DetectionSnapshot()
+    second = first.merge({"copilot": observe(ENABLED, 1), "recall": observe(DISABLED, 1)})
+    assert (second.version, second.parent_version) == (1, 0)
+    assert second.changed == {"copilot", "recall"}
+    assert len(first) == 0
+    assert second.status("copilot") == ENABLED
+    assert second.status("missing") == UNKNOWN
+
+
+def test_older_pass_never_overwrites_a_newer_one():
+    snapshot = DetectionSnapshot().merge({"copilot": observe(DISABLED, 5)})
+    assert snapshot.merge({"copilot": observe(ENABLED, 4)}) is snapshot
+    newer = snapshot.merge({"copilot": observe(ENABLED, 6)})
+    assert newer.status("copilot") == ENABLED
+
+
+def test_merge_without_changes_returns_the_same_snapshot():
+    observation = observe(ENABLED, 1)
+    snapshot = DetectionSnapshot().merge({"copilot": observation})
+    assert snapshot.merge({"copilot": observation}) is snapshot
+    assert snapshot.merge({}) is snapshot
+
+
+def test_same_status_from_a_newer_pass_is_not_a_change():
+    snapshot = DetectionSnapshot().merge({"copilot": observe(ENABLED, 1, "a")})
+    same = snapshot.merge({"copilot": observe(ENABLED, 2, "a")})
+    # Nueva versión (la observación es más reciente) sin servicios cambiados
+    assert same.version == snapshot.version + 1
+    assert same.changed == frozenset()
+    other_evidence = snapshot.merge({"copilot": observe(ENABLED, 2, "b")})
+    assert other_evidence.changed == {"copilot"}
+
+
+def test_diff_against_parent_and_against_any_older_version():
+    v1 = DetectionSnapshot().merge({"copilot": observe(ENABLED, 1), "recall": observe(ENABLED, 1)})
+    v2 = v1.merge({"copilot": observe(DISABLED, 2)})
+    v3 = v2.merge({"recall": observe(DISABLED, 3), "cortana": observe(ENABLED, 3)})
+    
+    assert v2.diff(v1) == {"copilot": (ENABLED, DISABLED)}
+    assert v3.diff(v2) == {"recall": (ENABLED, DISABLED), "cortana": (UNKNOWN, ENABLED)}
+    # No es el padre: se comparan todos los servicios
+    assert v3.diff(v1) == {
+        "copilot": (ENABLED, DISABLED),
+        "recall": (ENABLED, DISABLED),
+        "cortana": (UNKNOWN, ENABLED),
+    }
+    assert v3.diff(v3) == {}
+    assert v1.diff(v3) == {
+        "copilot": (DISABLED, ENABLED),
+        "recall": (DISABLED, ENABLED),
+        "cortana": (ENABLED, UNKNOWN),
+    }
+
+
+def test_snapshot_is_immutable():
+    snapshot = DetectionSnapshot().merge({"copilot": observe(ENABLED, 1)})
+    with pytest.raises(AttributeError):
+        snapshot.version = 7
+    with pytest.raises(TypeError):
+        snapshot.observations["copilot"] = observe(DISABLED, 2)
+
+
+def test_to_dict_is_serializable():
+    snapshot = DetectionSnapshot(timestamp=12.5).merge({"copilot": observe(DISABLED, 3, "x=1")})
+    data = snapshot.to_dict()
+    assert data["version"] == 1
+    assert data["services"]["copilot"] == {
+        "status": "disabled", "source": "registry", "evidence": "x=1",
+        "pass_id": 3, "observed_at": 0.0,
+    }
+
+
+def test_concurrent_publishes_keep_the_newest_pass_per_service():
+    ref = SnapshotRef()
+    passes = [ref.new_pass() for _ in range(50)]
+    assert passes == sorted(set(passes))
+    
+    def publish(pass_id):
+        status = DISABLED if pass_id == passes[-1] else ENABLED
+        ref.publish({"copilot": observe(status, pass_id)})
+    
+    threads = [threading.Thread(target=publish, args=(pass_id,)) for pass_id in reversed(passes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert ref.current.get("copilot").pass_id == passes[-1]
+    assert ref.current.status("copilot") == DISABLED
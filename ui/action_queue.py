@@ -0,0 +1,154 @@
+"""
+Queue of service actions executed on a worker pool
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import sys
+sys.path.append('..')
+from core.ai_services import AIService, get_service_artifacts
+from core.detector import AIServiceDetector
+from core.manager import AIServiceManager
+
+
+PENDING = "pending"
+RUNNING = "running"
+IDLE = ""
+
+
+@dataclass
+class ActionJob:
+    """A queued enable/disable of one service"""
+    action: str
+    service: AIService
+    artifacts: frozenset
+
+
+class _ActionSignals(QObject):
+    finished = pyqtSignal(object, bool, str)  # job, success, message
+
+
+class _ActionRunnable(QRunnable):
+    """Runs a single job on the pool and reports back through signals
+    
+    After a successful action the service is re-detected here, on the
+    pool thread, so the GUI thread only reads the published status.
+    """
+    
+    def __init__(self, job: ActionJob, manager: AIServiceManager,
+                 detector: Optional[AIServiceDetector], signals: _ActionSignals):
+        super().__init__()
+        self.job = job
+        self.manager = manager
+        self.detector = detector
+        self.signals = signals
+    
+    def run(self):
+        try:
+            if self.job.action == "disable":
+                success, message = self.manager.disable_service(self.job.service)
+            else:
+                success, message = self.manager.enable_service(self.job.service)
+            if success and self.detector is not None:
+                self.detector.refresh_service(self.job.service.id)
+        except Exception as e:
+            success, message = False, str(e)
+        self.signals.finished.emit(self.job, success, message)
+
+
+class ActionQueue(QObject):
+    """Schedules service actions with per-service coalescing
+    
+    - Actions on services with disjoint artifacts run concurrently.
+    - Actions that share an artifact (same registry value, Appx package or
+      any Windows Feature) run in submission order.
+    - Clicking again while a service's action is still pending replaces it;
+      repeating the action that is already running is ignored.
+    
+    All methods must be called from the GUI thread.
+    """
+    
+    state_changed = pyqtSignal(str, str)                # service_id, PENDING/RUNNING/IDLE
+    action_finished = pyqtSignal(object, str, bool, str)  # service, action, success, message
+    idle = pyqtSignal()
+    
+    def __init__(self, manager: AIServiceManager, detector: Optional[AIServiceDetector] = None,
+                 max_workers: int = 4, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.detector = detector
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._signals = _ActionSignals(self)
+        self._signals.finished.connect(self._on_job_finished)
+        self._pending: List[ActionJob] = []
+        self._running: Dict[str, ActionJob] = {}
+    
+    def submit(self, action: str, service: AIService) -> bool:
+        """Queue an action; returns False if it was coalesced away"""
+        pending = self._pending_job(service.id)
+        if pending is not None:
+            if pending.action == action:
+                return False
+            pending.action = action
+            return True
+        
+        running = self._running.get(service.id)
+        if running is not None and running.action == action:
+            return False
+        
+        self._pending.append(ActionJob(action, service, get_service_artifacts(service)))
+        self.state_changed.emit(service.id, PENDING)
+        self._dispatch()
+        return True
+    
+    def state(self, service_id: str) -> str:
+        """Current state of a service in the queue"""
+        if service_id in self._running:
+            return RUNNING
+        if self._pending_job(service_id) is not None:
+            return PENDING
+        return IDLE
+    
+    def is_busy(self) -> bool:
+        return bool(self._pending or self._running)
+    
+    def wait(self, msecs: int = -1) -> bool:
+        """Drop pending jobs and block until running ones finish
+        
+        Called from MainWindow.closeEvent.
+        """
+        self._pending.clear()
+        return self._pool.waitForDone(msecs)
+    
+    def _pending_job(self, service_id: str) -> Optional[ActionJob]:
+        return next((job for job in self._pending if job.service.id == service_id), None)
+    
+    def _dispatch(self):
+        """Start every pending job that conflicts with nothing ahead of it"""
+        blocked = set()
+        for job in self._running.values():
+            blocked |= job.artifacts
+        
+        for job in list(self._pending):
+            if job.artifacts & blocked:
+                # Later jobs touching the same artifacts must wait for this one
+                blocked |= job.artifacts
+                continue
+            blocked |= job.artifacts
+            self._pending.remove(job)
+            self._running[job.service.id] = job
+            self.state_changed.emit(job.service.id, RUNNING)
+            self._pool.start(_ActionRunnable(job, self.manager, self.detector, self._signals))
+    
+    def _on_job_finished(self, job: ActionJob, success: bool, message: str):
+        self._running.pop(job.service.id, None)
+        self._dispatch()
+        
+        self.state_changed.emit(job.service.id, self.state(job.service.id))
+        self.action_finished.emit(job.service, job.action, success, message)
+        if not self.is_busy():
+            self.idle.emit()
@@ -21,6 +21,7 @@ class LanguageSelector(QComboBox):
     
     def _setup_ui(self):
         """Configura el selector"""
+        self.setObjectName("languageSelector")
         self.setFixedWidth(120)
         
         # Agregar idiomas
@@ -34,36 +35,6 @@ class LanguageSelector(QComboBox):
                 self.setCurrentIndex(i)
                 break
         
-        self.setStyleSheet("""
-            QComboBox {
-                background-color: #16213e;
-                color: #eaeaea;
-                border: 1px solid #0f3460;
-                border-radius: 4px;
-                padding: 5px 10px;
-                font-size: 12px;
-            }
-            QComboBox:hover {
-                border-color: #00d4ff;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 5px solid #00d4ff;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #16213e;
-                color: #eaeaea;
-                selection-background-color: #0f3460;
-                border: 1px solid #0f3460;
-            }
-        """)
     
     def _on_language_changed(self, index):
         """Maneja cambio de idioma"""
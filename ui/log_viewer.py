@@ -4,78 +4,507 @@ Widget to display activity log
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QScrollArea, QFrame, QPushButton
+    QPushButton, QListView, QStyledItemDelegate, QStyle,
+    QComboBox, QLineEdit
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QRectF, QSize, QObject, QTimer,
+    QFileSystemWatcher, QRunnable, QThreadPool, pyqtSignal
+)
+from PyQt6.QtGui import QColor, QPainter, QFont, QFontMetrics
+from datetime import datetime, timedelta
 import sys
 sys.path.append('..')
-from core.logger import activity_logger, LogEntry
+from core.logger import activity_logger, LogEntry, LogLevel
+from core.log_segments import LogFollower
+from core.log_store import search_terms, matches_terms
 from core.i18n import t
+from .styles import (
+    SURFACE, BORDER, ACCENT, TEXT, TEXT_SECONDARY, TEXT_MUTED, TEXT_FAINT,
+    DANGER, SUCCESS, WARNING
+)
+
+
+LEVEL_ICONS = {
+    "success": "✅",
+    "error": "❌",
+    "warning": "⚠️",
+    "info": "ℹ️"
+}
+
+ACTION_COLORS = {
+    "DISABLE": DANGER,
+    "ENABLE": SUCCESS,
+    "BACKUP": ACCENT,
+    "RESTORE": WARNING,
+    "DETECTION": TEXT_MUTED
+}
+
+# Date range presets: translation key -> days back (None = no limit)
+DATE_RANGES = [
+    ("range_all", None),
+    ("range_today", 0),
+    ("range_week", 7),
+    ("range_month", 30),
+]
+
+
+class _QuerySignals(QObject):
+    finished = pyqtSignal(int, object)  # request id, result
+    failed = pyqtSignal(int, str)  # request id, error message
+
+
+class _LogQueryRunnable(QRunnable):
+    """Runs one log index query on the pool
+    
+    A query first waits for the log writer and indexes new segments,
+    which must never block the GUI thread.
+    """
+    
+    def __init__(self, request_id: int, query, signals: _QuerySignals):
+        super().__init__()
+        self.request_id = request_id
+        self.query = query
+        self.signals = signals
+    
+    def run(self):
+        try:
+            result = self.query()
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e))
+            return
+        self.signals.finished.emit(self.request_id, result)
 
 
-class LogEntryWidget(QFrame):
-    """Widget to display individual log entry"""
+class LogListModel(QAbstractListModel):
+    """List model over the activity log, newest entries first
     
-    def __init__(self, entry: LogEntry, parent=None):
+    Rows are fetched from the log index one page at a time as the view
+    scrolls; new entries are inserted at the top as they are logged.
+    Pages are queried on a worker thread and inserted when they arrive;
+    a page requested before the filters changed is discarded. A failed
+    query stops paging and is kept in `error()` until the next reload.
+    """
+    
+    EntryRole = Qt.ItemDataRole.UserRole + 1
+    PAGE_SIZE = 200
+    
+    # Emitted from any thread, handled on the GUI thread
+    entry_logged = pyqtSignal(object)
+    # A requested page arrived (possibly empty)
+    page_loaded = pyqtSignal()
+    query_failed = pyqtSignal(str)
+    services_loaded = pyqtSignal(dict)  # {service_id: service_name}
+    
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self._setup_ui(entry)
+        self._entries = []
+        self._cursor = None
+        self._exhausted = True
+        self._loading = False
+        self._error = None
+        self._request = 0
+        self._filters = {}
+        self._terms = []
+        # One worker: queries share the index connection anyway
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._page_signals = _QuerySignals(self)
+        self._page_signals.finished.connect(self._on_page_loaded)
+        self._page_signals.failed.connect(self._on_page_failed)
+        self._services_signals = _QuerySignals(self)
+        self._services_signals.finished.connect(self._on_services_loaded)
+        self.entry_logged.connect(self._prepend_entry)
+        self._listener = self.entry_logged.emit
+        self._attached = False
+        self.attach()
     
-    def _setup_ui(self, entry: LogEntry):
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(10, 5, 10, 5)
-        layout.setSpacing(10)
+    def attach(self):
+        """Receive new entries directly from this process's logger"""
+        if not self._attached:
+            activity_logger.add_listener(self._listener)
+            self._attached = True
+    
+    def detach(self):
+        """Stop receiving new entries from the logger"""
+        if self._attached:
+            activity_logger.remove_listener(self._listener)
+            self._attached = False
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == self.EntryRole:
+            return entry
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.message
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{entry.timestamp}  {entry.service_name}\n{entry.message}"
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """Request the next page; rows are inserted when it arrives"""
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        self._loading = True
+        cursor, filters = self._cursor, dict(self._filters)
+        self._pool.start(_LogQueryRunnable(
+            self._request,
+            lambda: activity_logger.query(limit=self.PAGE_SIZE, cursor=cursor, **filters),
+            self._page_signals
+        ))
+    
+    def is_loading(self) -> bool:
+        return self._loading
+    
+    def error(self):
+        """Message of the last failed page query, or None"""
+        return self._error
+    
+    def _on_page_failed(self, request_id: int, message: str):
+        if request_id != self._request:
+            return
+        self._loading = False
+        self._exhausted = True
+        self._error = message
+        self.query_failed.emit(message)
+        self.page_loaded.emit()
+    
+    def _on_page_loaded(self, request_id: int, page):
+        if request_id != self._request:
+            # Requested before a reload
+            return
+        self._loading = False
+        first_page = self._cursor is None
+        self._cursor = page.next_cursor
+        self._exhausted = page.next_cursor is None
+        entries = page.entries
+        if first_page and self._entries:
+            # Entries logged while the first page was loading are already shown
+            entries = [entry for entry in entries if entry not in self._entries]
+        if entries:
+            first = len(self._entries)
+            self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+            self._entries.extend(entries)
+            self.endInsertRows()
+        self.page_loaded.emit()
+    
+    def load_services(self):
+        """Query the services present in the log; emits services_loaded"""
+        self._pool.start(_LogQueryRunnable(
+            0, activity_logger.get_logged_services, self._services_signals
+        ))
+    
+    def _on_services_loaded(self, request_id: int, services):
+        if services is not None:
+            self.services_loaded.emit(services)
+    
+    def reload(self):
+        """Drop loaded rows and request the newest page again"""
+        self.beginResetModel()
+        self._request += 1
+        self._entries = []
+        self._cursor = None
+        self._exhausted = False
+        self._loading = False
+        self._error = None
+        self.endResetModel()
+        self.fetchMore()
+    
+    def set_filters(self, filters: dict):
+        """Apply filters (level, action, service_id, text, start) and reload"""
+        self._filters = {key: value for key, value in filters.items() if value}
+        self._terms = search_terms(self._filters.get("text"))
+        self.reload()
+    
+    def _matches(self, entry: LogEntry) -> bool:
+        """Check a single new entry against the active filters"""
+        f = self._filters
+        if f.get("level") and entry.level != f["level"]:
+            return False
+        if f.get("action") and entry.action != f["action"]:
+            return False
+        if f.get("service_id") and entry.service_id != f["service_id"]:
+            return False
+        if f.get("start") and entry.timestamp < f["start"]:
+            return False
+        # Same word-prefix terms as the index query, so a live entry and
+        # the same entry loaded from the index are shown alike
+        return matches_terms(self._terms, entry.message, entry.service_name)
+    
+    def _prepend_entry(self, entry: LogEntry):
+        if not self._matches(entry):
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._entries.insert(0, entry)
+        self.endInsertRows()
+    
+    def prepend_records(self, records: list):
+        """Insert raw log records (oldest first) at the top in one batch"""
+        entries = []
+        for record in reversed(records):
+            try:
+                entry = LogEntry(**record)
+            except TypeError:
+                continue
+            if self._matches(entry):
+                entries.append(entry)
+        if not entries:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(entries) - 1)
+        self._entries[0:0] = entries
+        self.endInsertRows()
+
+
+class LogTailWatcher(QObject):
+    """Follows the active log segment and emits newly appended records
+    
+    File change notifications trigger a read; a polling timer covers
+    file systems where notifications are unreliable. Reads are debounced
+    so a burst of writes results in a single batch.
+    """
+    
+    POLL_INTERVAL_MS = 2000
+    DEBOUNCE_MS = 250
+    
+    records_appended = pyqtSignal(list)
+    
+    def __init__(self, log_dir: str, parent=None):
+        super().__init__(parent)
+        self.log_dir = log_dir
+        self._follower = None
         
-        # Icon based on level
-        icon_map = {
-            "success": "✅",
-            "error": "❌",
-            "warning": "⚠️",
-            "info": "ℹ️"
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule_read)
+        self._watcher.directoryChanged.connect(self._schedule_read)
+        
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._read)
+        
+        self._poll = QTimer(self)
+        self._poll.setInterval(self.POLL_INTERVAL_MS)
+        self._poll.timeout.connect(self._schedule_read)
+    
+    def start(self):
+        """Start following from the current end of the active segment"""
+        self._follower = LogFollower(self.log_dir, from_end=True)
+        if self.log_dir not in self._watcher.directories():
+            self._watcher.addPath(self.log_dir)
+        self._watch_active()
+        self._poll.start()
+    
+    def stop(self):
+        self._poll.stop()
+        self._debounce.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._follower = None
+    
+    def _watch_active(self):
+        # Rotation replaces the file, which drops it from the watcher
+        path = self._follower.active_path
+        if path not in self._watcher.files():
+            self._watcher.addPath(path)
+    
+    def _schedule_read(self, *args):
+        if self._follower is not None and not self._debounce.isActive():
+            self._debounce.start()
+    
+    def _read(self):
+        if self._follower is None:
+            return
+        records = self._follower.poll()
+        self._watch_active()
+        if records:
+            self.records_appended.emit(records)
+
+
+class LogEntryDelegate(QStyledItemDelegate):
+    """Paints a log row (icon, time, action, service, message) directly,
+    without creating widgets per entry"""
+    
+    ROW_HEIGHT = 30
+    MARGIN = 2
+    
+    BACKGROUND = QColor(SURFACE)
+    BACKGROUND_SELECTED = QColor(BORDER)
+    TIME_COLOR = QColor(TEXT_FAINT)
+    SERVICE_COLOR = QColor(TEXT_SECONDARY)
+    MESSAGE_COLOR = QColor(TEXT)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._small_font = QFont("Segoe UI")
+        self._small_font.setPixelSize(11)
+        self._bold_font = QFont(self._small_font)
+        self._bold_font.setBold(True)
+        self._text_font = QFont("Segoe UI")
+        self._text_font.setPixelSize(12)
+        self._text_metrics = QFontMetrics(self._text_font)
+        self._action_colors = {
+            action: QColor(color) for action, color in ACTION_COLORS.items()
         }
-        icon = icon_map.get(entry.level, "•")
+        self._default_action_color = QColor(TEXT_MUTED)
+    
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+    
+    def paint(self, painter: QPainter, option, index):
+        entry = index.data(LogListModel.EntryRole)
+        if entry is None:
+            return
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        rect = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        selected = option.state & QStyle.StateFlag.State_Selected
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.BACKGROUND_SELECTED if selected else self.BACKGROUND)
+        painter.drawRoundedRect(QRectF(rect), 4, 4)
         
-        icon_label = QLabel(icon)
-        icon_label.setFixedWidth(25)
-        layout.addWidget(icon_label)
+        x = rect.left() + 10
+        top = rect.top()
+        height = rect.height()
+        align = Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+        
+        # Icon based on level
+        painter.setFont(self._text_font)
+        painter.setPen(self.MESSAGE_COLOR)
+        painter.drawText(x, top, 25, height, align, LEVEL_ICONS.get(entry.level, "•"))
+        x += 35
         
         # Timestamp
-        time_label = QLabel(entry.timestamp.split(" ")[1] if " " in entry.timestamp else entry.timestamp)
-        time_label.setStyleSheet("color: #666; font-size: 11px;")
-        time_label.setFixedWidth(70)
-        layout.addWidget(time_label)
+        time_text = entry.timestamp.split(" ")[1] if " " in entry.timestamp else entry.timestamp
+        painter.setFont(self._small_font)
+        painter.setPen(self.TIME_COLOR)
+        painter.drawText(x, top, 70, height, align, time_text)
+        x += 80
         
         # Action
-        action_colors = {
-            "DISABLE": "#e94560",
-            "ENABLE": "#4ade80",
-            "BACKUP": "#00d4ff",
-            "RESTORE": "#fbbf24",
-            "DETECTION": "#888"
-        }
-        action_label = QLabel(entry.action)
-        action_label.setStyleSheet(f"color: {action_colors.get(entry.action, '#888')}; font-weight: bold; font-size: 11px;")
-        action_label.setFixedWidth(80)
-        layout.addWidget(action_label)
+        painter.setFont(self._bold_font)
+        painter.setPen(self._action_colors.get(entry.action, self._default_action_color))
+        painter.drawText(x, top, 80, height, align, entry.action)
+        x += 90
         
         # Service
-        service_label = QLabel(entry.service_name)
-        service_label.setStyleSheet("color: #aaa; font-size: 12px;")
-        service_label.setFixedWidth(150)
-        layout.addWidget(service_label)
+        painter.setFont(self._text_font)
+        painter.setPen(self.SERVICE_COLOR)
+        service = self._text_metrics.elidedText(entry.service_name, Qt.TextElideMode.ElideRight, 150)
+        painter.drawText(x, top, 150, height, align, service)
+        x += 160
         
         # Message
-        message_label = QLabel(entry.message)
-        message_label.setStyleSheet("color: #eaeaea; font-size: 12px;")
-        message_label.setWordWrap(True)
-        layout.addWidget(message_label, 1)
+        width = max(0, rect.right() - 10 - x)
+        painter.setPen(self.MESSAGE_COLOR)
+        message = self._text_metrics.elidedText(entry.message, Qt.TextElideMode.ElideRight, width)
+        painter.drawText(x, top, width, height, align, message)
         
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #16213e;
-                border-radius: 4px;
-                margin: 2px 0;
-            }
-        """)
+        painter.restore()
+
+
+class LogFilterBar(QWidget):
+    """Level / action / service / date range / text filters for the log"""
+    
+    SEARCH_DEBOUNCE_MS = 300
+    
+    filters_changed = pyqtSignal(dict)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(t("search_placeholder"))
+        self.search_edit.setClearButtonEnabled(True)
+        layout.addWidget(self.search_edit, 1)
+        
+        self.level_combo = QComboBox()
+        self.level_combo.addItem(t("filter_all_levels"), None)
+        for level in LogLevel:
+            self.level_combo.addItem(f"{LEVEL_ICONS.get(level.value, '•')} {level.value}", level.value)
+        layout.addWidget(self.level_combo)
+        
+        self.action_combo = QComboBox()
+        self.action_combo.addItem(t("filter_all_actions"), None)
+        for action in ACTION_COLORS:
+            self.action_combo.addItem(action, action)
+        layout.addWidget(self.action_combo)
+        
+        self.service_combo = QComboBox()
+        self.service_combo.addItem(t("filter_all_services"), None)
+        layout.addWidget(self.service_combo)
+        
+        self.range_combo = QComboBox()
+        for key, days in DATE_RANGES:
+            self.range_combo.addItem(t(key), days)
+        layout.addWidget(self.range_combo)
+        
+        # Typing is debounced so each keystroke doesn't run a query
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._emit_filters)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        
+        for combo in (self.level_combo, self.action_combo,
+                      self.service_combo, self.range_combo):
+            combo.currentIndexChanged.connect(self._emit_filters)
+    
+    def filters(self) -> dict:
+        """Current filters as keyword arguments for ActivityLogger.query"""
+        days = self.range_combo.currentData()
+        start = None
+        if days is not None:
+            start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return {
+            "level": self.level_combo.currentData(),
+            "action": self.action_combo.currentData(),
+            "service_id": self.service_combo.currentData(),
+            "text": self.search_edit.text().strip() or None,
+            "start": start,
+        }
+    
+    def set_services(self, services: dict):
+        """Fill the service filter ({service_id: service_name}), keeping the selection"""
+        current = self.service_combo.currentData()
+        self.service_combo.blockSignals(True)
+        while self.service_combo.count() > 1:
+            self.service_combo.removeItem(1)
+        for service_id, name in sorted(services.items(), key=lambda item: item[1]):
+            self.service_combo.addItem(name, service_id)
+        index = self.service_combo.findData(current)
+        self.service_combo.setCurrentIndex(max(index, 0))
+        self.service_combo.blockSignals(False)
+    
+    def update_translations(self):
+        self.search_edit.setPlaceholderText(t("search_placeholder"))
+        self.level_combo.setItemText(0, t("filter_all_levels"))
+        self.action_combo.setItemText(0, t("filter_all_actions"))
+        self.service_combo.setItemText(0, t("filter_all_services"))
+        for i, (key, _) in enumerate(DATE_RANGES):
+            self.range_combo.setItemText(i, t(key))
+    
+    def _emit_filters(self, *args):
+        self._search_timer.stop()
+        self.filters_changed.emit(self.filters())
 
 
 class LogViewerWidget(QWidget):
@@ -84,7 +513,7 @@ class LogViewerWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._setup_ui()
-        self.refresh()
+        self.set_follow(self.follow_btn.isChecked())
     
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -95,70 +524,96 @@ class LogViewerWidget(QWidget):
         header = QHBoxLayout()
         
         self.title_label = QLabel(t("activity_log"))
-        self.title_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #00d4ff;")
+        self.title_label.setObjectName("logTitle")
         header.addWidget(self.title_label)
         
         header.addStretch()
         
+        self.follow_btn = QPushButton("📡")
+        self.follow_btn.setCheckable(True)
+        self.follow_btn.setChecked(True)
+        self.follow_btn.setFixedSize(30, 30)
+        self.follow_btn.setToolTip(t("follow_log"))
+        self.follow_btn.toggled.connect(self.set_follow)
+        self.follow_btn.setObjectName("logToolButton")
+        header.addWidget(self.follow_btn)
+        
         refresh_btn = QPushButton("🔄")
         refresh_btn.setFixedSize(30, 30)
         refresh_btn.clicked.connect(self.refresh)
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #16213e;
-                border: 1px solid #0f3460;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #0f3460;
-            }
-        """)
+        refresh_btn.setObjectName("logToolButton")
         header.addWidget(refresh_btn)
         
         layout.addLayout(header)
         
-        # Scroll area for entries
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                background-color: #1a1a2e;
-                border: 1px solid #0f3460;
-                border-radius: 8px;
-            }
-        """)
-        
-        self.entries_container = QWidget()
-        self.entries_layout = QVBoxLayout(self.entries_container)
-        self.entries_layout.setContentsMargins(5, 5, 5, 5)
-        self.entries_layout.setSpacing(3)
-        self.entries_layout.addStretch()
-        
-        scroll_area.setWidget(self.entries_container)
-        layout.addWidget(scroll_area)
+        self.filter_bar = LogFilterBar()
+        layout.addWidget(self.filter_bar)
+        
+        self.empty_label = QLabel(t("no_activity"))
+        self.empty_label.setObjectName("logEmpty")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.empty_label)
+        
+        # Virtualized list: only visible rows are painted
+        self.model = LogListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(LogEntryDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setObjectName("logList")
+        layout.addWidget(self.list_view, 1)
+        
+        self.model.rowsInserted.connect(self._update_empty_state)
+        self.model.modelReset.connect(self._update_empty_state)
+        self.model.page_loaded.connect(self._update_empty_state)
+        self.model.services_loaded.connect(self.filter_bar.set_services)
+        
+        # Follow mode: new rows come from the log files, including entries
+        # written by other processes
+        self.tail_watcher = LogTailWatcher(activity_logger.log_dir, self)
+        self.tail_watcher.records_appended.connect(self.model.prepend_records)
+        
+        self.filter_bar.filters_changed.connect(self._on_filters_changed)
+    
+    def set_follow(self, enabled: bool):
+        """Switch between following the log files and in-process updates"""
+        if enabled:
+            self.model.detach()
+            self.refresh()
+            self.tail_watcher.start()
+        else:
+            self.tail_watcher.stop()
+            self.model.attach()
+            self.refresh()
     
     def update_translations(self):
         """Update texts when language changes"""
         self.title_label.setText(t("activity_log"))
+        self._update_empty_state()
+        self.follow_btn.setToolTip(t("follow_log"))
+        self.filter_bar.update_translations()
     
     def refresh(self):
-        """Refresh log entries"""
-        # Clear previous entries
-        while self.entries_layout.count() > 1:
-            item = self.entries_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # Get entries
-        entries = activity_logger.get_entries(limit=50)
+        """Reload log entries from the log index
         
-        if not entries:
-            empty_label = QLabel(t("no_activity"))
-            empty_label.setStyleSheet("color: #666; font-style: italic; padding: 20px;")
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.entries_layout.insertWidget(0, empty_label)
-        else:
-            for entry in entries:
-                widget = LogEntryWidget(entry)
-                self.entries_layout.insertWidget(self.entries_layout.count() - 1, widget)
+        New entries are added automatically, so this is only needed to
+        pick up external changes when follow mode is off. The queries run
+        on the model's worker; rows and services arrive asynchronously.
+        """
+        self.model.load_services()
+        self.model.set_filters(self.filter_bar.filters())
+        self._update_empty_state()
+    
+    def _on_filters_changed(self, filters: dict):
+        self.model.set_filters(filters)
+        self._update_empty_state()
+    
+    def _update_empty_state(self, *args):
+        # While the first page loads the list is empty but not "no activity"
+        error = self.model.error()
+        self.empty_label.setText(t("log_query_error", error=error) if error else t("no_activity"))
+        self.empty_label.setVisible(
+            (bool(error) or self.model.rowCount() == 0) and not self.model.is_loading()
+        )
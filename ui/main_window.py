@@ -5,66 +5,164 @@ Main application window
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QScrollArea, QFrame,
-    QMessageBox, QProgressBar, QApplication, QSplitter
+    QMessageBox, QProgressBar, QApplication, QSplitter, QListView
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon
 
 import sys
 import os
+import time
 sys.path.append('..')
 
-from .styles import DARK_THEME
-from .service_card import ServiceCard
-from .log_viewer import LogViewerWidget
+from .styles import apply_theme
+from .service_card import ServiceCard, ServiceListModel, ServiceCardDelegate
 from .language_selector import LanguageSelector
+from .action_queue import ActionQueue
 from core.detector import AIServiceDetector
 from core.manager import AIServiceManager
 from core.ai_services import AIService, ServiceStatus
 from core.logger import activity_logger
 from core.i18n import I18n, t
+from core.startup_profile import startup_profile
+from core.registry_watch import RegistryWatcher
 
 
 class DetectionWorker(QThread):
-    """Worker thread to detect services without blocking UI"""
-    finished = pyqtSignal(list)
+    """Worker thread to detect services without blocking UI
     
-    def __init__(self, detector: AIServiceDetector):
-        super().__init__()
+    `baseline` is the snapshot published before the pass started; the
+    window diffs against it to log only what changed. `detected` carries
+    the results; QThread.finished still means the thread has stopped.
+    """
+    service_detected = pyqtSignal(object, int, int)  # service, done, total
+    detected = pyqtSignal(list)
+    
+    def __init__(self, detector: AIServiceDetector, service_ids=None, parent=None):
+        super().__init__(parent)
         self.detector = detector
+        self.service_ids = service_ids
+        self.baseline = detector.snapshot
     
     def run(self):
-        services = self.detector.detect_all()
-        self.finished.emit(services)
+        rows = self._detect_remote()
+        if rows is not None:
+            # Published as one snapshot, so cards never see a half-applied pass
+            self.detector.publish(
+                {row["id"]: ServiceStatus(row["status"]) for row in rows}, source="server"
+            )
+            services = []
+            for done, row in enumerate(rows, start=1):
+                service = self.detector.get_service(row["id"])
+                services.append(service)
+                self.service_detected.emit(service, done, len(rows))
+            self.detected.emit(services)
+            return
+        
+        services = self.detector.detect_all(
+            on_result=self.service_detected.emit, service_ids=self.service_ids
+        )
+        if self.service_ids is not None:
+            services = [s for s in services if s.id in self.service_ids]
+        self.detected.emit(services)
+    
+    def _detect_remote(self):
+        """Statuses from a running `python -m core serve`, or None to detect locally"""
+        # Imported here so the socket machinery stays off the startup path
+        from core.server import connect, RpcError
+        client = connect()
+        if client is None:
+            return None
+        partial = self.service_ids is not None
+        try:
+            with client:
+                # A partial pass follows a registry change: skip the server's cache
+                return client.call(
+                    "detect",
+                    service_ids=sorted(self.service_ids) if partial else None,
+                    max_age=0 if partial else None
+                )
+        except (RpcError, OSError, EOFError):
+            return None
 
 
-class ActionWorker(QThread):
-    """Worker thread to execute actions without blocking UI"""
-    finished = pyqtSignal(bool, str)
+class BackupWorker(QThread):
+    """Worker thread to create or restore a backup without blocking UI
     
-    def __init__(self, action: str, manager: AIServiceManager, service: AIService):
-        super().__init__()
-        self.action = action
+    A backup captures the system once: the same capture is written to
+    the backup file and published as the current detection, so a "disable
+    all" that follows works from exactly what was backed up.
+    `job_finished` carries the result; QThread.finished still means the
+    thread has stopped.
+    """
+    progress = pyqtSignal(int, int)    # done, total
+    job_finished = pyqtSignal(bool, str, list)  # success, message, re-detected services
+    
+    def __init__(self, job: str, manager: AIServiceManager, detector: AIServiceDetector,
+                 backup_path: str = None, parent=None):
+        super().__init__(parent)
+        self.job = job
         self.manager = manager
-        self.service = service
+        self.detector = detector
+        self.backup_path = backup_path
     
     def run(self):
-        if self.action == "disable":
-            success, message = self.manager.disable_service(self.service)
-        else:
-            success, message = self.manager.enable_service(self.service)
-        self.finished.emit(success, message)
+        if self.job == "backup":
+            state = self.detector.capture_state(
+                progress=self.progress.emit, cancelled=self.isInterruptionRequested
+            )
+            if state is None:
+                self.job_finished.emit(False, "Backup cancelado", [])
+                return
+            detected = self.detector.detect_from_state(state)
+            success, message = self.manager.create_backup(
+                list(self.detector.services), cancelled=self.isInterruptionRequested, state=state
+            )
+            self.job_finished.emit(success, message, detected)
+            return
+        
+        changed = set()
+        success, message = self.manager.restore_backup(
+            self.backup_path, self.progress.emit, self.isInterruptionRequested, changed
+        )
+        # Only services whose values were actually rewritten need re-detection
+        refreshed = [self.detector.refresh_service(service_id) for service_id in changed]
+        self.job_finished.emit(success, message, [s for s in refreshed if s])
 
 
 class MainWindow(QMainWindow):
-    """Main window of Windows AI Removal Tool"""
+    """Main window of Windows AI Removal Tool
+    
+    Only the skeleton is built before the first paint; the log viewer and
+    detection start right after it (see `_finish_startup`).
+    """
+    
+    startup_finished = pyqtSignal()
+    registry_changed = pyqtSignal(object)  # set of service ids, from the watcher thread
+    
+    # Above this many services, cards are painted by a delegate in a
+    # QListView instead of being individual widgets
+    VIRTUALIZE_THRESHOLD = 100
     
     def __init__(self):
         super().__init__()
         self.detector = AIServiceDetector()
         self.manager = AIServiceManager()
         self.service_cards = {}
-        self.current_worker = None
+        self.action_queue = ActionQueue(self.manager, self.detector, parent=self)
+        self.action_queue.state_changed.connect(self._set_service_busy)
+        self.action_queue.action_finished.connect(self._on_action_finished)
+        self.action_queue.idle.connect(self._on_actions_idle)
+        self.detection_worker = None
+        self.backup_worker = None
+        self.log_viewer = None
+        self.registry_watcher = None
+        self._disable_all_pending = set()
+        self._disable_all_total = 0
+        self._disable_all_success = 0
+        self._changed_services = set()
+        self._refresh_requested = False
+        self._startup_scheduled = False
         
         # Detect system language
         I18n.set_language(I18n.get_system_language())
@@ -72,7 +170,6 @@ class MainWindow(QMainWindow):
         self._setup_window()
         self._setup_ui()
         self._apply_styles()
-        self._start_detection()
         
         # Listen for language changes
         I18n.add_listener(self._on_language_changed)
@@ -105,7 +202,7 @@ class MainWindow(QMainWindow):
         top_bar.addStretch()
         
         lang_label = QLabel("🌍")
-        lang_label.setStyleSheet("font-size: 16px;")
+        lang_label.setObjectName("languageIcon")
         top_bar.addWidget(lang_label)
         
         self.language_selector = LanguageSelector()
@@ -130,7 +227,16 @@ class MainWindow(QMainWindow):
         self.progress_bar.setRange(0, 0)  # Indeterminate
         self.progress_bar.setVisible(False)
         self.progress_bar.setFixedHeight(20)
-        main_layout.addWidget(self.progress_bar)
+        
+        # Cancel button for backup/restore jobs (hidden initially)
+        self.cancel_btn = QPushButton(t("cancel"))
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self._cancel_backup_job)
+        
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_btn)
+        main_layout.addLayout(progress_layout)
         
         # Status label
         self.status_label = QLabel(t("detecting_services"))
@@ -138,7 +244,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.status_label)
         
         # Main splitter with services and log
-        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.splitter = splitter = QSplitter(Qt.Orientation.Horizontal)
         
         # Left panel: Scroll area for services
         services_panel = QWidget()
@@ -146,26 +252,41 @@ class MainWindow(QMainWindow):
         services_layout.setContentsMargins(0, 0, 0, 0)
         
         self.services_header = QLabel(t("detected_services"))
-        self.services_header.setStyleSheet("font-size: 14px; font-weight: bold; color: #00d4ff; padding: 5px;")
+        self.services_header.setObjectName("sectionHeader")
         services_layout.addWidget(self.services_header)
         
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.services_scroll = QScrollArea()
+        self.services_scroll.setWidgetResizable(True)
+        self.services_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         
         self.services_container = QWidget()
         self.services_layout = QVBoxLayout(self.services_container)
         self.services_layout.setSpacing(10)
         self.services_layout.addStretch()
         
-        scroll_area.setWidget(self.services_container)
-        services_layout.addWidget(scroll_area)
+        self.services_scroll.setWidget(self.services_container)
+        services_layout.addWidget(self.services_scroll)
+        
+        # Virtualized list for large catalogs (hidden until needed)
+        self.service_list_model = ServiceListModel(self)
+        self.service_delegate = ServiceCardDelegate(self)
+        self.service_delegate.disable_clicked.connect(self._on_disable_service)
+        self.service_delegate.enable_clicked.connect(self._on_enable_service)
+        self.service_list_view = QListView()
+        self.service_list_view.setModel(self.service_list_model)
+        self.service_list_view.setItemDelegate(self.service_delegate)
+        self.service_list_view.setUniformItemSizes(True)
+        self.service_list_view.setMouseTracking(True)
+        self.service_list_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.service_list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.service_list_view.setVisible(False)
+        services_layout.addWidget(self.service_list_view)
         
         splitter.addWidget(services_panel)
         
-        # Right panel: Log viewer
-        self.log_viewer = LogViewerWidget()
-        splitter.addWidget(self.log_viewer)
+        # Right panel: placeholder until the log viewer is built after the
+        # first frame
+        splitter.addWidget(QWidget())
         
         # Splitter proportions (60% services, 40% log)
         splitter.setSizes([600, 400])
@@ -198,9 +319,40 @@ class MainWindow(QMainWindow):
         
         main_layout.addLayout(footer_layout)
     
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._startup_scheduled:
+            self._startup_scheduled = True
+            startup_profile.mark("window_shown")
+            # Runs after the pending paint of the skeleton window
+            QTimer.singleShot(0, self._finish_startup)
+    
+    def _finish_startup(self):
+        """Build the deferred parts of the window and start detection"""
+        startup_profile.mark("first_paint")
+        
+        from .log_viewer import LogViewerWidget
+        placeholder = self.splitter.widget(1)
+        self.log_viewer = LogViewerWidget()
+        self.splitter.replaceWidget(1, self.log_viewer)
+        placeholder.deleteLater()
+        self.splitter.setSizes([600, 400])
+        startup_profile.mark("log_viewer_ready")
+        
+        self._start_detection()
+        
+        # Re-detect only the services whose registry keys change
+        self.registry_changed.connect(self._on_registry_changed)
+        self.registry_watcher = RegistryWatcher(
+            self.detector.services, self.detector.registry, self.registry_changed.emit
+        )
+        self.registry_watcher.start()
+        
+        self.startup_finished.emit()
+    
     def _apply_styles(self):
-        """Apply CSS styles"""
-        self.setStyleSheet(DARK_THEME)
+        """Apply the application-wide theme (no-op if already applied)"""
+        apply_theme(QApplication.instance())
     
     def _on_language_changed(self):
         """Update UI when language changes"""
@@ -211,14 +363,17 @@ class MainWindow(QMainWindow):
         self.refresh_btn.setText(t("refresh"))
         self.backup_btn.setText(t("create_backup"))
         self.restore_btn.setText(t("restore"))
+        self.cancel_btn.setText(t("cancel"))
         self.disable_all_btn.setText(t("disable_all"))
         
         # Update service cards
         for card in self.service_cards.values():
             card.update_translations()
+        self.service_list_view.viewport().update()
         
         # Update log viewer
-        self.log_viewer.update_translations()
+        if self.log_viewer is not None:
+            self.log_viewer.update_translations()
         
         # Update status
         if hasattr(self, '_last_services_count'):
@@ -227,54 +382,227 @@ class MainWindow(QMainWindow):
             self.status_label.setText(t("services_found", count=count, enabled=enabled))
     
     def _start_detection(self):
-        """Start service detection in background"""
+        """Start service detection in background
+        
+        A request while a pass is running is remembered and started when
+        that pass's thread stops.
+        """
+        if self._detection_running():
+            self._refresh_requested = True
+            return
+        self._refresh_requested = False
+        
+        self.progress_bar.setRange(0, len(self.detector.services))
+        self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         self.status_label.setText(t("detecting_services"))
         
-        self.detection_worker = DetectionWorker(self.detector)
-        self.detection_worker.finished.connect(self._on_detection_finished)
+        self._detection_started = time.perf_counter()
+        self._first_card_ms = None
+        
+        self.detection_worker = self._new_detection_worker()
+        self.detection_worker.service_detected.connect(self._on_service_detected)
+        self.detection_worker.detected.connect(self._on_detection_finished)
         self.detection_worker.start()
     
+    def _new_detection_worker(self, service_ids=None) -> DetectionWorker:
+        """A worker owned by the window until its thread has really stopped"""
+        worker = DetectionWorker(self.detector, service_ids, parent=self)
+        worker.finished.connect(lambda: self._on_detection_thread_finished(worker))
+        worker.finished.connect(worker.deleteLater)
+        return worker
+    
+    def _on_detection_thread_finished(self, worker):
+        """After a pass's thread stops: run a queued refresh or registry changes"""
+        if self.detection_worker is not worker:
+            return
+        self.detection_worker = None
+        if self._refresh_requested:
+            # A full pass also covers the changed services
+            self._changed_services.clear()
+            self._start_detection()
+        else:
+            self._start_partial_detection()
+    
+    def _detection_running(self) -> bool:
+        return bool(self.detection_worker and self.detection_worker.isRunning())
+    
+    def _on_registry_changed(self, service_ids):
+        """Queue re-detection of the services whose keys changed"""
+        self._changed_services |= set(service_ids)
+        if not self._detection_running():
+            self._start_partial_detection()
+    
+    def _start_partial_detection(self):
+        """Re-detect only the services reported by the registry watcher"""
+        service_ids, self._changed_services = self._changed_services, set()
+        if not service_ids:
+            return
+        self.detection_worker = self._new_detection_worker(service_ids)
+        self.detection_worker.service_detected.connect(
+            lambda service, done, total: self._upsert_service(service)
+        )
+        self.detection_worker.detected.connect(self._on_partial_detection_finished)
+        self.detection_worker.start()
+    
+    def _on_partial_detection_finished(self, services):
+        """Log the re-detected services and refresh the summary"""
+        self._log_detection(services, self.detection_worker.baseline)
+        self._update_summary()
+    
+    def _log_detection(self, services, baseline):
+        """Log detection results
+        
+        The first pass logs every service; later passes only log services
+        whose status differs from the snapshot taken before the pass.
+        """
+        if baseline.version == 0:
+            changed = {service.id for service in services}
+        else:
+            changed = self.detector.snapshot.diff(baseline)
+        for service in services:
+            if service.id in changed:
+                activity_logger.log_detection(service.id, service.name, service.status.value)
+    
+    def _update_summary(self):
+        services = self.detector.services
+        enabled_count = sum(1 for s in services if s.status == ServiceStatus.ENABLED)
+        self._last_services_count = len(services)
+        self._last_enabled_count = enabled_count
+        self.status_label.setText(t("services_found", count=len(services), enabled=enabled_count))
+    
+    def closeEvent(self, event):
+        if self.registry_watcher is not None:
+            self.registry_watcher.stop()
+        # A backup or restore stops between two registry values; a detection
+        # pass only reads, so it is left to finish. Both threads are owned by
+        # the window and must have stopped before it is destroyed
+        if self.backup_worker is not None:
+            self.backup_worker.requestInterruption()
+            self.backup_worker.wait()
+        if self.detection_worker is not None:
+            self.detection_worker.wait()
+        # Let running registry/PowerShell actions finish instead of cutting
+        # them off at exit; actions that have not started are dropped
+        self.action_queue.wait()
+        super().closeEvent(event)
+    
+    def _on_service_detected(self, service, done: int, total: int):
+        """Show each service as soon as its status is known"""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self._upsert_service(service)
+        
+        if self._first_card_ms is None:
+            startup_profile.mark("first_card")
+            self._first_card_ms = (time.perf_counter() - self._detection_started) * 1000
+    
     def _on_detection_finished(self, services):
         """Callback when detection finishes"""
         self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 0)
         
-        # Clear previous cards
-        for card in self.service_cards.values():
-            card.deleteLater()
-        self.service_cards.clear()
+        self._reconcile_services(services)
         
-        # Create new cards and log detection
-        for service in services:
+        # Report time-to-first-card alongside the detector's own timing
+        self.detection_metrics = dict(
+            self.detector.last_pass_stats,
+            time_to_first_card_ms=self._first_card_ms or 0.0,
+            time_to_all_cards_ms=(time.perf_counter() - self._detection_started) * 1000
+        )
+        self.status_label.setToolTip(
+            "first card: {time_to_first_card_ms:.0f} ms • all cards: {time_to_all_cards_ms:.0f} ms".format(
+                **self.detection_metrics
+            )
+        )
+        
+        self._log_detection(services, self.detection_worker.baseline)
+        self._update_summary()
+    
+    def _reconcile_services(self, services):
+        """Bring the service view in line with `services`, keyed by id
+        
+        Existing cards are kept and only repainted when their status
+        changed; cards are created or removed only for catalog changes.
+        """
+        virtualize = len(services) > self.VIRTUALIZE_THRESHOLD
+        self.services_scroll.setVisible(not virtualize)
+        self.service_list_view.setVisible(virtualize)
+        
+        if virtualize:
+            self._remove_cards(list(self.service_cards))
+            self.service_list_model.set_services(services)
+            return
+        self.service_list_model.clear()
+        
+        current_ids = {service.id for service in services}
+        self._remove_cards([sid for sid in self.service_cards if sid not in current_ids])
+        
+        for position, service in enumerate(services):
+            card = self.service_cards.get(service.id)
+            if card is None:
+                card = ServiceCard(service)
+                card.disable_clicked.connect(self._on_disable_service)
+                card.enable_clicked.connect(self._on_enable_service)
+                self.service_cards[service.id] = card
+                self.services_layout.insertWidget(position, card)
+                continue
+            
+            if self.services_layout.indexOf(card) != position:
+                self.services_layout.removeWidget(card)
+                self.services_layout.insertWidget(position, card)
+            card.service = service
+            if card.displayed_status != service.status:
+                card.update_status(service.status)
+    
+    def _upsert_service(self, service):
+        """Create or update the view for a single service"""
+        if len(self.detector.services) > self.VIRTUALIZE_THRESHOLD:
+            if self.service_list_model.rowCount() == 0:
+                self.services_scroll.setVisible(False)
+                self.service_list_view.setVisible(True)
+                self.service_list_model.set_services(self.detector.services)
+            self.service_list_model.set_status(service.id, service.status)
+            return
+        
+        card = self.service_cards.get(service.id)
+        if card is None:
             card = ServiceCard(service)
             card.disable_clicked.connect(self._on_disable_service)
             card.enable_clicked.connect(self._on_enable_service)
-            
-            # Insert before stretch
-            self.services_layout.insertWidget(
-                self.services_layout.count() - 1, 
-                card
-            )
             self.service_cards[service.id] = card
-            
-            # Log detection
-            activity_logger.log_detection(service.id, service.name, service.status.value)
-        
-        enabled_count = sum(1 for s in services if s.status == ServiceStatus.ENABLED)
-        self._last_services_count = len(services)
-        self._last_enabled_count = enabled_count
-        
-        self.status_label.setText(t("services_found", count=len(services), enabled=enabled_count))
-        
-        # Update log viewer
-        self.log_viewer.refresh()
+            # Catalog position among the cards created so far; the final
+            # reconcile fixes the order once all results are in
+            position = min(self.detector.catalog.position(service.id), len(self.service_cards) - 1)
+            self.services_layout.insertWidget(position, card)
+        elif card.displayed_status != service.status:
+            card.update_status(service.status)
+    
+    def _remove_cards(self, service_ids):
+        for service_id in service_ids:
+            card = self.service_cards.pop(service_id)
+            self.services_layout.removeWidget(card)
+            card.deleteLater()
+    
+    def _set_service_status(self, service_id: str, status: ServiceStatus):
+        """Update the status shown for a single service"""
+        card = self.service_cards.get(service_id)
+        if card is not None:
+            card.update_status(status)
+        else:
+            self.service_list_model.set_status(service_id, status)
+    
+    def _set_service_busy(self, service_id: str, state: str):
+        """Show a service's pending/running action on its card"""
+        card = self.service_cards.get(service_id)
+        if card is not None:
+            card.set_busy(state)
+        else:
+            self.service_list_model.set_busy(service_id, state)
     
     def _on_disable_service(self, service_id: str):
         """Handle disable service click"""
-        if self.current_worker and self.current_worker.isRunning():
-            return
-        
-        service = next((s for s in self.detector.services if s.id == service_id), None)
+        service = self.detector.get_service(service_id)
         if not service:
             return
         
@@ -293,70 +621,58 @@ class MainWindow(QMainWindow):
     
     def _on_enable_service(self, service_id: str):
         """Handle enable service click"""
-        if self.current_worker and self.current_worker.isRunning():
-            return
-        
-        service = next((s for s in self.detector.services if s.id == service_id), None)
+        service = self.detector.get_service(service_id)
         if not service:
             return
         
         self._run_action("enable", service)
     
     def _run_action(self, action: str, service: AIService):
-        """Execute action in background"""
+        """Queue action to run in background"""
+        if not self.action_queue.submit(action, service):
+            return
+        
         self.progress_bar.setVisible(True)
         
         if action == "disable":
             self.status_label.setText(t("disabling", name=service.name))
         else:
             self.status_label.setText(t("enabling", name=service.name))
-        
-        self.current_worker = ActionWorker(action, self.manager, service)
-        self.current_worker.finished.connect(
-            lambda success, msg: self._on_action_finished(success, msg, service, action)
+    
+    def _on_actions_idle(self):
+        """Hide the progress bar once nothing else is using it"""
+        busy = (
+            (self.detection_worker and self.detection_worker.isRunning())
+            or (self.backup_worker and self.backup_worker.isRunning())
+            or self.action_queue.is_busy()
         )
-        self.current_worker.start()
+        if not busy:
+            self.progress_bar.setVisible(False)
     
-    def _on_action_finished(self, success: bool, message: str, service: AIService, action: str):
-        """Callback when action finishes"""
-        self.progress_bar.setVisible(False)
-        
+    def _on_action_finished(self, service: AIService, action: str, success: bool, message: str):
+        """Callback when a queued action finishes"""
         # Log action
         if action == "disable":
             activity_logger.log_disable(service.id, service.name, success, message)
         else:
             activity_logger.log_enable(service.id, service.name, success, message)
         
+        if success:
+            # Re-detected by the queue's worker; only the published status is read here
+            self._set_service_status(service.id, service.status)
+        
+        if self._on_disable_all_result(service.id, success):
+            # Part of "disable all": one summary instead of a message per service
+            return
         if success:
             self.status_label.setText(t("success", message=message))
-            # Update card state
-            updated_service = self.detector.refresh_service(service.id)
-            if updated_service and service.id in self.service_cards:
-                self.service_cards[service.id].update_status(updated_service.status)
         else:
             self.status_label.setText(t("error", message=message))
             QMessageBox.warning(self, t("error_title"), message)
-        
-        # Update log viewer
-        self.log_viewer.refresh()
     
     def _create_backup(self):
-        """Create backup of current configurations"""
-        success, result = self.manager.create_backup(self.detector.services)
-        
-        # Log backup
-        activity_logger.log_backup(success, result)
-        
-        if success:
-            QMessageBox.information(
-                self,
-                t("backup_created"),
-                t("backup_saved", path=result)
-            )
-        else:
-            QMessageBox.warning(self, t("error_title"), t("backup_error", error=result))
-        
-        self.log_viewer.refresh()
+        """Create backup of current configurations in background"""
+        self._run_backup_job("backup")
     
     def _restore_backup(self):
         """Restore from latest backup"""
@@ -383,18 +699,92 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        success, message = self.manager.restore_backup(latest['path'])
+        self._run_backup_job("restore", latest['path'])
+    
+    def _run_backup_job(self, job: str, backup_path: str = None, then=None):
+        """Start a backup or restore job with cancellable progress
         
-        # Log restoration
-        activity_logger.log_restore(success, message)
+        `then` runs on the GUI thread after a successful backup, instead of
+        the usual notification.
+        """
+        if self.backup_worker and self.backup_worker.isRunning():
+            return
+        
+        self.backup_btn.setEnabled(False)
+        self.restore_btn.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
+        self.status_label.setText(t("creating_backup" if job == "backup" else "restoring_backup"))
+        
+        worker = BackupWorker(job, self.manager, self.detector, backup_path, parent=self)
+        worker.progress.connect(self._on_backup_progress)
+        worker.job_finished.connect(
+            lambda success, message, refreshed: self._on_backup_finished(
+                job, success, message, refreshed, then
+            )
+        )
+        worker.finished.connect(lambda: self._on_backup_thread_finished(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.backup_worker = worker
+        worker.start()
+    
+    def _on_backup_thread_finished(self, worker):
+        """After a job's thread stops: forget it and hide an unused progress bar"""
+        if self.backup_worker is worker:
+            self.backup_worker = None
+        self._on_actions_idle()
+    
+    def _cancel_backup_job(self):
+        """Ask the running backup/restore job to stop"""
+        if self.backup_worker and self.backup_worker.isRunning():
+            self.backup_worker.requestInterruption()
+            self.cancel_btn.setEnabled(False)
+    
+    def _on_backup_progress(self, done: int, total: int):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+    
+    def _on_backup_finished(self, job: str, success: bool, message: str, refreshed: list,
+                            then=None):
+        """Callback when a backup/restore job finishes"""
+        self.cancel_btn.setVisible(False)
+        self.backup_btn.setEnabled(True)
+        self.restore_btn.setEnabled(True)
+        self.progress_bar.setRange(0, 0)
+        for service in refreshed:
+            self._set_service_status(service.id, service.status)
+        
+        if job == "backup":
+            activity_logger.log_backup(success, message)
+            if success and then is not None:
+                then()
+            elif success:
+                self.status_label.setText(t("success", message=t("backup_created")))
+                self._notify(t("backup_created"), t("backup_saved", path=message))
+            else:
+                self.status_label.setText(t("error", message=message))
+                self._notify(t("error_title"), t("backup_error", error=message), error=True)
+            return
         
+        activity_logger.log_restore(success, message)
         if success:
-            QMessageBox.information(self, t("restored"), message)
-            self._start_detection()  # Refresh states
+            self.status_label.setText(t("success", message=message))
+            self._notify(t("restored"), message)
         else:
-            QMessageBox.warning(self, t("error_title"), t("restore_error", error=message))
-        
-        self.log_viewer.refresh()
+            self.status_label.setText(t("error", message=message))
+            self._notify(t("error_title"), t("restore_error", error=message), error=True)
+    
+    def _notify(self, title: str, text: str, error: bool = False):
+        """Show a completion message without blocking the window"""
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Warning if error else QMessageBox.Icon.Information)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.setWindowModality(Qt.WindowModality.NonModal)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.show()
     
     def _disable_all(self):
         """Disable all AI services"""
@@ -421,27 +811,37 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        # Create automatic backup first
-        self.manager.create_backup(self.detector.services)
-        activity_logger.log_backup(True, "Auto-backup before disabling all")
-        
-        # Disable all
-        self.progress_bar.setVisible(True)
-        success_count = 0
-        
-        for service in enabled_services:
-            self.status_label.setText(t("disabling", name=service.name))
-            QApplication.processEvents()
-            
-            success, message = self.manager.disable_service(service)
-            activity_logger.log_disable(service.id, service.name, success, message)
-            
-            if success:
-                success_count += 1
-        
-        self.progress_bar.setVisible(False)
-        self.status_label.setText(t("disabled_count", success=success_count, total=len(enabled_services)))
-        
-        # Refresh states and log
-        self._start_detection()
-        self.log_viewer.refresh()
+        # Automatic backup first; the services are queued once it is written,
+        # skipping any that the backup's capture no longer finds enabled
+        self._run_backup_job("backup", then=lambda: self._queue_disable_all(
+            [s for s in enabled_services if s.status == ServiceStatus.ENABLED]
+        ))
+    
+    def _queue_disable_all(self, services):
+        """Send every service through the action queue, so actions on
+        shared artifacts still run in order"""
+        if not services:
+            self.status_label.setText(t("no_active_services"))
+            return
+        self._disable_all_pending = {service.id for service in services}
+        self._disable_all_total = len(services)
+        self._disable_all_success = 0
+        for service in services:
+            if not self.action_queue.submit("disable", service):
+                # Already queued by a click: its result is reported normally
+                self._disable_all_pending.discard(service.id)
+                self._disable_all_total -= 1
+        if self.action_queue.is_busy():
+            self.progress_bar.setVisible(True)
+    
+    def _on_disable_all_result(self, service_id: str, success: bool) -> bool:
+        """Count a "disable all" result; True if the action belonged to it"""
+        if service_id not in self._disable_all_pending:
+            return False
+        self._disable_all_pending.discard(service_id)
+        self._disable_all_success += success
+        if not self._disable_all_pending:
+            self.status_label.setText(t(
+                "disabled_count", success=self._disable_all_success, total=self._disable_all_total
+            ))
+        return True
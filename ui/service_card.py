@@ -4,13 +4,21 @@ Widget to display an individual AI service
 
 from PyQt6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, 
-    QLabel, QPushButton, QSizePolicy
+    QLabel, QPushButton, QSizePolicy, QStyledItemDelegate, QStyle
 )
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtCore import (
+    pyqtSignal, Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize, QEvent
+)
+from PyQt6.QtGui import QColor, QPainter, QFont, QFontMetrics, QPen
 import sys
 sys.path.append('..')
 from core.ai_services import AIService, ServiceStatus
 from core.i18n import t
+from .styles import (
+    set_state, SURFACE, BORDER, ACCENT, TEXT, TEXT_BRIGHT, TEXT_MUTED, TEXT_FAINT,
+    DISABLED_BACKGROUND, DISABLED_BORDER, DISABLED_TEXT, DANGER, DANGER_BACKGROUND,
+    SUCCESS, SUCCESS_BACKGROUND, WARNING
+)
 
 
 class ServiceCard(QFrame):
@@ -22,6 +30,8 @@ class ServiceCard(QFrame):
     def __init__(self, service: AIService, parent=None):
         super().__init__(parent)
         self.service = service
+        self.displayed_status = None
+        self.busy_state = ""
         self.setObjectName("serviceCard")
         self._setup_ui()
         self.update_status(service.status)
@@ -43,6 +53,7 @@ class ServiceCard(QFrame):
         
         # Status
         self.status_label = QLabel(t("detecting_services"))
+        self.status_label.setObjectName("serviceStatus")
         header_layout.addWidget(self.status_label)
         
         layout.addLayout(header_layout)
@@ -74,32 +85,27 @@ class ServiceCard(QFrame):
     
     def update_status(self, status: ServiceStatus):
         """Update status visualization"""
-        self.service.status = status
-        
-        if status == ServiceStatus.ENABLED:
-            self.status_label.setText(t("status_enabled"))
-            self.status_label.setObjectName("statusEnabled")
-            self.disable_btn.setEnabled(True)
-            self.enable_btn.setEnabled(False)
-        elif status == ServiceStatus.DISABLED:
-            self.status_label.setText(t("status_disabled"))
-            self.status_label.setObjectName("statusDisabled")
-            self.disable_btn.setEnabled(False)
-            self.enable_btn.setEnabled(True)
-        elif status == ServiceStatus.NOT_INSTALLED:
-            self.status_label.setText(t("status_not_installed"))
-            self.status_label.setObjectName("statusNotInstalled")
-            self.disable_btn.setEnabled(False)
-            self.enable_btn.setEnabled(False)
+        self.displayed_status = status
+        
+        enable_on, disable_on = _button_states(status)
+        if self.busy_state:
+            # Queued or running action: show it and block further clicks
+            self.status_label.setText(t(f"action_{self.busy_state}"))
+            set_state(self.status_label, "status", "busy")
+            enable_on = disable_on = False
         else:
-            self.status_label.setText(t("status_unknown"))
-            self.status_label.setObjectName("statusDisabled")
-            self.disable_btn.setEnabled(True)
-            self.enable_btn.setEnabled(True)
+            self.status_label.setText(t(STATUS_TEXT_KEYS.get(status, "status_unknown")))
+            set_state(self.status_label, "status", status.value)
         
-        # Force style update
-        self.status_label.style().unpolish(self.status_label)
-        self.status_label.style().polish(self.status_label)
+        self.enable_btn.setEnabled(enable_on)
+        self.disable_btn.setEnabled(disable_on)
+    
+    def set_busy(self, state: str):
+        """Show the action queue state ("pending", "running" or "")"""
+        if state == self.busy_state:
+            return
+        self.busy_state = state
+        self.update_status(self.service.status)
     
     def update_translations(self):
         """Update button texts when language changes"""
@@ -115,3 +121,235 @@ class ServiceCard(QFrame):
     def _on_enable_clicked(self):
         """Emit signal to enable service"""
         self.enable_clicked.emit(self.service.id)
+
+
+def _button_states(status: ServiceStatus):
+    """(enable_enabled, disable_enabled) for a status, as in ServiceCard"""
+    if status == ServiceStatus.ENABLED:
+        return False, True
+    if status == ServiceStatus.DISABLED:
+        return True, False
+    if status == ServiceStatus.NOT_INSTALLED:
+        return False, False
+    return True, True
+
+
+STATUS_TEXT_KEYS = {
+    ServiceStatus.ENABLED: "status_enabled",
+    ServiceStatus.DISABLED: "status_disabled",
+    ServiceStatus.NOT_INSTALLED: "status_not_installed",
+}
+
+STATUS_COLORS = {
+    ServiceStatus.ENABLED: SUCCESS,
+    ServiceStatus.DISABLED: TEXT_MUTED,
+    ServiceStatus.NOT_INSTALLED: TEXT_FAINT,
+}
+
+BUSY_COLOR = WARNING
+
+
+class ServiceListModel(QAbstractListModel):
+    """List model of services for large catalogs, reconciled by service id"""
+    
+    ServiceRole = Qt.ItemDataRole.UserRole + 1
+    StatusRole = Qt.ItemDataRole.UserRole + 2
+    BusyRole = Qt.ItemDataRole.UserRole + 3
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._services = []
+        self._statuses = {}
+        self._busy = {}
+        self._rows = {}
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._services)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._services):
+            return None
+        service = self._services[index.row()]
+        if role == self.ServiceRole:
+            return service
+        if role == self.StatusRole:
+            return self._statuses.get(service.id, ServiceStatus.UNKNOWN)
+        if role == self.BusyRole:
+            return self._busy.get(service.id, "")
+        if role == Qt.ItemDataRole.DisplayRole:
+            return service.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return service.description
+        return None
+    
+    def set_services(self, services: list):
+        """Reconcile with a new service list
+        
+        Rows are only inserted/removed when the catalog changes; otherwise
+        only rows whose status changed are repainted.
+        """
+        new_ids = [service.id for service in services]
+        if new_ids != [service.id for service in self._services]:
+            self.beginResetModel()
+            self._services = list(services)
+            self._statuses = {service.id: service.status for service in services}
+            self._rows = {service.id: row for row, service in enumerate(services)}
+            self.endResetModel()
+            return
+        
+        self._services = list(services)
+        for service in services:
+            self.set_status(service.id, service.status)
+    
+    def set_status(self, service_id: str, status: ServiceStatus):
+        """Update one service status, repainting only its row if it changed"""
+        row = self._rows.get(service_id)
+        if row is None or self._statuses.get(service_id) == status:
+            return
+        self._statuses[service_id] = status
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.StatusRole])
+    
+    def set_busy(self, service_id: str, state: str):
+        """Update the action queue state shown for one service"""
+        row = self._rows.get(service_id)
+        if row is None or self._busy.get(service_id, "") == state:
+            return
+        if state:
+            self._busy[service_id] = state
+        else:
+            self._busy.pop(service_id, None)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.BusyRole])
+    
+    def clear(self):
+        self.set_services([])
+
+
+class ServiceCardDelegate(QStyledItemDelegate):
+    """Paints a service card row and handles its Enable/Disable buttons
+    
+    Used instead of ServiceCard widgets when the catalog is large, so only
+    visible rows cost anything.
+    """
+    
+    disable_clicked = pyqtSignal(str)  # service_id
+    enable_clicked = pyqtSignal(str)   # service_id
+    
+    ROW_HEIGHT = 120
+    MARGIN = 5
+    PADDING = 15
+    BUTTON_WIDTH = 120
+    BUTTON_HEIGHT = 32
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._name_font = QFont("Segoe UI")
+        self._name_font.setPixelSize(16)
+        self._name_font.setBold(True)
+        self._text_font = QFont("Segoe UI")
+        self._text_font.setPixelSize(12)
+        self._status_font = QFont("Segoe UI")
+        self._status_font.setPixelSize(14)
+        self._status_font.setBold(True)
+        self._button_font = QFont(self._status_font)
+        self._text_metrics = QFontMetrics(self._text_font)
+    
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+    
+    def _card_rect(self, rect: QRect) -> QRect:
+        return rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+    
+    def _button_rects(self, rect: QRect):
+        """(enable_rect, disable_rect) inside a row"""
+        card = self._card_rect(rect)
+        top = card.bottom() - self.PADDING - self.BUTTON_HEIGHT
+        disable = QRect(card.right() - self.PADDING - self.BUTTON_WIDTH, top,
+                        self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
+        enable = disable.translated(-(self.BUTTON_WIDTH + 10), 0)
+        return enable, disable
+    
+    def paint(self, painter: QPainter, option, index):
+        service = index.data(ServiceListModel.ServiceRole)
+        status = index.data(ServiceListModel.StatusRole)
+        busy = index.data(ServiceListModel.BusyRole)
+        if service is None:
+            return
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        card = self._card_rect(option.rect)
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+        painter.setPen(QPen(QColor(ACCENT if hovered else BORDER), 1))
+        painter.setBrush(QColor(SURFACE))
+        painter.drawRoundedRect(QRectF(card), 12, 12)
+        
+        inner = card.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        
+        # Status (right) and name (left)
+        if busy:
+            status_text = t(f"action_{busy}")
+            status_color = BUSY_COLOR
+        else:
+            status_text = t(STATUS_TEXT_KEYS.get(status, "status_unknown"))
+            status_color = STATUS_COLORS.get(status, TEXT_MUTED)
+        painter.setFont(self._status_font)
+        painter.setPen(QColor(status_color))
+        painter.drawText(inner, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop, status_text)
+        
+        painter.setFont(self._name_font)
+        painter.setPen(QColor(TEXT_BRIGHT))
+        painter.drawText(inner, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, service.name)
+        
+        # Description
+        painter.setFont(self._text_font)
+        painter.setPen(QColor(TEXT_MUTED))
+        description = self._text_metrics.elidedText(
+            service.description, Qt.TextElideMode.ElideRight, inner.width()
+        )
+        painter.drawText(inner.adjusted(0, 26, 0, 0),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, description)
+        
+        # Buttons
+        enable_on, disable_on = _button_states(status) if not busy else (False, False)
+        enable_rect, disable_rect = self._button_rects(option.rect)
+        self._paint_button(painter, enable_rect, t("enable"), enable_on, SUCCESS_BACKGROUND, SUCCESS)
+        self._paint_button(painter, disable_rect, t("disable"), disable_on, DANGER_BACKGROUND, DANGER)
+        
+        painter.restore()
+    
+    def _paint_button(self, painter: QPainter, rect: QRect, text: str,
+                      enabled: bool, background: str, border: str):
+        if enabled:
+            painter.setPen(QPen(QColor(border), 2))
+            painter.setBrush(QColor(background))
+        else:
+            painter.setPen(QPen(QColor(DISABLED_BORDER), 2))
+            painter.setBrush(QColor(DISABLED_BACKGROUND))
+        painter.drawRoundedRect(QRectF(rect), 8, 8)
+        painter.setFont(self._button_font)
+        painter.setPen(QColor(TEXT if enabled else DISABLED_TEXT))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+    
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return False
+        service = index.data(ServiceListModel.ServiceRole)
+        status = index.data(ServiceListModel.StatusRole)
+        if service is None or index.data(ServiceListModel.BusyRole):
+            return False
+        
+        enable_on, disable_on = _button_states(status)
+        enable_rect, disable_rect = self._button_rects(option.rect)
+        pos = event.position().toPoint()
+        if enable_on and enable_rect.contains(pos):
+            self.enable_clicked.emit(service.id)
+            return True
+        if disable_on and disable_rect.contains(pos):
+            self.disable_clicked.emit(service.id)
+            return True
+        return False
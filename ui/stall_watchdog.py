@@ -0,0 +1,187 @@
+"""
+Event-loop stall watchdog
+
+A heartbeat timer on the GUI thread measures how late each tick fires. A
+monitor thread notices when the heartbeat stops and captures the GUI
+thread's Python stack, so long stalls can be attributed to a call site.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Any
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+
+REPORT_FILENAME = "ui_responsiveness.json"
+# Stalls kept with their stack for the report; older ones only count
+# towards the per-call-site totals
+RECENT_STALLS = 50
+
+# Frames from this tree are preferred when naming the culprit of a stall
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _call_site(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost frame that belongs to this project, else the innermost frame"""
+    for frame in reversed(stack):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_PROJECT_ROOT) and filename != os.path.abspath(__file__):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return "<unknown>"
+
+
+class StallWatchdog(QObject):
+    """Measures Qt event-loop latency and records stalls
+    
+    Percentiles cover the last `latency_window` heartbeats (ten minutes at
+    the default interval); the heartbeat count, the maximum and the
+    per-call-site stall totals cover the whole session. Memory stays
+    constant however long the window is open.
+    
+    Must be created and started on the GUI thread.
+    """
+    
+    def __init__(self, log_dir: str, interval_ms: int = 50,
+                 threshold_ms: int = 200, latency_window: int = 12000, parent=None):
+        super().__init__(parent)
+        self.log_dir = log_dir
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._heartbeats = 0
+        self._max_latency = 0.0
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=RECENT_STALLS)
+        self._stall_count = 0
+        self._call_sites: Dict[str, Dict[str, Any]] = {}
+        self._last_beat = 0.0
+        self._captured: Optional[List[traceback.FrameSummary]] = None
+        self._gui_thread_id = None
+        self._started_at = None
+        
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+        
+        self._stop = threading.Event()
+        self._monitor = None
+    
+    def start(self):
+        """Start the heartbeat and the monitor thread"""
+        self._gui_thread_id = threading.get_ident()
+        self._started_at = datetime.now()
+        self._last_beat = time.perf_counter()
+        self._timer.start()
+        self._stop.clear()
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, name="StallWatchdog", daemon=True
+        )
+        self._monitor.start()
+    
+    def stop(self):
+        """Stop measuring"""
+        self._timer.stop()
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=1.0)
+            self._monitor = None
+    
+    def _beat(self):
+        """Heartbeat tick on the GUI thread"""
+        now = time.perf_counter()
+        with self._lock:
+            latency = max(0.0, (now - self._last_beat) * 1000 - self.interval_ms)
+            self._last_beat = now
+            self._latencies.append(latency)
+            self._heartbeats += 1
+            self._max_latency = max(self._max_latency, latency)
+            stack, self._captured = self._captured, None
+            if latency >= self.threshold_ms:
+                site = _call_site(stack) if stack else "<not captured>"
+                duration = round(latency, 1)
+                self._stalls.append({
+                    "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration_ms": duration,
+                    "call_site": site,
+                    "stack": traceback.format_list(stack[-12:]) if stack else [],
+                })
+                self._stall_count += 1
+                totals = self._call_sites.setdefault(
+                    site, {"call_site": site, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+                )
+                totals["count"] += 1
+                totals["total_ms"] = round(totals["total_ms"] + duration, 1)
+                totals["max_ms"] = max(totals["max_ms"], duration)
+    
+    def _monitor_loop(self):
+        """Capture the GUI thread's stack while the heartbeat is late"""
+        poll = max(self.interval_ms, self.threshold_ms / 2) / 1000
+        while not self._stop.wait(poll):
+            with self._lock:
+                late_ms = (time.perf_counter() - self._last_beat) * 1000 - self.interval_ms
+                if late_ms < self.threshold_ms or self._captured is not None:
+                    continue
+                frame = sys._current_frames().get(self._gui_thread_id)
+                if frame is not None:
+                    self._captured = traceback.extract_stack(frame)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Stall count, latency percentiles and offending call sites"""
+        with self._lock:
+            latencies = list(self._latencies)
+            stalls = list(self._stalls)
+            heartbeats = self._heartbeats
+            stall_count = self._stall_count
+            max_latency = self._max_latency
+            call_sites = sorted(
+                (dict(totals) for totals in self._call_sites.values()),
+                key=lambda item: item["total_ms"], reverse=True
+            )
+        
+        return {
+            "started": self._started_at.strftime("%Y-%m-%d %H:%M:%S") if self._started_at else None,
+            "interval_ms": self.interval_ms,
+            "threshold_ms": self.threshold_ms,
+            "heartbeats": heartbeats,
+            "stall_count": stall_count,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50), 1),
+                "p95": round(_percentile(latencies, 95), 1),
+                "max": round(max_latency, 1),
+                "window": len(latencies),
+            },
+            "call_sites": call_sites,
+            "stalls": stalls,
+        }
+    
+    def write_report(self) -> Optional[str]:
+        """Write the summary to the log directory; returns the file path"""
+        path = os.path.join(self.log_dir, REPORT_FILENAME)
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            return path
+        except OSError:
+            return None
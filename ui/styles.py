@@ -3,39 +3,64 @@ Estilos CSS-like para PyQt6
 Tema oscuro moderno para la aplicación
 """
 
-DARK_THEME = """
+from string import Template
+
+# Paleta del tema oscuro. La hoja de estilos y los delegates que pintan
+# a mano (tarjetas de servicio, entradas del log) usan estas constantes
+BACKGROUND = "#1a1a2e"
+SURFACE = "#16213e"
+BORDER = "#0f3460"
+ACCENT = "#00d4ff"
+
+TEXT = "#eaeaea"
+TEXT_BRIGHT = "#ffffff"
+TEXT_SECONDARY = "#aaaaaa"
+TEXT_MUTED = "#888888"
+TEXT_FAINT = "#666666"
+
+DISABLED_BACKGROUND = "#2a2a3e"
+DISABLED_BORDER = "#333333"
+DISABLED_TEXT = "#555555"
+
+DANGER = "#e94560"
+DANGER_BACKGROUND = "#3d1a1a"
+SUCCESS = "#4ade80"
+SUCCESS_BACKGROUND = "#1a3d1a"
+WARNING = "#fbbf24"
+
+_THEME_TEMPLATE = Template("""
 QMainWindow {
-    background-color: #1a1a2e;
+    background-color: $BACKGROUND;
 }
 
 QWidget {
-    background-color: #1a1a2e;
-    color: #eaeaea;
+    background-color: $BACKGROUND;
+    color: $TEXT;
     font-family: 'Segoe UI', Arial, sans-serif;
     font-size: 14px;
 }
 
 QLabel {
-    color: #eaeaea;
+    color: $TEXT;
 }
 
 QLabel#title {
     font-size: 28px;
     font-weight: bold;
-    color: #00d4ff;
+    color: $ACCENT;
     padding: 10px;
 }
 
 QLabel#subtitle {
     font-size: 14px;
-    color: #888888;
+    color: $TEXT_MUTED;
     padding: 5px 10px;
 }
 
 QPushButton {
-    background-color: #16213e;
-    color: #eaeaea;
-    border: 2px solid #0f3460;
+    background-color: $SURFACE;
+    color: $TEXT;
+    border: 2px solid $BORDER;
     border-radius: 8px;
     padding: 10px 20px;
     font-weight: bold;
@@ -43,77 +68,173 @@ QPushButton {
 }
 
 QPushButton:hover {
-    background-color: #0f3460;
-    border-color: #00d4ff;
+    background-color: $BORDER;
+    border-color: $ACCENT;
 }
 
 QPushButton:pressed {
-    background-color: #00d4ff;
-    color: #1a1a2e;
+    background-color: $ACCENT;
+    color: $BACKGROUND;
 }
 
 QPushButton:disabled {
-    background-color: #2a2a3e;
-    color: #555555;
-    border-color: #333333;
+    background-color: $DISABLED_BACKGROUND;
+    color: $DISABLED_TEXT;
+    border-color: $DISABLED_BORDER;
 }
 
 QPushButton#danger {
-    background-color: #3d1a1a;
-    border-color: #e94560;
+    background-color: $DANGER_BACKGROUND;
+    border-color: $DANGER;
 }
 
 QPushButton#danger:hover {
-    background-color: #e94560;
-    color: #ffffff;
+    background-color: $DANGER;
+    color: $TEXT_BRIGHT;
 }
 
 QPushButton#success {
-    background-color: #1a3d1a;
-    border-color: #4ade80;
+    background-color: $SUCCESS_BACKGROUND;
+    border-color: $SUCCESS;
 }
 
 QPushButton#success:hover {
-    background-color: #4ade80;
-    color: #1a1a2e;
+    background-color: $SUCCESS;
+    color: $BACKGROUND;
 }
 
 QFrame#serviceCard {
-    background-color: #16213e;
-    border: 1px solid #0f3460;
+    background-color: $SURFACE;
+    border: 1px solid $BORDER;
     border-radius: 12px;
     padding: 15px;
     margin: 5px;
 }
 
 QFrame#serviceCard:hover {
-    border-color: #00d4ff;
+    border-color: $ACCENT;
 }
 
 QLabel#serviceName {
     font-size: 16px;
     font-weight: bold;
-    color: #ffffff;
+    color: $TEXT_BRIGHT;
 }
 
 QLabel#serviceDescription {
     font-size: 12px;
-    color: #888888;
+    color: $TEXT_MUTED;
 }
 
-QLabel#statusEnabled {
-    color: #4ade80;
+QLabel#serviceStatus {
+    color: $TEXT_MUTED;
     font-weight: bold;
 }
 
-QLabel#statusDisabled {
-    color: #888888;
+QLabel#serviceStatus[status="enabled"] {
+    color: $SUCCESS;
+}
+
+QLabel#serviceStatus[status="not_installed"] {
+    color: $TEXT_FAINT;
+    font-weight: normal;
+    font-style: italic;
+}
+
+QLabel#serviceStatus[status="busy"] {
+    color: $WARNING;
+}
+
+QLabel#sectionHeader {
+    font-size: 14px;
     font-weight: bold;
+    color: $ACCENT;
+    padding: 5px;
+}
+
+QLabel#languageIcon {
+    font-size: 16px;
+}
+
+QComboBox#languageSelector {
+    background-color: $SURFACE;
+    color: $TEXT;
+    border: 1px solid $BORDER;
+    border-radius: 4px;
+    padding: 5px 10px;
+    font-size: 12px;
+}
+
+QComboBox#languageSelector:hover {
+    border-color: $ACCENT;
+}
+
+QComboBox#languageSelector::drop-down {
+    border: none;
+    width: 20px;
+}
+
+QComboBox#languageSelector::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid $ACCENT;
+    margin-right: 5px;
 }
 
-QLabel#statusNotInstalled {
-    color: #666666;
+QComboBox#languageSelector QAbstractItemView {
+    background-color: $SURFACE;
+    color: $TEXT;
+    selection-background-color: $BORDER;
+    border: 1px solid $BORDER;
+}
+
+QLabel#logTitle {
+    font-size: 16px;
+    font-weight: bold;
+    color: $ACCENT;
+}
+
+QLabel#logEmpty {
+    color: $TEXT_FAINT;
     font-style: italic;
+    padding: 20px;
+}
+
+QPushButton#logToolButton {
+    background-color: $SURFACE;
+    border: 1px solid $BORDER;
+    border-radius: 4px;
+    padding: 0px;
+    min-width: 0px;
+}
+
+QPushButton#logToolButton:hover {
+    background-color: $BORDER;
+}
+
+QPushButton#logToolButton:checked {
+    border-color: $ACCENT;
+}
+
+QListView#logList {
+    background-color: $BACKGROUND;
+    border: 1px solid $BORDER;
+    border-radius: 8px;
+    padding: 3px;
+}
+
+QLineEdit {
+    background-color: $SURFACE;
+    color: $TEXT;
+    border: 1px solid $BORDER;
+    border-radius: 4px;
+    padding: 5px 8px;
+    font-size: 12px;
+}
+
+QLineEdit:focus {
+    border-color: $ACCENT;
 }
 
 QScrollArea {
@@ -122,43 +243,76 @@ QScrollArea {
 }
 
 QScrollBar:vertical {
-    background-color: #16213e;
+    background-color: $SURFACE;
     width: 10px;
     border-radius: 5px;
 }
 
 QScrollBar::handle:vertical {
-    background-color: #0f3460;
+    background-color: $BORDER;
     border-radius: 5px;
     min-height: 30px;
 }
 
 QScrollBar::handle:vertical:hover {
-    background-color: #00d4ff;
+    background-color: $ACCENT;
 }
 
 QProgressBar {
-    border: 2px solid #0f3460;
+    border: 2px solid $BORDER;
     border-radius: 8px;
-    background-color: #16213e;
+    background-color: $SURFACE;
     text-align: center;
-    color: #eaeaea;
+    color: $TEXT;
 }
 
 QProgressBar::chunk {
-    background-color: #00d4ff;
+    background-color: $ACCENT;
     border-radius: 6px;
 }
 
 QMessageBox {
-    background-color: #1a1a2e;
+    background-color: $BACKGROUND;
 }
 
 QMessageBox QLabel {
-    color: #eaeaea;
+    color: $TEXT;
 }
 
 QMessageBox QPushButton {
     min-width: 80px;
 }
-"""
+""")
+
+DARK_THEME = _THEME_TEMPLATE.substitute(
+    BACKGROUND=BACKGROUND, SURFACE=SURFACE, BORDER=BORDER, ACCENT=ACCENT,
+    TEXT=TEXT, TEXT_BRIGHT=TEXT_BRIGHT, TEXT_MUTED=TEXT_MUTED, TEXT_FAINT=TEXT_FAINT,
+    DISABLED_BACKGROUND=DISABLED_BACKGROUND, DISABLED_BORDER=DISABLED_BORDER,
+    DISABLED_TEXT=DISABLED_TEXT, DANGER=DANGER, DANGER_BACKGROUND=DANGER_BACKGROUND,
+    SUCCESS=SUCCESS, SUCCESS_BACKGROUND=SUCCESS_BACKGROUND, WARNING=WARNING,
+)
+
+
+def apply_theme(app):
+    """Aplica el tema una sola vez a nivel de aplicación
+    
+    Los widgets no llevan hojas de estilo propias: se seleccionan por
+    objectName y su estado se expresa con propiedades dinámicas.
+    """
+    if app is not None and app.styleSheet() != DARK_THEME:
+        app.setStyleSheet(DARK_THEME)
+
+
+def set_state(widget, name: str, value) -> bool:
+    """Cambia una propiedad de estado usada por el tema
+    
+    Sólo se vuelve a aplicar el estilo del widget si el valor cambió.
+    Retorna True si hubo cambio.
+    """
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    return True